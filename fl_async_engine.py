@@ -0,0 +1,1306 @@
+# -*- coding: utf-8 -*-
+"""
+fl_async_engine
+
+asyncio engine of the frontline hourly cycle (frontline -a). Carrapatos and aeródromos are
+coroutines bounded by a semaphore, REDEMET/INMET requests go through aiohttp and the BDC
+writes through an asyncpg pool
+
+2026.oct  mlabru  breaker outcomes given with the probe flag of allow (others don't clear the probe)
+2026.oct  mlabru  bytes of the metrics on the wire (compressed), not decoded
+2026.oct  mlabru  blocking calls (files, subprocess) in the executor, BDC queries queued from any thread
+2026.oct  mlabru  speculative INMET lookup only before REDEMET answers (stored miss: INMET at once)
+2026.oct  mlabru  breaker probe given up by any attempt ended without an answer (not only cancel/deadline)
+2026.oct  mlabru  endpoint of the answers given to the host limit (latency baseline per endpoint)
+2026.oct  mlabru  hedges of one attempt, latency of ok answers only, REDEMET single location endpoint
+2026.oct  mlabru  deadline cleared after each hour, the backfill is not cut by the one of the last hour
+2026.oct  mlabru  INMET station days kept in the disk cache only (failures not kept)
+2026.oct  mlabru  coroutines waiting for a host slot woken by releases of any thread
+2026.oct  mlabru  backfill fetched per chunk of hours as the hours are processed
+2026.oct  mlabru  metrics of the requests and connection reuse per host (fl_metrics)
+2026.oct  mlabru  polling mode, missing METARs polled after the hour, stations started on arrival
+2026.oct  mlabru  requests in flight per host bounded by the AIMD limits of fl_http
+2026.oct  mlabru  speculative mode, INMET lookup of a carrapato concurrent with REDEMET
+2026.oct  mlabru  REDEMET single location requests hedged (tail latency, fl_http)
+2026.oct  mlabru  circuit breakers of fl_http (fail fast while an upstream is down)
+2026.oct  mlabru  request timeouts, hourly deadline (unfinished carrapatos get the METSAR from METAF)
+2026.oct  mlabru  concurrent fetches of a station coalesced (single-flight)
+2026.oct  mlabru  station health: chronically empty stations skipped, healthy ones first (fl_health)
+2026.oct  mlabru  typed decoding into slim records (fl_decode)
+2026.oct  mlabru  record/replay (fl_replay)
+2026.oct  mlabru  REDEMET/INMET answers saved in the disk cache
+2026.oct  mlabru  requests paced by the fl_http token buckets, retries with backoff
+2026.oct  mlabru  initial version (Linux/Python)
+"""
+# < imports >----------------------------------------------------------------------------------
+
+# python library
+import asyncio
+import datetime
+import functools
+import glob
+import logging
+import pathlib
+import threading
+import time
+
+# aiohttp / asyncpg (only needed by this engine)
+import aiohttp
+import asyncpg
+
+# local
+import fl_decode as de
+import fl_defs as df
+import fl_dirs as dr
+import fl_health as hl
+import fl_data_inmet as im
+import fl_data_redemet as rm
+import fl_http as hp
+import fl_icao_ll as ll
+import fl_metrics as fm
+import fl_metsar_gen as mg
+import fl_metar_parser as mp
+import fl_replay as rp
+import fl_send_bdc as sb
+import frontline as fl
+
+# < constants >--------------------------------------------------------------------------------
+
+# carrapatos/aeródromos in progress at the same time
+DI_ASYNC_CONCURRENCY = 256
+
+# BDC connections (and writers)
+DI_BDC_POOL = 8
+
+# < logging >----------------------------------------------------------------------------------
+
+# logger
+M_LOG = logging.getLogger(__name__)
+M_LOG.setLevel(df.DI_LOG_LEVEL)
+
+# < SAsyncBDC >--------------------------------------------------------------------------------
+
+class SAsyncBDC:
+    """
+    BDC connection for the synchronous writers (fl_send_bdc, fl_metsar_gen), also when they run
+    in the executor. Queries are queued and executed by the writer tasks on an asyncpg pool
+    (autocommit)
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self):
+        """
+        constructor
+        """
+        # pending queries
+        self._o_queue = asyncio.Queue()
+
+        # event loop of the queue, asyncpg pool and writer tasks (see start)
+        self._o_loop = None
+        self._o_pool = None
+        self._lst_writers = []
+
+    # -----------------------------------------------------------------------------------------
+    async def _writer(self):
+        """
+        execute the queued queries
+        """
+        # forever...
+        while True:
+            # next query
+            ls_query = await self._o_queue.get()
+
+            try:
+                # execute query (autocommit)
+                await self._o_pool.execute(ls_query)
+
+            # em caso de erro,...
+            except (asyncpg.PostgresError, OSError) as l_err:
+                # logger
+                M_LOG.error("BDC write error: %s (%s).", str(l_err), ls_query)
+
+            # done
+            self._o_queue.task_done()
+
+    # -----------------------------------------------------------------------------------------
+    async def close(self):
+        """
+        wait for the pending queries and close the pool
+        """
+        # pending queries
+        await self._o_queue.join()
+
+        # for all writers...
+        for l_task in self._lst_writers:
+            # stop writer
+            l_task.cancel()
+
+        # close pool
+        await self._o_pool.close()
+
+    # -----------------------------------------------------------------------------------------
+    def commit(self):
+        """
+        commit (queries are executed in autocommit by the writers)
+        """
+
+    # -----------------------------------------------------------------------------------------
+    def cursor(self):
+        """
+        cursor (the connection itself)
+        """
+        # return
+        return self
+
+    # -----------------------------------------------------------------------------------------
+    def execute(self, fs_query: str):
+        """
+        queue query (from any thread: writers run in the executor)
+
+        :param fs_query (str): query
+        """
+        # queue query (in the event loop, the queue is not thread-safe)
+        self._o_loop.call_soon_threadsafe(self._o_queue.put_nowait, fs_query)
+
+    # -----------------------------------------------------------------------------------------
+    async def start(self, fi_pool_size: int = DI_BDC_POOL):
+        """
+        connect BDC and start the writers
+
+        :param fi_pool_size (int): connections (and writers)
+        """
+        # event loop of the queue
+        self._o_loop = asyncio.get_event_loop()
+
+        # create pool
+        self._o_pool = await asyncpg.create_pool(host=sb.DS_HOST, database=sb.DS_DB,
+                                                 user=sb.DS_USER, password=sb.DS_PASS,
+                                                 min_size=1, max_size=fi_pool_size)
+
+        # start writers
+        self._lst_writers = [asyncio.ensure_future(self._writer()) for _ in range(fi_pool_size)]
+
+# < SAsyncEngine >-----------------------------------------------------------------------------
+
+class SAsyncEngine:
+    """
+    hourly cycle of carrapatos and aeródromos as coroutines
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self, fi_concurrency: int = DI_ASYNC_CONCURRENCY, fv_speculative: bool = False,
+                 fi_poll: int = 0):
+        """
+        constructor
+
+        :param fi_concurrency (int): carrapatos/aeródromos in progress at the same time
+        :param fv_speculative (bool): INMET lookup of a carrapato concurrent with REDEMET
+        :param fi_poll (int): poll the missing METARs up to this many seconds into the hour (0 for no polling)
+        """
+        # concurrency
+        self._i_concurrency = max(1, int(fi_concurrency))
+
+        # speculative mode
+        self._v_speculative = fv_speculative
+
+        # polling mode and stations waiting for the polling ({code: future})
+        self._i_poll = max(0, int(fi_poll))
+        self._dct_polls = {}
+
+        # semaphore, HTTP session and BDC (see start)
+        self._o_sem = None
+        self._o_session = None
+        self._o_bdc = None
+
+        # fetches in flight ({key: task})
+        self._dct_flights = {}
+
+        # coroutines waiting for a slot ({SAimdLimit: (condition, waker)})
+        self._dct_slots = {}
+
+        # blocking calls in the executor (they finish even if their coroutine is cancelled)
+        self._set_blocking = set()
+
+    # -----------------------------------------------------------------------------------------
+    async def _acquire(self, fo_limit):
+        """
+        wait for a slot of the host limit (fl_http), until released or cancelled (deadline)
+
+        :param fo_limit (SAimdLimit): host limit
+        """
+        # slot condition
+        lt_slot = self._dct_slots.get(fo_limit, None)
+
+        if lt_slot is None:
+            # waker of the coroutines, called by the limit when any thread or coroutine frees a slot
+            lf_waker = functools.partial(asyncio.get_event_loop().call_soon_threadsafe, self._wake, fo_limit)
+            fo_limit.add_waker(lf_waker)
+
+            # create condition
+            lt_slot = self._dct_slots[fo_limit] = (asyncio.Condition(), lf_waker)
+
+        # slot condition
+        lo_cond = lt_slot[0]
+
+        async with lo_cond:
+            # wait for a slot
+            await lo_cond.wait_for(fo_limit.try_acquire)
+
+    # -----------------------------------------------------------------------------------------
+    async def _blocking(self, f_call, *flst_args):
+        """
+        run a blocking call (files, subprocess, station search) in the default executor, the
+        event loop keeps serving the requests in flight
+
+        :param f_call (callable): function
+        :param flst_args (list): arguments
+
+        :returns: f_call result
+        """
+        # blocking call (kept until done, see close)
+        lo_future = asyncio.get_event_loop().run_in_executor(None, f_call, *flst_args)
+        self._set_blocking.add(lo_future)
+        lo_future.add_done_callback(self._set_blocking.discard)
+
+        # return (a cancel of the coroutine does not cancel the call)
+        return await asyncio.shield(lo_future)
+
+    # -----------------------------------------------------------------------------------------
+    async def _bounded(self, f_coro, fo_wait=None):
+        """
+        run coroutine under the concurrency semaphore
+
+        :param f_coro (coroutine): carrapato/aeródromo
+        :param fo_wait (Future): wait for it (polling) before taking the semaphore
+        """
+        try:
+            # wait (polling) ?
+            if fo_wait is not None:
+                await asyncio.shield(fo_wait)
+
+        # cancelled (deadline) ?
+        except asyncio.CancelledError:
+            # not started
+            f_coro.close()
+
+            # re-raise
+            raise
+
+        async with self._o_sem:
+            # return
+            return await f_coro
+
+    # -----------------------------------------------------------------------------------------
+    async def _gather_until_deadline(self, flst_coros, flst_waits=None):
+        """
+        run coroutines under the concurrency semaphore until the deadline (fl_http). The
+        unfinished ones are cancelled
+
+        :param flst_coros (list): carrapatos/aeródromos
+        :param flst_waits (list): future (or None) each coroutine waits for before it starts
+
+        :returns: tasks (cancelled if late)
+        """
+        # tasks
+        llst_tasks = [asyncio.ensure_future(self._bounded(l_coro, lo_wait))
+                      for l_coro, lo_wait in zip(flst_coros, flst_waits or [None] * len(flst_coros))]
+
+        if llst_tasks:
+            # time left
+            lf_remaining = hp.http_remaining()
+
+            # wait (until the deadline)
+            _, lset_pending = await asyncio.wait(llst_tasks,
+                                                 timeout=None if lf_remaining is None else max(0., lf_remaining))
+
+            # for all unfinished tasks...
+            for l_task in lset_pending:
+                # cancel task
+                l_task.cancel()
+
+            # wait for the cancellations
+            await asyncio.gather(*lset_pending, return_exceptions=True)
+
+        # return
+        return llst_tasks
+
+    # -----------------------------------------------------------------------------------------
+    async def _get_json(self, fs_endpoint: str, fs_url: str, f_decode, fi_retries: int = hp.DI_HTTP_RETRIES):
+        """
+        GET and decode JSON, paced by the host token bucket (fl_http) and retried with backoff
+        on transport errors, 429 and 5xx. Requests in flight to the host are bounded by its AIMD
+        limit. No request starts after the deadline or while the circuit of the host is open
+        (fl_http)
+
+        :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+        :param fs_url (str): URL
+        :param f_decode (callable): decoder (fl_decode)
+        :param fi_retries (int): retries after the first attempt
+
+        :returns: decoded data or None on error
+        """
+        # host bucket, breaker and limit (upstream host, also on replay)
+        lo_bucket = hp.http_bucket(fs_url)
+        lo_breaker = hp.http_breaker(fs_url)
+        lo_limit = hp.http_limit(fs_url)
+
+        # record/replay mode
+        ls_mode = rp.replay_mode()
+
+        # URL requested (stand-in on replay)
+        ls_url = rp.replay_url(fs_url) if rp.DS_MODE_REPLAY == ls_mode else fs_url
+
+        # answer, no failure counted by the breaker, no breaker outcome due, not the probe
+        lb_data = None
+        lv_failed = False
+        lv_pending = False
+        lv_probe = False
+
+        try:
+            # for all attempts...
+            for li_attempt in range(fi_retries + 1):
+                # may go ? (as the probe of a half-open circuit ?)
+                lv_go, lv_probe = lo_breaker.allow()
+
+                # circuit open ?
+                if not lv_go:
+                    # logger
+                    M_LOG.debug("HTTP %s not requested: circuit open.", fs_endpoint)
+
+                    # metrics
+                    fm.metrics_count(fs_endpoint, fm.DS_EVENT_CIRCUIT)
+
+                    # return with error
+                    return None
+
+                # allowed (maybe the probe): success or failure due
+                lv_pending = True
+
+                # time left
+                lf_remaining = hp.http_remaining()
+
+                # wait for a token (not past the deadline)
+                if lf_remaining is None or lf_remaining > 0.:
+                    lf_wait = lo_bucket.reserve()
+                    await asyncio.sleep(lf_wait if lf_remaining is None else min(lf_wait, lf_remaining))
+
+                # wait for a slot
+                await self._acquire(lo_limit)
+
+                # time left
+                lf_remaining = hp.http_remaining()
+
+                # deadline passed ?
+                if lf_remaining is not None and lf_remaining <= 0.:
+                    # slot not used
+                    self._release(lo_limit)
+
+                    # logger
+                    M_LOG.warning("HTTP %s not requested: deadline passed.", fs_endpoint)
+
+                    # metrics
+                    fm.metrics_count(fs_endpoint, fm.DS_EVENT_DEADLINE)
+
+                    # return with error
+                    return None
+
+                # no Retry-After
+                ls_retry_after = None
+
+                # timeouts (session ones, whole request cut to the deadline)
+                ldct_args = {} if lf_remaining is None else \
+                            {"timeout": aiohttp.ClientTimeout(total=lf_remaining,
+                                                              sock_connect=hp.DT_HTTP_TIMEOUT[0],
+                                                              sock_read=hp.DT_HTTP_TIMEOUT[1])}
+
+                # request start, not answered yet (no status, no bytes)
+                lf_ini = time.monotonic()
+                lv_ok = False
+                li_status = None
+                li_bytes = 0
+
+                try:
+                    # request
+                    async with self._o_session.get(ls_url, **ldct_args) as l_response:
+                        # status
+                        li_status = l_response.status
+
+                        # answered (not throttled or failed: upstream healthy)
+                        lv_ok = l_response.status not in hp.DSET_HTTP_RETRY
+
+                        # upstream down (5xx, one failure per call) or alive (even if throttled)
+                        if l_response.status >= 500:
+                            lo_breaker.failure(not lv_failed, lv_probe)
+                            lv_failed = True
+
+                        else:
+                            lo_breaker.success(lv_probe)
+
+                        # breaker outcome given
+                        lv_pending = False
+
+                        # answer (not retried) ?
+                        if l_response.status not in hp.DSET_HTTP_RETRY:
+                            # recording ?
+                            if rp.DS_MODE_RECORD == ls_mode:
+                                # save fixture
+                                rp.record(fs_url, l_response.status, l_response.headers,
+                                          await l_response.text())
+
+                            # not ok ?
+                            if 200 != l_response.status:
+                                # logger
+                                M_LOG.error("HTTP %s not found. Code: %s", fs_endpoint, str(l_response.status))
+
+                                # return with error
+                                return None
+
+                            # answer
+                            lb_data = await l_response.read()
+
+                            # bytes on the wire (compressed body, recent aiohttp), else Content-Length,
+                            # else the decoded length
+                            li_bytes = getattr(l_response.content, "total_raw_bytes", None) or \
+                                       l_response.content_length or len(lb_data)
+
+                            # endpoint latency (ok answers only: 429 and 5xx answer fast)
+                            hp.http_latency(fs_endpoint).add(time.monotonic() - lf_ini)
+
+                            # quit
+                            break
+
+                        # Retry-After
+                        ls_retry_after = l_response.headers.get("Retry-After", None)
+
+                        # logger
+                        M_LOG.warning("HTTP %s code %d (attempt %d).",
+                                      fs_endpoint, l_response.status, li_attempt + 1)
+
+                # em caso de erro,...
+                except (aiohttp.ClientError, asyncio.TimeoutError) as l_err:
+                    # upstream down (one failure per call)
+                    lo_breaker.failure(not lv_failed, lv_probe)
+                    lv_failed = True
+                    lv_pending = False
+
+                    # logger
+                    M_LOG.warning("HTTP %s request error (attempt %d): %s.",
+                                  fs_endpoint, li_attempt + 1, str(l_err))
+
+                    # metrics
+                    fm.metrics_count(fs_endpoint, fm.DS_EVENT_ERROR)
+
+                finally:
+                    # answered ? metrics (latency, body included)
+                    if li_status is not None:
+                        fm.metrics_request(fs_endpoint, time.monotonic() - lf_ini, li_status, li_bytes)
+
+                    # free slot
+                    self._release(lo_limit, lf_ini, lv_ok, fs_endpoint)
+
+                # last attempt ?
+                if li_attempt >= fi_retries:
+                    # logger
+                    M_LOG.error("HTTP %s failed after %d attempts.", fs_endpoint, fi_retries + 1)
+
+                    # return with error
+                    return None
+
+                # metrics
+                fm.metrics_count(fs_endpoint, fm.DS_EVENT_RETRY)
+
+                # delay
+                lf_delay = hp.http_retry_delay(li_attempt, ls_retry_after)
+
+                # throttled ? hold every request to the host
+                if ls_retry_after is not None:
+                    lo_bucket.hold(lf_delay)
+
+                # wait (not past the deadline)
+                lf_remaining = hp.http_remaining()
+                await asyncio.sleep(lf_delay if lf_remaining is None else min(lf_delay, max(0., lf_remaining)))
+
+        finally:
+            # allowed attempt ended without an answer (cancel, error out of the loop) ? give up its probe
+            if lv_pending:
+                lo_breaker.abandon(lv_probe)
+
+        try:
+            # decode data (slim records)
+            return f_decode(lb_data)
+
+        # em caso de erro...
+        except de.DT_DECODE_ERRORS as l_err:
+            # logger
+            M_LOG.error("HTTP %s decoding error: %s.", fs_endpoint, str(l_err))
+
+        # return with error
+        return None
+
+    # -----------------------------------------------------------------------------------------
+    async def _get_json_hedged(self, fs_endpoint: str, fs_url: str, f_decode):
+        """
+        _get_json, and a duplicate request (one attempt) if the first one has not answered by the
+        hedge delay of the endpoint (fl_http). The first decoded answer is used, the other one is
+        cancelled
+
+        :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+        :param fs_url (str): URL
+        :param f_decode (callable): decoder (fl_decode)
+
+        :returns: decoded data or None on error
+        """
+        # hedge delay
+        lf_delay = hp.http_hedge_delay(fs_endpoint)
+
+        # no hedging ?
+        if lf_delay is None:
+            # return
+            return await self._get_json(fs_endpoint, fs_url, f_decode)
+
+        # first request
+        lo_first = asyncio.ensure_future(self._get_json(fs_endpoint, fs_url, f_decode))
+        llst_tasks = [lo_first]
+
+        try:
+            # wait (until the hedge delay)
+            lset_done, _ = await asyncio.wait(llst_tasks, timeout=lf_delay)
+
+            # answered or no hedge left ?
+            if lset_done or not hp.http_hedge_take():
+                # return
+                return await lo_first
+
+            # logger
+            M_LOG.debug("HTTP %s hedged after %.2f s.", fs_endpoint, lf_delay)
+
+            # metrics
+            fm.metrics_count(fs_endpoint, fm.DS_EVENT_HEDGE)
+
+            # hedge request (one attempt, the first request does the retries)
+            llst_tasks.append(asyncio.ensure_future(self._get_json(fs_endpoint, fs_url, f_decode, 0)))
+
+            # no answer
+            l_ans = None
+
+            # for all requests (in answer order)...
+            for l_next in asyncio.as_completed(llst_tasks):
+                # answer
+                l_ans = await l_next
+
+                if l_ans is not None:
+                    # return
+                    return l_ans
+
+            # return with error
+            return l_ans
+
+        finally:
+            # for all requests...
+            for l_task in llst_tasks:
+                # cancel the slower one
+                l_task.cancel()
+
+    # -----------------------------------------------------------------------------------------
+    async def _inmet_fetch(self, fs_date: str, fs_station: str):
+        """
+        recupera os dados da localidade (INMET), do disk cache ou por request
+
+        :param fs_date (str): date to search
+        :param fs_station (str): station
+
+        :returns: station data if found else None
+        """
+        # already fetched (disk cache) ?
+        lv_hit, l_ans = im.inmet_get_cached(fs_date, fs_station)
+
+        # dead station ?
+        if not lv_hit and hl.health_skip(hl.DS_HEALTH_INMET, fs_station):
+            # not requested
+            l_ans = None
+
+        elif not lv_hit:
+            # request de dados horários da estação
+            lf_ini = time.monotonic()
+            l_ans = await self._get_json("inmet_station", im.DS_INMET_URL.format(fs_date, fs_station),
+                                         de.decode_inmet_day)
+
+            if l_ans is not None:
+                # save in disk cache (slim)
+                im.inmet_store(fs_date, fs_station, de.encode_records(l_ans), bool(l_ans))
+
+                # station health
+                hl.health_record(hl.DS_HEALTH_INMET, fs_station, bool(l_ans), time.monotonic() - lf_ini)
+
+        # return
+        return l_ans
+
+    # -----------------------------------------------------------------------------------------
+    async def _notify(self, fo_limit):
+        """
+        wake the coroutines waiting for a slot of the host limit
+
+        :param fo_limit (SAimdLimit): host limit
+        """
+        # slot condition
+        lo_cond = self._dct_slots[fo_limit][0]
+
+        async with lo_cond:
+            # wake waiters (freed slot and maybe a new one)
+            lo_cond.notify(2)
+
+    # -----------------------------------------------------------------------------------------
+    async def _poll(self, fs_date: str, flst_codes: list, ff_cutoff: float):
+        """
+        polling of the missing METARs of the hour (fl_data_redemet). Each station waiting is
+        started as soon as its METAR arrives, the ones still missing at the cutoff go to the
+        fallback (INMET, METAF)
+
+        :param fs_date (str): date to search
+        :param flst_codes (list): stations missing
+        :param ff_cutoff (float): no request after this time (time.monotonic)
+        """
+        # stations missing
+        llst_missing = list(flst_codes)
+
+        # polling round
+        li_round = 0
+
+        try:
+            # while missing...
+            while llst_missing:
+                # delay of the round
+                lf_delay = rm.redemet_poll_delay(li_round)
+
+                # past the cutoff ?
+                if time.monotonic() + lf_delay > ff_cutoff:
+                    # quit
+                    break
+
+                # wait
+                await asyncio.sleep(lf_delay)
+
+                # request the missing ones again
+                llst_found, llst_missing = await asyncio.get_event_loop().run_in_executor(
+                                               None, rm.redemet_poll_round, fs_date, llst_missing)
+
+                # for all METARs found...
+                for ls_code, _ in llst_found:
+                    # start station
+                    self._poll_done(ls_code)
+
+                # next round
+                li_round += 1
+
+            # logger
+            M_LOG.info("Polling of %s: %d of %d missing METARs arrived.", fs_date,
+                       len(flst_codes) - len(llst_missing), len(flst_codes))
+
+        finally:
+            # for all stations still missing...
+            for ls_code in llst_missing:
+                # start station (fallback)
+                self._poll_done(ls_code)
+
+    # -----------------------------------------------------------------------------------------
+    def _poll_done(self, fs_code: str):
+        """
+        polling of a station done, start it
+
+        :param fs_code (str): station
+        """
+        # station waiting
+        lo_wait = self._dct_polls.get(fs_code, None)
+
+        if lo_wait is not None and not lo_wait.done():
+            # start station
+            lo_wait.set_result(None)
+
+    # -----------------------------------------------------------------------------------------
+    async def _redemet_fetch(self, fs_date: str, fs_location: str):
+        """
+        request do METAR da localidade (REDEMET), salvo no store de fl_data_redemet
+
+        :param fs_date (str): date to search
+        :param fs_location (str): location
+
+        :returns: location data if found else None
+        """
+        # chronically empty location ?
+        if hl.health_skip(hl.DS_HEALTH_REDEMET, fs_location):
+            # return (not requested)
+            return None
+
+        # request de dados horários da estação
+        lf_ini = time.monotonic()
+        ldct_station = await self._get_json_hedged(rm.DS_LOCATION_ENDPOINT,
+                                                   rm.DS_METAR_URL.format(rm.DS_REDEMET_KEY, fs_date, fs_date,
+                                                                          fs_location, 1),
+                                                   de.decode_redemet_metars)
+
+        # METARs list
+        llst_metars = ((ldct_station or {}).get("data", None) or {}).get("data", None)
+
+        # location METAR
+        ls_mens = (llst_metars[-1] or {}).get("mens", None) if llst_metars else None
+
+        # answer ? location health
+        if llst_metars is not None:
+            hl.health_record(hl.DS_HEALTH_REDEMET, fs_location, bool(ls_mens), time.monotonic() - lf_ini)
+
+        if not ls_mens:
+            # logger
+            M_LOG.error("REDEMET station data for %s have no METAR: %s", str(fs_location), str(ldct_station))
+
+            # answer without METARs ? save in store (not found)
+            if llst_metars is not None:
+                rm.redemet_store([(fs_date, fs_location, None)])
+
+            # return with error
+            return None
+
+        # save in store
+        rm.redemet_store([(fs_date, fs_location, ls_mens.strip())])
+
+        # parse METAR
+        return mp.metar_parse(ls_mens.strip())
+
+    # -----------------------------------------------------------------------------------------
+    def _release(self, fo_limit, ff_start: float = None, fv_ok: bool = False, fs_endpoint: str = None):
+        """
+        free the slot of a request (see SAimdLimit.release), the limit wakes the waiting
+        coroutines (see _wake)
+
+        :param fo_limit (SAimdLimit): host limit
+        :param ff_start (float): request start (time.monotonic), None if not requested
+        :param fv_ok (bool): answered (not 429 or 5xx)
+        :param fs_endpoint (str): endpoint name (latency baseline)
+        """
+        # not requested ?
+        if ff_start is None:
+            # free slot
+            fo_limit.cancel()
+
+        # senão,...
+        else:
+            # free slot, adapt limit
+            fo_limit.release(ff_start, fv_ok, fs_endpoint)
+
+    # -----------------------------------------------------------------------------------------
+    async def _single_flight(self, ft_key, f_fetch, *flst_args):
+        """
+        run f_fetch(*flst_args), or wait for the fetch of ft_key already in flight
+
+        :param ft_key (tuple): fetch key
+        :param f_fetch (coroutine function): fetch
+        :param flst_args (list): fetch arguments
+
+        :returns: fetch result
+        """
+        # fetch in flight ?
+        lo_task = self._dct_flights.get(ft_key, None)
+
+        if lo_task is None:
+            # start fetch
+            lo_task = self._dct_flights[ft_key] = asyncio.ensure_future(f_fetch(*flst_args))
+
+            # fetch done (new callers start a new fetch)
+            lo_task.add_done_callback(lambda _: self._dct_flights.pop(ft_key, None))
+
+        # return shared result (a cancelled caller does not cancel the fetch)
+        return await asyncio.shield(lo_task)
+
+    # -----------------------------------------------------------------------------------------
+    def _wake(self, fo_limit):
+        """
+        a slot of the host limit was freed (by a thread or a coroutine, see SAimdLimit.add_waker)
+
+        :param fo_limit (SAimdLimit): host limit
+        """
+        # wake the waiting coroutines
+        asyncio.ensure_future(self._notify(fo_limit))
+
+    # -----------------------------------------------------------------------------------------
+    async def close(self):
+        """
+        wait for the blocking calls and BDC writes and close session and BDC
+        """
+        # for all host limits...
+        for lo_limit, (_, lf_waker) in self._dct_slots.items():
+            # no more wakes (the loop ends)
+            lo_limit.remove_waker(lf_waker)
+
+        # blocking calls still running (cancelled carrapatos), they may queue BDC writes
+        if self._set_blocking:
+            await asyncio.wait(list(self._set_blocking))
+
+        # close BDC
+        await self._o_bdc.close()
+
+        # close session
+        await self._o_session.close()
+
+    # -----------------------------------------------------------------------------------------
+    async def inmet_get_location(self, fs_date: str, fs_station: str):
+        """
+        recupera os dados da localidade (INMET, do disk cache se já buscado). Coroutines da
+        mesma estação e dia esperam por um único request. Falhas (deadline, circuito aberto,
+        erro de transporte) não ficam guardadas, o próximo pedido tenta de novo
+
+        :param fs_date (str): date to search
+        :param fs_station (str): station
+
+        :returns: station data if found else None
+        """
+        # return (one fetch in flight per station day)
+        return await self._single_flight(("inmet", fs_date, fs_station), self._inmet_fetch, fs_date, fs_station)
+
+    # -----------------------------------------------------------------------------------------
+    async def redemet_get_location(self, fs_date: str, fs_location: str):
+        """
+        recupera o METAR da localidade (do store de fl_data_redemet, se já buscado). Coroutines
+        da mesma localidade e data esperam por um único request
+
+        :param fs_date (str): date to search
+        :param fs_location (str): location
+
+        :returns: location data if found else None
+        """
+        # already fetched (found or not) ?
+        lv_stored, lo_metar = rm.redemet_get_stored(fs_date, fs_location)
+
+        if lv_stored:
+            # return
+            return lo_metar
+
+        # return (one fetch in flight per location and date)
+        return await self._single_flight(("redemet", fs_date, fs_location), self._redemet_fetch,
+                                         fs_date, fs_location)
+
+    # -----------------------------------------------------------------------------------------
+    async def run_hour(self, fdt_gmt, fs_station: str):
+        """
+        carrapatos and aeródromos of one hour. In polling mode the stations whose METAR is
+        missing wait for the polling, and start as soon as it arrives (or at the cutoff)
+
+        :param fdt_gmt (datetime): date GMT
+        :param fs_station (str): station (or ????)
+        """
+        # format full date
+        ls_date = fdt_gmt.strftime("%Y%m%d%H")
+
+        # find all stations in directory
+        llst_files = glob.glob("{}/saida_carrapato_{}_{}.txt".format(dr.DS_TICKS_DIR, fs_station, ls_date))
+
+        # METARs of the hour (carrapatos and aeródromos), a few requests for all
+        ldct_metars = await asyncio.get_event_loop().run_in_executor(None, rm.redemet_get_locations, ls_date,
+                                                                     [fl.get_station_code(ls_file)
+                                                                      for ls_file in llst_files] +
+                                                                     list(rm.DDCT_AERODROMOS))
+
+        # stations whose METAR is missing, polled until the cutoff (polling mode)
+        self._dct_polls = {ls_code: asyncio.get_event_loop().create_future()
+                           for ls_code, lo_metar in ldct_metars.items()
+                           if lo_metar is None and not hl.health_skip(hl.DS_HEALTH_REDEMET, ls_code)} \
+                          if self._i_poll > 0 else {}
+
+        # polling task
+        lo_poll = None
+
+        if self._dct_polls:
+            # time left
+            lf_remaining = hp.http_remaining()
+
+            # cutoff of the polling (not past the deadline)
+            lf_cutoff = time.monotonic() + (self._i_poll if lf_remaining is None else min(self._i_poll, lf_remaining))
+
+            # poll (healthy ones first)
+            lo_poll = asyncio.ensure_future(self._poll(ls_date, hl.health_order(hl.DS_HEALTH_REDEMET, self._dct_polls),
+                                                       lf_cutoff))
+
+        # carrapato ok list
+        lset_carrapato_ok = {fl.get_station_code(ls_file) for ls_file in llst_files}
+
+        # remaining aeródromos (chronically empty ones skipped, healthy ones first)
+        llst_codes = hl.health_order(hl.DS_HEALTH_REDEMET,
+                                     [ls_code for ls_code in rm.DDCT_AERODROMOS if ls_code not in lset_carrapato_ok
+                                      and not hl.health_skip(hl.DS_HEALTH_REDEMET, ls_code)])
+
+        # METSAR claims of the carrapatos (the carrapato or the METAF fallback of a missed deadline)
+        llst_claims = [threading.Lock() for _ in llst_files]
+
+        # carrapatos (and the stations they wait for)
+        llst_coros = [self.trata_carrapato(fdt_gmt, ls_file, lo_claim)
+                      for ls_file, lo_claim in zip(llst_files, llst_claims)]
+        llst_waits = [self._dct_polls.get(fl.get_station_code(ls_file), None) for ls_file in llst_files]
+
+        # polling ? aeródromos with the carrapatos (not held back by the ones polled)
+        if self._dct_polls:
+            llst_coros += [self.trata_aerodromo(fdt_gmt, ls_code) for ls_code in llst_codes]
+            llst_waits += [self._dct_polls.get(ls_code, None) for ls_code in llst_codes]
+
+        # trata carrapatos, and aeródromos if polling (until the deadline)
+        llst_tasks = await self._gather_until_deadline(llst_coros, llst_waits)
+
+        # aeródromos tasks (polling)
+        llst_aerodromo_tasks = llst_tasks[len(llst_files):]
+
+        # carrapatos and aeródromos not done by the deadline
+        llst_late_carrapato = []
+        llst_late_aerodromo = []
+
+        # METSAR from METAF of the late carrapatos
+        llst_fallbacks = []
+
+        # for all carrapatos...
+        for ls_file, l_task, lo_claim in zip(llst_files, llst_tasks, llst_claims):
+            # deadline missed ?
+            if l_task.cancelled():
+                # METSAR not claimed by the carrapato (writing in the executor) ?
+                if lo_claim.acquire(blocking=False):
+                    # gera METSAR from METAF (carrapato)
+                    llst_fallbacks.append(self._blocking(mg.make_metsar_from_file,
+                                                         pathlib.PurePath(ls_file).name))
+
+                # save in late list
+                llst_late_carrapato.append(fl.get_station_code(ls_file))
+
+            # carrapato failed ?
+            elif l_task.exception() is not None:
+                # logger
+                M_LOG.error("Carrapato %s error: %s.", ls_file, repr(l_task.exception()))
+
+        # METSARs from METAF (in the executor, together)
+        if llst_fallbacks:
+            await asyncio.gather(*llst_fallbacks)
+
+        # no polling ? trata aeródromos (until the deadline)
+        if not self._dct_polls:
+            llst_aerodromo_tasks = await self._gather_until_deadline([self.trata_aerodromo(fdt_gmt, ls_code)
+                                                                      for ls_code in llst_codes])
+
+        # for all aeródromos...
+        for ls_code, l_task in zip(llst_codes, llst_aerodromo_tasks):
+            # deadline missed ?
+            if l_task.cancelled():
+                # save in late list
+                llst_late_aerodromo.append(ls_code)
+
+            # aeródromo failed ?
+            elif l_task.exception() is not None:
+                # logger
+                M_LOG.error("Aeródromo %s error: %s.", ls_code, repr(l_task.exception()))
+
+        # deadline missed ?
+        if llst_late_carrapato or llst_late_aerodromo:
+            # logger
+            M_LOG.warning("Deadline of %s missed by %d carrapatos (METSAR from METAF): %s and %d aeródromos: %s.",
+                          ls_date, len(llst_late_carrapato), ", ".join(llst_late_carrapato),
+                          len(llst_late_aerodromo), ", ".join(llst_late_aerodromo))
+
+        # polling done
+        if lo_poll is not None:
+            lo_poll.cancel()
+
+            # no station waiting
+            self._dct_polls = {}
+
+        # discard METARs of the hour
+        rm.redemet_forget(ls_date)
+
+        # save stations health
+        hl.health_save()
+
+    # -----------------------------------------------------------------------------------------
+    async def start(self):
+        """
+        create semaphore, HTTP session and BDC
+        """
+        # concurrency semaphore
+        self._o_sem = asyncio.Semaphore(self._i_concurrency)
+
+        # HTTP session (pools of hp sizes, connections traced for fl_metrics)
+        self._o_session = aiohttp.ClientSession(
+                              headers=hp.DDCT_HTTP_HEADERS,
+                              trace_configs=[_trace_config()],
+                              timeout=aiohttp.ClientTimeout(sock_connect=hp.DT_HTTP_TIMEOUT[0],
+                                                            sock_read=hp.DT_HTTP_TIMEOUT[1]),
+                              connector=aiohttp.TCPConnector(limit=self._i_concurrency,
+                                                             limit_per_host=min(self._i_concurrency,
+                                                                                hp.DI_HTTP_POOL_MAX)))
+
+        # connect BDC
+        self._o_bdc = SAsyncBDC()
+        await self._o_bdc.start()
+
+    # -----------------------------------------------------------------------------------------
+    async def trata_aerodromo(self, fdt_gmt, fs_icao_code: str):
+        """
+        trata aerodromo
+
+        :param fdt_gmt (datetime): date GMT
+        :param fs_icao_code (str): ICAO code
+        """
+        # build date
+        ls_date = fdt_gmt.strftime("%Y%m%d%H")
+
+        # try to get data from REDEMET
+        lo_metar = await self.redemet_get_location(ls_date, fs_icao_code)
+
+        if lo_metar:
+            # save to BDC
+            sb.bdc_save_metar(fdt_gmt, lo_metar, self._o_bdc)
+
+            # save METAR to file
+            await self._blocking(fl.save_metar, "metar_{}_{}.txt".format(fs_icao_code, ls_date),
+                                 lo_metar.s_metar_mesg)
+
+            # output filename
+            ls_out = "saida_frontline_{}_{}.txt".format(fs_icao_code, ls_date)
+
+            # make METSAR from REDEMET data
+            await self._blocking(mg.make_metsar_from_metar, fdt_gmt, ls_out, fs_icao_code, lo_metar,
+                                 self._o_bdc)
+
+        # senão,...
+        else:
+            # logger
+            M_LOG.error("METAR for %s at %s not found. Skipping.", fs_icao_code, ls_date)
+
+    # -----------------------------------------------------------------------------------------
+    async def trata_carrapato(self, fdt_gmt, fs_file: str, fo_claim=None):
+        """
+        trata carrapato. REDEMET first, INMET (closest station) on a miss. In speculative mode
+        the INMET lookup starts with the REDEMET one when the location is not fetched yet (a
+        stored miss goes straight to INMET), and is cancelled on a REDEMET hit (a fetch in
+        flight still fills the INMET data)
+
+        :param fdt_gmt (datetime): date GMT
+        :param fs_file (str): carrapato filename
+        :param fo_claim (Lock): METSAR claim, shared with the METAF fallback of a missed deadline
+        """
+        # get metaf data
+        lo_metaf = await self._blocking(mp.metar_parse_file, fs_file)
+        assert lo_metaf
+
+        # save to BDC
+        sb.bdc_save_metaf(fdt_gmt, lo_metaf, self._o_bdc)
+
+        # filename
+        ls_fname = pathlib.PurePath(fs_file).name
+
+        # icao code
+        ls_icao_code = fl.get_station_code(ls_fname)
+
+        # build date
+        ls_date = fdt_gmt.strftime("%Y%m%d%H")
+
+        # format date
+        ls_dia = fdt_gmt.strftime("%Y-%m-%d")
+
+        # closest station (searched on a REDEMET miss) and INMET lookup (started ahead)
+        lt_near = None
+        lo_inmet = None
+
+        # speculative and not fetched yet (a REDEMET request to overlap) ?
+        if self._v_speculative and not rm.redemet_get_stored(ls_date, ls_icao_code)[0]:
+            # get closest station
+            lt_near = await self._blocking(ll.find_near_station, ls_icao_code)
+
+            if lt_near[0]:
+                # INMET lookup, concurrent with REDEMET
+                lo_inmet = asyncio.ensure_future(self.inmet_get_location(ls_dia, lt_near[0]))
+
+        try:
+            # try to get data from REDEMET
+            lo_metar = await self.redemet_get_location(ls_date, ls_icao_code)
+
+        # em caso de erro (cancelled),...
+        except BaseException:
+            # INMET lookup not needed
+            if lo_inmet is not None:
+                lo_inmet.cancel()
+
+            # re-raise
+            raise
+
+        if lo_metar:
+            # INMET lookup not needed
+            if lo_inmet is not None:
+                lo_inmet.cancel()
+
+            # METSAR made by the fallback (deadline missed) ?
+            if not fl.claim_metsar(fo_claim, ls_fname):
+                # quit
+                return
+
+            # save to BDC
+            sb.bdc_save_metar(fdt_gmt, lo_metar, self._o_bdc)
+
+            # save METAR to file
+            await self._blocking(fl.save_metar, "metar_{}_{}.txt".format(ls_icao_code, ls_date),
+                                 lo_metar.s_metar_mesg)
+
+            # output filename
+            ls_out = ls_fname.replace("carrapato", "frontline")
+
+            # make METSAR from REDEMET data
+            await self._blocking(mg.ensamble_metar_metaf, fdt_gmt, ls_out, ls_icao_code, lo_metar, lo_metaf,
+                                 self._o_bdc)
+
+            # quit
+            return
+
+        # estação não encontrada na REDEMET. Tenta INMET, get closest station (if not searched yet)
+        ls_station, lf_altitude = lt_near or await self._blocking(ll.find_near_station, ls_icao_code)
+
+        if ls_station:
+            # try to get data from INMET (started ahead in speculative mode)
+            llst_station_data = await (lo_inmet if lo_inmet is not None else
+                                       self.inmet_get_location(ls_dia, ls_station))
+
+            # METSAR made by the fallback (deadline missed) ?
+            if not fl.claim_metsar(fo_claim, ls_fname):
+                # quit
+                return
+
+            if llst_station_data:
+                # make METSAR from station data
+                await self._blocking(mg.ensamble_station_data_metaf, fdt_gmt, ls_fname, ls_icao_code,
+                                     llst_station_data, lf_altitude, lo_metaf, self._o_bdc)
+
+            # senão,...
+            else:
+                # logger
+                M_LOG.error("Data for %s not found. METSAR from METAF (carrapato).", ls_station)
+
+                # gera METSAR from METAF (carrapato)
+                await self._blocking(mg.make_metsar_from_file, ls_fname)
+
+        # METSAR made by the fallback (deadline missed) ?
+        elif not fl.claim_metsar(fo_claim, ls_fname):
+            # quit
+            return
+
+        # senão,...
+        else:
+            # logger
+            M_LOG.error("Near station from %s not found or too far. METSAR from METAF (carrapato).", ls_icao_code)
+
+            # gera METSAR from METAF (carrapato)
+            await self._blocking(mg.make_metsar_from_file, ls_fname)
+
+# ---------------------------------------------------------------------------------------------
+async def _run(fdt_ini, fi_delta: int, fs_station: str, fi_concurrency: int, fi_budget: int, fi_hedges: int,
+               fv_speculative: bool, fi_poll: int):
+    """
+    hourly cycle of the date range
+
+    :param fdt_ini (datetime): initial date GMT
+    :param fi_delta (int): hours
+    :param fs_station (str): station (or ????)
+    :param fi_concurrency (int): carrapatos/aeródromos in progress at the same time
+    :param fi_budget (int): deadline of each hourly cycle (s)
+    :param fi_hedges (int): hedged requests of each hourly cycle
+    :param fv_speculative (bool): INMET lookup of a carrapato concurrent with REDEMET
+    :param fi_poll (int): poll the missing METARs up to this many seconds into the hour (0 for no polling)
+    """
+    # create engine
+    lo_engine = SAsyncEngine(fi_concurrency, fv_speculative, fi_poll)
+    await lo_engine.start()
+
+    try:
+        # for all dates...
+        for li_hour in range(fi_delta):
+            # date
+            ldt_gmt = fdt_ini + datetime.timedelta(hours=li_hour)
+
+            # logger
+            M_LOG.info("Processando, estação: %s data: %s.", fs_station, ldt_gmt.strftime("%Y%m%d%H"))
+
+            # backfill, first hour of a chunk ?
+            if fi_delta > 1 and 0 == li_hour % rm.DI_METAR_HOURS:
+                # METARs of the chunk, one request per station (discarded hour by hour)
+                await asyncio.get_event_loop().run_in_executor(None, fl.get_backfill, ldt_gmt,
+                                                               min(rm.DI_METAR_HOURS, fi_delta - li_hour),
+                                                               fs_station, list(rm.DDCT_AERODROMOS))
+
+            # deadline of the hour (requests stop there too)
+            hp.http_deadline(time.monotonic() + fi_budget)
+
+            # hedges of the hour
+            hp.http_hedges(fi_hedges)
+
+            # carrapatos and aeródromos of the hour
+            await lo_engine.run_hour(ldt_gmt, fs_station)
+
+            # hour done (the backfill of the next chunk has no deadline)
+            hp.http_deadline(None)
+
+            # logger
+            M_LOG.info("HTTP latencies (samples, p50, p95, p99): %s, hedges: %d, limits: %s.",
+                       str(hp.http_latency_report()), hp.http_hedges_used(),
+                       str(hp.http_limits()))
+
+    finally:
+        # no deadline
+        hp.http_deadline(None)
+
+        # close engine (pending BDC writes)
+        await lo_engine.close()
+
+# ---------------------------------------------------------------------------------------------
+def _trace_config():
+    """
+    trace of the session connections: each request counted in fl_metrics with its host and
+    whether it opened a new connection or reused a pooled one
+
+    :returns: TraceConfig
+    """
+    # trace
+    lo_trace = aiohttp.TraceConfig()
+
+    # -----------------------------------------------------------------------------------------
+    async def _on_start(f_session, f_ctx, f_params):
+        # host, no new connection yet
+        f_ctx.host = f_params.url.host
+        f_ctx.new = 0
+
+    # -----------------------------------------------------------------------------------------
+    async def _on_create(f_session, f_ctx, f_params):
+        # new connection
+        f_ctx.new = 1
+
+    # -----------------------------------------------------------------------------------------
+    async def _on_end(f_session, f_ctx, f_params):
+        # save request
+        fm.metrics_connections(f_ctx.host, 1, f_ctx.new)
+
+    # callbacks
+    lo_trace.on_request_start.append(_on_start)
+    lo_trace.on_connection_create_end.append(_on_create)
+    lo_trace.on_request_end.append(_on_end)
+    lo_trace.on_request_exception.append(_on_end)
+
+    # return
+    return lo_trace
+
+# ---------------------------------------------------------------------------------------------
+def run(fdt_ini, fi_delta: int, fs_station: str, fi_concurrency: int = DI_ASYNC_CONCURRENCY,
+        fi_budget: int = df.DI_HOUR_BUDGET, fi_hedges: int = hp.DI_HEDGE_MAX, fv_speculative: bool = False,
+        fi_poll: int = 0):
+    """
+    run the hourly cycle of the date range in the asyncio engine
+
+    :param fdt_ini (datetime): initial date GMT
+    :param fi_delta (int): hours
+    :param fs_station (str): station (or ????)
+    :param fi_concurrency (int): carrapatos/aeródromos in progress at the same time
+    :param fi_budget (int): deadline of each hourly cycle (s)
+    :param fi_hedges (int): hedged requests of each hourly cycle
+    :param fv_speculative (bool): INMET lookup of a carrapato concurrent with REDEMET
+    :param fi_poll (int): poll the missing METARs up to this many seconds into the hour (0 for no polling)
+    """
+    # run
+    asyncio.run(_run(fdt_ini, fi_delta, fs_station, fi_concurrency, fi_budget, fi_hedges, fv_speculative,
+                     fi_poll))
+
+# < the end >----------------------------------------------------------------------------------
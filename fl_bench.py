@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+"""
+fl_bench
+
+micro-benchmark of the METAR parser and of the METSAR group builders over the corpus in
+bench/. Results are saved as JSON to compare parser changes across releases. With -t the
+lazy decoding of reports shared by threads (parse cache) is checked instead
+
+2026.oct  mlabru  threaded check of the lazy decoding of shared reports (-t)
+2026.oct  mlabru  INMET day decoding cases (json vs fl_decode)
+2026.oct  mlabru  initial version (Linux/Python)
+"""
+# < imports >----------------------------------------------------------------------------------
+
+# python library
+import argparse
+import datetime
+import json
+import logging
+import os
+import pathlib
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+# local
+import fl_decode as de
+import fl_defs as df
+import fl_metar_parser as mp
+import fl_metsar_gen as mg
+
+# < constants >--------------------------------------------------------------------------------
+
+# benchmark directory
+DS_BENCH_DIR = pathlib.PurePath(__file__).parent.joinpath("bench")
+
+# METAR/METAF corpus (one report per line)
+DS_CORPUS_FILE = str(DS_BENCH_DIR.joinpath("metar_corpus.txt"))
+
+# INMET station day (station registers for the grp_* builders)
+DS_STATION_FILE = str(DS_BENCH_DIR.joinpath("inmet_station_day.json"))
+
+# timed passes over the corpus per repeat
+DI_ROUNDS = 20
+
+# repeats (best one is reported)
+DI_REPEAT = 5
+
+# threaded check: threads reading the same reports and rounds (fresh reports each round)
+DI_CHECK_THREADS = 4
+DI_CHECK_ROUNDS = 3000
+
+# < logging >----------------------------------------------------------------------------------
+
+# logger
+M_LOG = logging.getLogger(__name__)
+M_LOG.setLevel(df.DI_LOG_LEVEL)
+
+# ---------------------------------------------------------------------------------------------
+def arg_parse():
+    """
+    parse command line arguments
+    arguments parse: <output file> <baseline file> <rounds> <repeat>
+
+    :returns: arguments
+    """
+    # create parser
+    l_parser = argparse.ArgumentParser(description="Frontline parser benchmark.")
+    assert l_parser
+
+    # args
+    l_parser.add_argument("-o", "--output", dest="output", action="store",
+                          default="fl_bench_{}.json".format(datetime.datetime.now().strftime("%Y%m%d-%H%M%S")),
+                          help="JSON results file.")
+    l_parser.add_argument("-c", "--compare", dest="compare", action="store", default=None,
+                          help="JSON results file of a previous run to compare with.")
+    l_parser.add_argument("-r", "--rounds", dest="rounds", action="store", type=int, default=DI_ROUNDS,
+                          help="Passes over the corpus per repeat.")
+    l_parser.add_argument("-n", "--repeat", dest="repeat", action="store", type=int, default=DI_REPEAT,
+                          help="Repeats (best one is reported).")
+    l_parser.add_argument("-t", "--threads", dest="threads", action="store", type=int, default=0,
+                          help="Check the lazy decoding of reports shared by this many threads (no benchmark).")
+
+    # return arguments
+    return l_parser.parse_args()
+
+# ---------------------------------------------------------------------------------------------
+def bench_case(f_pass, fi_calls: int, fi_rounds: int, fi_repeat: int, f_setup=None):
+    """
+    time one benchmark case and measure its allocations
+
+    :param f_pass (callable): one pass over the corpus
+    :param fi_calls (int): calls (messages) per pass
+    :param fi_rounds (int): passes per repeat
+    :param fi_repeat (int): repeats
+    :param f_setup (callable): run before each pass, not timed
+
+    :returns: dict with the case results
+    """
+    # best time of one pass
+    lf_best = float("inf")
+
+    # for all repeats...
+    for _ in range(fi_repeat):
+        # total time
+        lf_total = 0.
+
+        # for all rounds...
+        for _ in range(fi_rounds):
+            # setup
+            if f_setup is not None:
+                f_setup()
+
+            # timed pass
+            lf_ini = time.perf_counter()
+            f_pass()
+            lf_total += time.perf_counter() - lf_ini
+
+        # best pass
+        lf_best = min(lf_best, lf_total / fi_rounds)
+
+    # setup
+    if f_setup is not None:
+        f_setup()
+
+    # traced pass
+    tracemalloc.start()
+    f_pass()
+    li_current, li_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # return
+    return {"calls": fi_calls,
+            "pass_ms": round(lf_best * 1000., 4),
+            "per_call_us": round(lf_best * 1e6 / fi_calls, 4),
+            "calls_per_s": round(fi_calls / lf_best, 1),
+            "alloc_peak_bytes_per_call": round(li_peak / fi_calls, 1),
+            "alloc_retained_bytes_per_call": round(li_current / fi_calls, 1)}
+
+# ---------------------------------------------------------------------------------------------
+def check_threads(fi_threads: int = DI_CHECK_THREADS, fi_rounds: int = DI_CHECK_ROUNDS):
+    """
+    threads read the fields of the same freshly parsed reports at the same time (as the
+    reports handed out by the parse cache) and compare them with a single-thread decoding
+
+    :param fi_threads (int): threads
+    :param fi_rounds (int): rounds (fresh reports each round)
+
+    :returns: number of errors (exceptions or wrong fields)
+    """
+    # corpus
+    llst_mesg = load_corpus()
+
+    # expected fields (single thread)
+    llst_expected = [read_fields(mp.SMetar(ls_mesg)) for ls_mesg in llst_mesg]
+
+    # reports of the round
+    llst_round = []
+
+    # errors
+    llst_errors = []
+
+    # all threads start each round together
+    lo_barrier = threading.Barrier(fi_threads + 1)
+
+    # -----------------------------------------------------------------------------------------
+    def _reader(fi_thread: int):
+        # for all rounds...
+        for _ in range(fi_rounds):
+            # wait for the reports
+            lo_barrier.wait()
+
+            # for all reports (each thread from a different start)...
+            for li_pos in range(len(llst_round)):
+                # report
+                li_ndx = (li_pos + fi_thread * len(llst_round) // fi_threads) % len(llst_round)
+
+                try:
+                    # wrong fields ?
+                    if read_fields(llst_round[li_ndx]) != llst_expected[li_ndx]:
+                        llst_errors.append("{}: wrong fields".format(llst_mesg[li_ndx]))
+
+                # em caso de erro,...
+                except Exception as l_err:
+                    # save error
+                    llst_errors.append("{}: {!r}".format(llst_mesg[li_ndx], l_err))
+
+            # round done
+            lo_barrier.wait()
+
+    # switch threads often (more interleavings)
+    lf_switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    # readers
+    llst_threads = [threading.Thread(target=_reader, args=(li_thread,)) for li_thread in range(fi_threads)]
+
+    for lo_thread in llst_threads:
+        lo_thread.start()
+
+    # for all rounds...
+    for _ in range(fi_rounds):
+        # fresh reports (nothing split or decoded)
+        llst_round[:] = [mp.SMetar(ls_mesg) for ls_mesg in llst_mesg]
+
+        # start and wait for the readers
+        lo_barrier.wait()
+        lo_barrier.wait()
+
+    # wait readers
+    for lo_thread in llst_threads:
+        lo_thread.join()
+
+    # switch interval
+    sys.setswitchinterval(lf_switch)
+
+    # for all errors (first ones)...
+    for ls_error in llst_errors[:10]:
+        # logger
+        M_LOG.error("Threaded check: %s.", ls_error)
+
+    # return
+    return len(llst_errors)
+
+# ---------------------------------------------------------------------------------------------
+def load_corpus(fs_file: str = DS_CORPUS_FILE):
+    """
+    load the METAR/METAF corpus
+
+    :param fs_file (str): corpus filename
+
+    :returns: list of messages
+    """
+    # open corpus
+    with open(fs_file, "r") as lfh_in:
+        # one report per line (no blanks or comments)
+        return [ls_line.strip() for ls_line in lfh_in
+                if ls_line.strip() and not ls_line.startswith('#')]
+
+# ---------------------------------------------------------------------------------------------
+def load_station_data(fs_file: str = DS_STATION_FILE):
+    """
+    load the INMET station day
+
+    :param fs_file (str): station data filename
+
+    :returns: list of station registers
+    """
+    # open station data
+    with open(fs_file, "r") as lfh_in:
+        # return
+        return json.load(lfh_in)
+
+# ---------------------------------------------------------------------------------------------
+def read_fields(fo_metar):
+    """
+    read the fields used to build a METSAR (forces the lazy decoding)
+
+    :param fo_metar (SMetar): parsed report
+    """
+    # return
+    return (fo_metar.s_icao_code, fo_metar.s_forecast_time,
+            fo_metar.s_wind, fo_metar.s_wind_var, fo_metar.i_wind_dir, fo_metar.i_wind_vel_kt,
+            fo_metar.i_gust_kt, fo_metar.s_visibility, fo_metar.i_visibility, fo_metar.v_cavok,
+            fo_metar.s_temperature, fo_metar.i_temperature_c, fo_metar.i_dewpoint_c,
+            fo_metar.s_pressure, fo_metar.i_pressure_hpa)
+
+# ---------------------------------------------------------------------------------------------
+def run_bench(fi_rounds: int = DI_ROUNDS, fi_repeat: int = DI_REPEAT):
+    """
+    run all benchmark cases
+
+    :param fi_rounds (int): passes over the corpus per repeat
+    :param fi_repeat (int): repeats
+
+    :returns: dict with the results
+    """
+    # corpus
+    llst_mesg = load_corpus()
+    li_mesg = len(llst_mesg)
+
+    # station registers paired with the parsed reports
+    llst_regs = load_station_data()
+    llst_pairs = [(llst_regs[li_ndx % len(llst_regs)], mp.SMetar(ls_mesg))
+                  for li_ndx, ls_mesg in enumerate(llst_mesg)]
+
+    # only reports with wind direction, temperature and pressure (as the carrapatos)
+    llst_pairs = [(ldct_reg, lo_metaf) for ldct_reg, lo_metaf in llst_pairs
+                  if lo_metaf.i_wind_dir is not None and lo_metaf.i_temperature_c is not None
+                  and lo_metaf.i_pressure_hpa is not None]
+    li_pairs = len(llst_pairs)
+
+    # results
+    ldct_results = {}
+
+    # -----------------------------------------------------------------------------------------
+    def _metar_parse():
+        for ls_mesg in llst_mesg:
+            read_fields(mp.metar_parse(ls_mesg))
+
+    # parse, cold cache
+    ldct_results["metar_parse"] = bench_case(_metar_parse, li_mesg, fi_rounds, fi_repeat,
+                                             mp.M_PARSE_CACHE.clear)
+
+    # parse, warm cache
+    mp.M_PARSE_CACHE.clear()
+    _metar_parse()
+    ldct_results["metar_parse_cached"] = bench_case(_metar_parse, li_mesg, fi_rounds, fi_repeat)
+
+    # -----------------------------------------------------------------------------------------
+    def _smetar_raw():
+        for ls_mesg in llst_mesg:
+            read_fields(mp.SMetar(ls_mesg))
+
+    # parser alone (no cache)
+    ldct_results["SMetar"] = bench_case(_smetar_raw, li_mesg, fi_rounds, fi_repeat)
+
+    # -----------------------------------------------------------------------------------------
+    def _metar_parse_many():
+        mp.metar_parse_many(llst_mesg)
+
+    # columnar batch
+    ldct_results["metar_parse_many"] = bench_case(_metar_parse_many, li_mesg, fi_rounds, fi_repeat)
+
+    # one report per file (carrapato layout)
+    with tempfile.TemporaryDirectory() as ls_dir:
+        # files
+        llst_files = []
+
+        # for all messages...
+        for li_ndx, ls_mesg in enumerate(llst_mesg):
+            # file name
+            ls_file = os.path.join(ls_dir, "saida_carrapato_{:04d}.txt".format(li_ndx))
+
+            # save message
+            with open(ls_file, "w") as lfh_out:
+                lfh_out.write(ls_mesg)
+
+            # save file name
+            llst_files.append(ls_file)
+
+        # -------------------------------------------------------------------------------------
+        def _metar_parse_file():
+            for ls_file in llst_files:
+                read_fields(mp.metar_parse_file(ls_file))
+
+        # parse file, cold cache
+        ldct_results["metar_parse_file"] = bench_case(_metar_parse_file, li_mesg, fi_rounds, fi_repeat,
+                                                      mp.M_PARSE_CACHE.clear)
+
+    # METSAR group builders
+    for ls_name, lf_grp in (("grp_clouds", lambda ldct_reg, lo_metaf: mg.grp_clouds(ldct_reg)),
+                            ("grp_qnh", lambda ldct_reg, lo_metaf: mg.grp_qnh(ldct_reg, 760., lo_metaf)),
+                            ("grp_temp", mg.grp_temp),
+                            ("grp_time", lambda ldct_reg, lo_metaf: mg.grp_time(ldct_reg)),
+                            ("grp_vis", lambda ldct_reg, lo_metaf: mg.grp_vis(lo_metaf)),
+                            ("grp_wind", mg.grp_wind)):
+        # -------------------------------------------------------------------------------------
+        def _grp(lf_grp=lf_grp):
+            for ldct_reg, lo_metaf in llst_pairs:
+                lf_grp(ldct_reg, lo_metaf)
+
+        # group builder
+        ldct_results[ls_name] = bench_case(_grp, li_pairs, fi_rounds, fi_repeat)
+
+    # INMET station day (raw answer)
+    with open(DS_STATION_FILE, "rb") as lfh_in:
+        lb_day = lfh_in.read()
+
+    # -----------------------------------------------------------------------------------------
+    def _inmet_day_json():
+        json.loads(lb_day)
+
+    # decode into dicts
+    ldct_results["inmet_day_json"] = bench_case(_inmet_day_json, len(llst_regs), fi_rounds, fi_repeat)
+
+    # -----------------------------------------------------------------------------------------
+    def _inmet_day_decode():
+        de.decode_inmet_day(lb_day)
+
+    # decode into slim records
+    ldct_results["inmet_day_decode"] = bench_case(_inmet_day_decode, len(llst_regs), fi_rounds, fi_repeat)
+
+    # return
+    return {"date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": {"file": pathlib.PurePath(DS_CORPUS_FILE).name, "messages": li_mesg},
+            "rounds": fi_rounds,
+            "repeat": fi_repeat,
+            "results": ldct_results}
+
+# ---------------------------------------------------------------------------------------------
+def main():
+    """
+    main
+    """
+    # get program arguments
+    l_args = arg_parse()
+
+    # threaded check ?
+    if l_args.threads > 0:
+        # check
+        li_errors = check_threads(l_args.threads)
+
+        # report
+        print("threaded check: {} threads, {} rounds, {} errors".format(l_args.threads, DI_CHECK_ROUNDS,
+                                                                       li_errors))
+
+        # return (error status if any error)
+        return 1 if li_errors else 0
+
+    # run
+    ldct_bench = run_bench(l_args.rounds, l_args.repeat)
+
+    # baseline
+    ldct_base = {}
+
+    if l_args.compare:
+        # load previous run
+        with open(l_args.compare, "r") as lfh_in:
+            ldct_base = json.load(lfh_in).get("results", {})
+
+    # for all cases...
+    for ls_name, ldct_res in ldct_bench["results"].items():
+        # previous run of this case
+        ldct_old = ldct_base.get(ls_name, None)
+
+        # speedup
+        ls_cmp = "" if ldct_old is None else "  x{:.2f}".format(ldct_old["per_call_us"] / ldct_res["per_call_us"])
+
+        # report
+        print("{:<20} {:>12.1f} calls/s {:>10.2f} us/call {:>10.1f} B/call{}".format(
+              ls_name, ldct_res["calls_per_s"], ldct_res["per_call_us"],
+              ldct_res["alloc_peak_bytes_per_call"], ls_cmp))
+
+    # save results
+    with open(l_args.output, "w") as lfh_out:
+        json.dump(ldct_bench, lfh_out, indent=2)
+
+    # logger
+    M_LOG.info("Benchmark results saved to %s.", l_args.output)
+
+# ---------------------------------------------------------------------------------------------
+# this is the bootstrap process
+
+if "__main__" == __name__:
+    # logger
+    logging.basicConfig(level=logging.WARNING)
+
+    # run application
+    sys.exit(main())
+
+# < the end >----------------------------------------------------------------------------------
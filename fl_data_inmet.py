@@ -2,64 +2,161 @@
 """
 fl_data_inmet
 
+2026.oct  mlabru  no lru_cache on inmet_get_location, failures not kept (disk cache TTLs apply)
+2026.oct  mlabru  concurrent requests of a station day coalesced (single-flight)
+2026.oct  mlabru  station health: dead stations skipped and re-probed (fl_health)
+2026.oct  mlabru  typed decoding into slim records (fl_decode), slim disk cache entries
+2026.oct  mlabru  station days backed by the disk cache (shared by processes and reruns)
+2026.oct  mlabru  requests through the shared pooled session (fl_http)
 2021.jul  mlabru  initial version (Linux/Python)
 """
 # < imports >----------------------------------------------------------------------------------
 
 # python library
-import functools
-import json
+import datetime
 import logging
-import requests
 
 # local
+import fl_decode as de
 import fl_defs as df
+import fl_disk_cache as dc
+import fl_health as hl
+import fl_http as hp
 
 # < constants >--------------------------------------------------------------------------------
 
 # INMET
 DS_INMET_URL = "https://apitempo.inmet.gov.br/estacao/{0}/{0}/{1}"
 
+# disk cache endpoint of station days (key date/station)
+DS_CACHE_STATION = "inmet_station"
+
 # < logging >----------------------------------------------------------------------------------
 
 # logger
 M_LOG = logging.getLogger(__name__)
 M_LOG.setLevel(df.DI_LOG_LEVEL)
 
+# < local data >-------------------------------------------------------------------------------
+
+# station day requests in flight
+M_FLIGHT = hp.SSingleFlight()
+
 # ---------------------------------------------------------------------------------------------
-@functools.lru_cache(maxsize=2048)
-def inmet_get_location(fs_date: str, fs_station: str):
+def _inmet_fetch(fs_date: str, fs_station: str):
     """
-    recupera os dados da localidade
+    recupera os dados da localidade (do disk cache, se já buscado), sem coalescing
 
     :param fs_date (str): date to search
     :param fs_station (str): station
 
-    :returns: station data if found else None
+    :returns: station data (list of SInmetReg) if found else None
     """
+    # already fetched ?
+    lv_hit, l_ans = inmet_get_cached(fs_date, fs_station)
+
+    if lv_hit:
+        # return data
+        return l_ans
+
+    # dead station ?
+    if hl.health_skip(hl.DS_HEALTH_INMET, fs_station):
+        # logger
+        M_LOG.debug("INMET station %s skipped (chronically empty).", str(fs_station))
+
+        # return (not requested)
+        return None
+
     # request de dados horários da estação
-    l_response = requests.get(DS_INMET_URL.format(fs_date, fs_station))
+    l_response = hp.http_get("inmet_station", DS_INMET_URL.format(fs_date, fs_station))
 
     # ok ?
-    if 200 == l_response.status_code:
+    if l_response is not None and 200 == l_response.status_code:
         try:
-            # decode data
-            l_ans = json.loads(l_response.text)
+            # decode data (slim records)
+            l_ans = de.decode_inmet_day(l_response.content)
+
+            # save in disk cache (slim)
+            inmet_store(fs_date, fs_station, de.encode_records(l_ans), bool(l_ans))
+
+            # station health
+            hl.health_record(hl.DS_HEALTH_INMET, fs_station, bool(l_ans), l_response.elapsed.total_seconds())
 
             # return data
             return l_ans
 
         # em caso de erro...
-        except json.decoder.JSONDecodeError as l_err:
+        except de.DT_DECODE_ERRORS as l_err:
             # logger
             M_LOG.error("INMET station data decoding error: %s.", l_err)
 
     # senão,...
     else:
         # logger
-        M_LOG.error("INMET station data for %s not found. Code: %s", str(fs_station), str(l_response.status_code))
+        M_LOG.error("INMET station data for %s not found. Code: %s", str(fs_station),
+                    str(l_response.status_code if l_response is not None else None))
 
     # return error
     return None
 
+# ---------------------------------------------------------------------------------------------
+def inmet_get_cached(fs_date: str, fs_station: str):
+    """
+    dados da localidade no disk cache (sem request)
+
+    :param fs_date (str): date (YYYY-mm-dd)
+    :param fs_station (str): station
+
+    :returns: (hit, station data (list of SInmetReg) or None)
+    """
+    # disk cache
+    lv_hit, ls_text = dc.cache_get(DS_CACHE_STATION, dc.cache_key(fs_date, fs_station))
+
+    if not lv_hit or ls_text is None:
+        # return
+        return lv_hit, None
+
+    try:
+        # decode data
+        return True, de.decode_inmet_day(ls_text)
+
+    # em caso de erro...
+    except de.DT_DECODE_ERRORS as l_err:
+        # logger
+        M_LOG.error("INMET cached station data decoding error: %s.", l_err)
+
+    # miss
+    return False, None
+
+# ---------------------------------------------------------------------------------------------
+def inmet_get_location(fs_date: str, fs_station: str):
+    """
+    recupera os dados da localidade (do disk cache, se já buscado). Chamadas simultâneas da
+    mesma estação e dia esperam por um único request. Falhas (deadline, circuito aberto, erro
+    de transporte) não ficam guardadas, o próximo pedido tenta de novo
+
+    :param fs_date (str): date to search
+    :param fs_station (str): station
+
+    :returns: station data (list of SInmetReg) if found else None
+    """
+    # return (one fetch in flight per station day)
+    return M_FLIGHT.do((fs_date, fs_station), _inmet_fetch, fs_date, fs_station)
+
+# ---------------------------------------------------------------------------------------------
+def inmet_store(fs_date: str, fs_station: str, fs_text: str, fv_found: bool = True):
+    """
+    save station data in the disk cache (TTL by the age of the day)
+
+    :param fs_date (str): date (YYYY-mm-dd)
+    :param fs_station (str): station
+    :param fs_text (str): station data (JSON)
+    :param fv_found (bool): data found (not empty)
+    """
+    # end of the day
+    ldt_end = datetime.datetime.strptime(fs_date, "%Y-%m-%d") + datetime.timedelta(days=1)
+
+    # save in disk cache
+    dc.cache_put(DS_CACHE_STATION, dc.cache_key(fs_date, fs_station), fs_text, dc.cache_ttl(ldt_end, fv_found))
+
 # < the end >----------------------------------------------------------------------------------
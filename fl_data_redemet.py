@@ -2,20 +2,38 @@
 """
 fl_data_redemet
 
+2026.oct  mlabru  single location requests under their own endpoint (DS_LOCATION_ENDPOINT)
+2026.oct  mlabru  redemet_get_range requests in parallel (DI_RANGE_WORKERS)
+2026.oct  mlabru  redemet_poll, missing METARs re-requested on a backoff schedule after the hour
+2026.oct  mlabru  single location requests hedged (tail latency, fl_http)
+2026.oct  mlabru  concurrent requests of a location coalesced (single-flight)
+2026.oct  mlabru  station health: chronically empty locations skipped and re-probed (fl_health)
+2026.oct  mlabru  typed decoding into slim records (fl_decode)
+2026.oct  mlabru  METARs store backed by the disk cache (shared by processes and reruns)
+2026.oct  mlabru  redemet_get_stored, METAR store lookup without request
+2026.oct  mlabru  redemet_get_range, one request per station and date window (backfill)
+2026.oct  mlabru  redemet_get_locations, many locations per request (per hour store)
+2026.oct  mlabru  requests through the shared pooled session (fl_http)
 2021.jul  mlabru  initial version (Linux/Python)
 """
 # < imports >----------------------------------------------------------------------------------
 
 # python library
-import json
+import concurrent.futures
+import datetime
 import logging
 import os
-import requests
+import threading
+import time
 
 # dotenv
 import dotenv
 
 # local
+import fl_decode as de
+import fl_disk_cache as dc
+import fl_health as hl
+import fl_http as hp
 import fl_metar_parser as mp
 
 # < environment >------------------------------------------------------------------------------
@@ -31,8 +49,31 @@ DS_REDEMET_KEY = os.getenv("DS_REDEMET_KEY")
 # REDEMET
 DS_REDEMET_URL = "https://api-redemet.decea.mil.br/"
 
-# METAR
-DS_METAR_URL = DS_REDEMET_URL + "mensagens/metar/{2}?api_key={0}&data_ini={1}&data_fim={1}"
+# METAR (one or many comma-separated locations, date window and answer page)
+DS_METAR_URL = DS_REDEMET_URL + "mensagens/metar/{3}?api_key={0}&data_ini={1}&data_fim={2}&page={4}"
+
+# locations per METAR request (the answer of one hour must fit in one page of 150 messages,
+# counting SPECIs)
+DI_METAR_LOCATIONS = 50
+
+# hours per METAR request of one location in a date window (pages are followed)
+DI_METAR_HOURS = 7 * 24
+
+# requests of a date window at the same time (still bounded by the host limits of fl_http)
+DI_RANGE_WORKERS = 8
+
+# polling of the missing METARs of an hour: first re-request after, doubled each round, and
+# cap (s)
+DF_POLL_BASE = 60.
+DF_POLL_MAX = 300.
+
+# disk cache endpoint of METARs (key date/location)
+DS_CACHE_METAR = "redemet_metar"
+
+# endpoint of the requests of one location and hour (own latency percentiles: the hedge delay
+# is not driven by the slower many locations and window requests of "redemet_metar")
+DS_LOCATION_ENDPOINT = "redemet_location"
+
 # aeródromos
 DS_AERODROMOS_URL = DS_REDEMET_URL + "aerodromos/?api_key={0}&pais=Brasil"
 
@@ -47,18 +88,27 @@ M_LOG.setLevel(logging.WARNING)
 # aeródromos dictionary
 DDCT_AERODROMOS = {}
 
+# METARs fetched by redemet_get_locations/redemet_get_range ({date: {location: message or None}})
+M_METAR_STORE = {}
+
+# METARs store guard
+M_STORE_LOCK = threading.Lock()
+
+# METAR requests in flight (single location)
+M_FLIGHT = hp.SSingleFlight()
+
 # ---------------------------------------------------------------------------------------------
 # request de dados de aeródromos
-l_response = requests.get(DS_AERODROMOS_URL.format(DS_REDEMET_KEY))
+l_response = hp.http_get("redemet_aerodromos", DS_AERODROMOS_URL.format(DS_REDEMET_KEY))
 
 # ok ?
-if 200 == l_response.status_code:
+if l_response is not None and 200 == l_response.status_code:
     try:
-        # decode REDEMET station data
-        ldct_data = json.loads(l_response.text)
+        # decode REDEMET aerodromes (slim records)
+        ldct_data = de.decode_redemet_aerodromos(l_response.content)
 
     # em caso de erro...
-    except json.decoder.JSONDecodeError as l_err:
+    except de.DT_DECODE_ERRORS as l_err:
         # logger
         M_LOG.error("REDEMET aerodromes list decoding error: %s.", l_err)
 
@@ -73,7 +123,7 @@ if 200 == l_response.status_code:
 
     if lv_status is not None and lv_status:
         # aeródromos list
-        llst_aerodromos = ldct_data.get("data", None)
+        llst_aerodromos = ldct_data.get("data", None) or []
 
         # for all aerodromos...
         for ldct_aerodromo in llst_aerodromos:
@@ -95,79 +145,159 @@ if 200 == l_response.status_code:
 else:
     # logger
     M_LOG.error("REDEMET aerodromes list empty or not found. Code: %s",
-                str(l_response.status_code))
+                str(l_response.status_code if l_response is not None else None))
 
 # ---------------------------------------------------------------------------------------------
-def redemet_get_location(fs_date: str, fs_location: str):
+def _get_metars(fs_date: str, fs_locations: str, fs_date_fnl: str = None, fv_hedge: bool = False):
     """
-    recupera o METAR da localidade
+    recupera as mensagens METAR das localidades (todas as páginas da resposta)
 
-    :param fs_date (str): date to search
-    :param fs_location (str): location
+    :param fs_date (str): date to search (initial date of the window)
+    :param fs_locations (str): location or comma-separated locations
+    :param fs_date_fnl (str): final date of the window (None for just fs_date)
+    :param fv_hedge (bool): hedged requests (fl_http.http_get_hedged)
 
-    :returns: location data if found else None
+    :returns: METARs list (SRedemetMetar, maybe empty) if found else None
     """
-    # request de dados horários da estação
-    l_response = requests.get(DS_METAR_URL.format(DS_REDEMET_KEY, fs_date, fs_location))
+    # METARs list
+    llst_metars = []
 
-    # not ok ?
-    if 200 != l_response.status_code:
-        # logger
-        M_LOG.error("REDEMET station data for %s not found. Code: %s",
-                    str(fs_location), str(l_response.status_code))
+    # answer page
+    li_page = 1
 
-        # return with error
-        return None
+    # request (hedged or not)
+    lf_get = hp.http_get_hedged if fv_hedge else hp.http_get
 
-    try:
-        # decode REDEMET station data
-        ldct_station = json.loads(l_response.text)
+    # endpoint (one location and hour or many locations/hours)
+    ls_endpoint = DS_LOCATION_ENDPOINT if fs_date_fnl is None and "," not in fs_locations else "redemet_metar"
 
-    # em caso de erro...
-    except json.decoder.JSONDecodeError as l_err:
-        # logger
-        M_LOG.error("REDEMET station data decoding error: %s.", str(l_err))
-        # quit
-        ldct_station = {}
+    # for all pages...
+    while True:
+        # request de dados horários das estações
+        l_response = lf_get(ls_endpoint, DS_METAR_URL.format(DS_REDEMET_KEY, fs_date,
+                                                             fs_date_fnl or fs_date,
+                                                             fs_locations, li_page))
 
-    # flag status
-    lv_status = ldct_station.get("status", None)
+        # not ok ?
+        if l_response is None or 200 != l_response.status_code:
+            # logger
+            M_LOG.error("REDEMET station data for %s not found. Code: %s",
+                        str(fs_locations), str(l_response.status_code if l_response is not None else None))
 
-    if lv_status is not None and lv_status:
-        # station data
-        ldct_data = ldct_station.get("data", None)
+            # return with error
+            return None
 
-    # senão, no lv_status
-    else:
-        # logger
-        M_LOG.error("REDEMET station data for %s status error: %s",
-                    str(fs_location), str(ldct_station))
+        try:
+            # decode REDEMET station data (slim records)
+            ldct_station = de.decode_redemet_metars(l_response.content)
 
-        # return with error
-        return None
+        # em caso de erro...
+        except de.DT_DECODE_ERRORS as l_err:
+            # logger
+            M_LOG.error("REDEMET station data decoding error: %s.", str(l_err))
+            # quit
+            ldct_station = {}
+
+        # flag status
+        lv_status = ldct_station.get("status", None)
+
+        if lv_status is not None and lv_status:
+            # station data
+            ldct_data = ldct_station.get("data", None)
+
+        # senão, no lv_status
+        else:
+            # logger
+            M_LOG.error("REDEMET station data for %s status error: %s",
+                        str(fs_locations), str(ldct_station))
+
+            # return with error
+            return None
+
+        if not ldct_data:
+            # logger
+            M_LOG.error("REDEMET station data for %s have no data field: %s",
+                        str(fs_locations), str(ldct_station))
+
+            # return with error
+            return None
 
-    if ldct_data:
         # metars list
-        llst_metars = ldct_data.get("data", None)
+        llst_metars.extend(ldct_data.get("data", None) or [])
 
-    # senão, no ldct_data
-    else:
-        # logger
-        M_LOG.error("REDEMET station data for %s have no data field: %s",
-                    str(fs_location), str(ldct_station))
+        # last page ?
+        if li_page >= int(ldct_data.get("last_page", None) or 1):
+            # quit
+            break
+
+        # next page
+        li_page += 1
+
+    # return
+    return llst_metars
+
+# ---------------------------------------------------------------------------------------------
+def _metar_hour(fdct_location: dict):
+    """
+    hour of a REDEMET METAR ("validade_inicial" as YYYYmmddHH)
+
+    :param fdct_location (SRedemetMetar): REDEMET METAR
+
+    :returns: hour or None
+    """
+    # validity ("2021-07-01 12:00:00")
+    ls_val = fdct_location.get("validade_inicial", None) or ""
+
+    # return
+    return ls_val[0:4] + ls_val[5:7] + ls_val[8:10] + ls_val[11:13] if len(ls_val) >= 13 else None
+
+# ---------------------------------------------------------------------------------------------
+def _redemet_fetch(fs_date: str, fs_location: str):
+    """
+    recupera o METAR da localidade (do store de redemet_get_locations/redemet_get_range, se
+    já buscado), sem coalescing
 
+    :param fs_date (str): date to search
+    :param fs_location (str): location
+
+    :returns: location data if found else None
+    """
+    # already fetched (found or not) ?
+    lv_stored, lo_metar = redemet_get_stored(fs_date, fs_location)
+
+    if lv_stored:
+        # return
+        return lo_metar
+
+    # chronically empty location ?
+    if hl.health_skip(hl.DS_HEALTH_REDEMET, fs_location):
+        # return (not requested)
+        return None
+
+    # request METARs of the location
+    lf_ini = time.monotonic()
+    llst_metars = _get_metars(fs_date, fs_location, fv_hedge=True)
+
+    if llst_metars is None:
         # return with error
         return None
 
+    # location health
+    hl.health_record(hl.DS_HEALTH_REDEMET, fs_location,
+                     bool(llst_metars and llst_metars[-1] and llst_metars[-1].get("mens", None)),
+                     time.monotonic() - lf_ini)
+
     if llst_metars:
         # location last data
         ldct_location = llst_metars[-1]
 
-    # senão, no llst_metars
+    # senão, empty llst_metars
     else:
         # logger
-        M_LOG.error("REDEMET station data for %s have no or empty METARs list: %s",
-                    str(fs_location), str(ldct_data))
+        M_LOG.error("REDEMET station data for %s have no or empty METARs list.", str(fs_location))
+
+        # save in store (not found)
+        redemet_store([(fs_date, fs_location, None)])
 
         # return with error
         return None
@@ -186,6 +316,9 @@ def redemet_get_location(fs_date: str, fs_location: str):
         return None
 
     if ls_mens:
+        # save in store
+        redemet_store([(fs_date, fs_location, ls_mens.strip())])
+
         # parse METAR
         return mp.metar_parse(ls_mens.strip())
 
@@ -198,4 +331,387 @@ def redemet_get_location(fs_date: str, fs_location: str):
     # return with error
     return None
 
+# ---------------------------------------------------------------------------------------------
+def _range_fetch(fs_location: str, flst_hours: list):
+    """
+    request the METARs of a location in consecutive hours (one request, pages are followed)
+    and save them in the store
+
+    :param fs_location (str): location
+    :param flst_hours (list): hours (YYYYmmddHH), at most DI_METAR_HOURS
+
+    :returns: number of METARs found
+    """
+    # request METARs of the location in the hours
+    llst_metars = _get_metars(flst_hours[0], fs_location, flst_hours[-1])
+
+    # failed ?
+    if llst_metars is None:
+        # hours left out of the store (request of the hour later)
+        return 0
+
+    # messages by hour (None for the ones not found)
+    ldct_mens = dict.fromkeys(flst_hours)
+
+    # for all METARs (in time order, last one of each hour wins)...
+    for ldct_location in llst_metars:
+        # location METAR
+        ls_mens = ldct_location.get("mens", None) if ldct_location else None
+
+        # hour of the METAR
+        ls_hour = _metar_hour(ldct_location) if ls_mens else None
+
+        # requested hour ?
+        if ls_hour in ldct_mens:
+            # save METAR
+            ldct_mens[ls_hour] = ls_mens.strip()
+
+    # save in store
+    redemet_store([(ls_hour, fs_location, ls_mens) for ls_hour, ls_mens in ldct_mens.items()])
+
+    # return
+    return sum(1 for ls_mens in ldct_mens.values() if ls_mens)
+
+# ---------------------------------------------------------------------------------------------
+def redemet_get_stored(fs_date: str, fs_location: str):
+    """
+    METAR da localidade no store de redemet_get_locations/redemet_get_range ou no disk cache
+    (sem request)
+
+    :param fs_date (str): date
+    :param fs_location (str): location
+
+    :returns: (already fetched, SMetar or None)
+    """
+    # already fetched (found or not) ?
+    lv_stored, ls_mens = _stored_mens(fs_date, fs_location)
+
+    # return
+    return lv_stored, mp.metar_parse(ls_mens) if ls_mens else None
+
+# ---------------------------------------------------------------------------------------------
+def _stored_mens(fs_date: str, fs_location: str):
+    """
+    METAR message of the location in the store, else in the disk cache (saved in the store)
+
+    :param fs_date (str): date
+    :param fs_location (str): location
+
+    :returns: (already fetched, message or None)
+    """
+    with M_STORE_LOCK:
+        # METARs of the date
+        ldct_store = M_METAR_STORE.get(fs_date, {})
+
+        # in store ?
+        if fs_location in ldct_store:
+            # return
+            return True, ldct_store[fs_location]
+
+    # disk cache
+    lv_hit, ls_mens = dc.cache_get(DS_CACHE_METAR, dc.cache_key(fs_date, fs_location))
+
+    if lv_hit:
+        with M_STORE_LOCK:
+            # save in the store of the date
+            M_METAR_STORE.setdefault(fs_date, {})[fs_location] = ls_mens
+
+    # return
+    return lv_hit, ls_mens
+
+# ---------------------------------------------------------------------------------------------
+def redemet_forget(fs_date: str):
+    """
+    discard the METARs fetched by redemet_get_locations/redemet_get_range for a date
+
+    :param fs_date (str): date
+    """
+    with M_STORE_LOCK:
+        # discard date
+        M_METAR_STORE.pop(fs_date, None)
+
+# ---------------------------------------------------------------------------------------------
+def redemet_get_location(fs_date: str, fs_location: str):
+    """
+    recupera o METAR da localidade (do store de redemet_get_locations/redemet_get_range, se
+    já buscado). Chamadas simultâneas da mesma localidade e data esperam por um único request
+
+    :param fs_date (str): date to search
+    :param fs_location (str): location
+
+    :returns: location data if found else None
+    """
+    # already fetched (found or not) ?
+    lv_stored, lo_metar = redemet_get_stored(fs_date, fs_location)
+
+    if lv_stored:
+        # return
+        return lo_metar
+
+    # return (one fetch in flight per location and date)
+    return M_FLIGHT.do((fs_date, fs_location), _redemet_fetch, fs_date, fs_location)
+
+# ---------------------------------------------------------------------------------------------
+def redemet_get_locations(fs_date: str, flst_locations, fv_refresh: bool = False):
+    """
+    recupera os METARs de muitas localidades, DI_METAR_LOCATIONS por request. Os METARs ficam
+    no store da data, onde redemet_get_location os encontra. Localidades já no store (de
+    redemet_get_range) não são pedidas de novo
+
+    :param fs_date (str): date to search
+    :param flst_locations (iterable): locations
+    :param fv_refresh (bool): request again the locations stored as not found (polling)
+
+    :returns: dict {location: SMetar or None}
+    """
+    # locations (no duplicates, keep order)
+    llst_locations = list(dict.fromkeys(ls_loc.strip().upper() for ls_loc in flst_locations))
+
+    # messages already fetched (store or disk cache)
+    ldct_store = {}
+
+    # locations to request
+    llst_request = []
+
+    # for all locations...
+    for ls_loc in llst_locations:
+        # already fetched ?
+        lv_hit, ls_mens = _stored_mens(fs_date, ls_loc)
+
+        if lv_hit and (ls_mens or not fv_refresh):
+            # message
+            ldct_store[ls_loc] = ls_mens
+
+        # chronically empty location ?
+        elif hl.health_skip(hl.DS_HEALTH_REDEMET, ls_loc):
+            # not found (memory store only, not requested)
+            ldct_store[ls_loc] = None
+
+            with M_STORE_LOCK:
+                M_METAR_STORE.setdefault(fs_date, {})[ls_loc] = None
+
+        # senão,...
+        else:
+            # request
+            llst_request.append(ls_loc)
+
+    # messages by location (None for the ones not found)
+    ldct_mens = dict.fromkeys(llst_request)
+
+    # for all chunks...
+    for li_ini in range(0, len(llst_request), DI_METAR_LOCATIONS):
+        # chunk locations
+        llst_chunk = llst_request[li_ini:li_ini + DI_METAR_LOCATIONS]
+
+        # request METARs of the chunk
+        lf_ini = time.monotonic()
+        llst_metars = _get_metars(fs_date, ",".join(llst_chunk))
+        lf_latency = time.monotonic() - lf_ini
+
+        # chunk failed ?
+        if llst_metars is None:
+            # locations of the chunk left out of the store (single request later)
+            for ls_loc in llst_chunk:
+                del ldct_mens[ls_loc]
+
+            # next chunk
+            continue
+
+        # for all METARs (in time order, last one wins)...
+        for ldct_location in llst_metars:
+            # location METAR
+            ls_mens = ldct_location.get("mens", None) if ldct_location else None
+
+            if not ls_mens:
+                # next METAR
+                continue
+
+            # location (from answer or from message)
+            ls_loc = (ldct_location.get("id_localidade", None) or
+                      mp.metar_parse(ls_mens).s_icao_code or "").upper()
+
+            # requested location ?
+            if ls_loc in ldct_mens:
+                # save METAR
+                ldct_mens[ls_loc] = ls_mens.strip()
+
+        # for all locations of the chunk...
+        for ls_loc in llst_chunk:
+            # location health (a late METAR is not a new miss)
+            if ldct_mens[ls_loc] or not fv_refresh:
+                hl.health_record(hl.DS_HEALTH_REDEMET, ls_loc, bool(ldct_mens[ls_loc]), lf_latency)
+
+    # save in store
+    redemet_store([(fs_date, ls_loc, ls_mens) for ls_loc, ls_mens in ldct_mens.items()])
+
+    # all messages
+    ldct_store.update(ldct_mens)
+
+    # METARs by location
+    ldct_metars = {ls_loc: mp.metar_parse(ldct_store[ls_loc]) if ldct_store[ls_loc] else None
+                   for ls_loc in llst_locations if ls_loc in ldct_store}
+
+    # logger
+    M_LOG.debug("REDEMET METARs for %s: %d of %d locations.", fs_date,
+                sum(1 for lo_metar in ldct_metars.values() if lo_metar is not None),
+                len(llst_locations))
+
+    # return
+    return ldct_metars
+
+# ---------------------------------------------------------------------------------------------
+def redemet_get_range(fs_date_ini: str, fs_date_fnl: str, flst_locations):
+    """
+    recupera os METARs de um intervalo de datas (backfill), um request por localidade a cada
+    DI_METAR_HOURS horas, DI_RANGE_WORKERS requests ao mesmo tempo. Os METARs ficam no store,
+    por hora, onde redemet_get_location e redemet_get_locations os encontram (redemet_forget
+    os descarta)
+
+    :param fs_date_ini (str): initial date (YYYYmmddHH)
+    :param fs_date_fnl (str): final date (YYYYmmddHH, included)
+    :param flst_locations (iterable): locations
+
+    :returns: number of METARs fetched (not counting the ones already in the disk cache)
+    """
+    # locations (no duplicates, keep order)
+    llst_locations = list(dict.fromkeys(ls_loc.strip().upper() for ls_loc in flst_locations))
+
+    # date window
+    ldt_ini = datetime.datetime.strptime(fs_date_ini, "%Y%m%d%H")
+    ldt_fnl = datetime.datetime.strptime(fs_date_fnl, "%Y%m%d%H")
+
+    # hours of the window
+    llst_hours = [(ldt_ini + datetime.timedelta(hours=li_hour)).strftime("%Y%m%d%H")
+                  for li_hour in range(int((ldt_fnl - ldt_ini).total_seconds() // 3600) + 1)]
+
+    # requests (location, chunk of hours) not all in the disk cache
+    llst_requests = [(ls_loc, llst_hours[li_ini:li_ini + DI_METAR_HOURS])
+                     for ls_loc in llst_locations
+                     for li_ini in range(0, len(llst_hours), DI_METAR_HOURS)
+                     if not all(_stored_mens(ls_hour, ls_loc)[0]
+                                for ls_hour in llst_hours[li_ini:li_ini + DI_METAR_HOURS])]
+
+    # METARs found
+    li_found = 0
+
+    if llst_requests:
+        # requests in parallel
+        with concurrent.futures.ThreadPoolExecutor(max_workers=DI_RANGE_WORKERS,
+                                                   thread_name_prefix="range") as lo_pool:
+            # METARs found
+            li_found = sum(lo_pool.map(lambda lt_request: _range_fetch(*lt_request), llst_requests))
+
+    # logger
+    M_LOG.debug("REDEMET METARs from %s to %s: %d for %d locations.", fs_date_ini, fs_date_fnl,
+                li_found, len(llst_locations))
+
+    # return
+    return li_found
+
+# ---------------------------------------------------------------------------------------------
+def redemet_poll(fs_date: str, flst_locations, ff_cutoff: float, f_found=None):
+    """
+    polling of the missing METARs of an hour: the locations still missing are requested again
+    (in bulk) on a backoff schedule until found or the cutoff. Each METAR found is saved in
+    the store and passed to f_found as soon as it arrives
+
+    :param fs_date (str): date to search
+    :param flst_locations (iterable): locations missing
+    :param ff_cutoff (float): no request after this time (time.monotonic)
+    :param f_found (callable): called with (location, SMetar) for each METAR found
+
+    :returns: list of the locations still missing
+    """
+    # locations missing
+    llst_missing = list(dict.fromkeys(ls_loc.strip().upper() for ls_loc in flst_locations))
+
+    # polling round
+    li_round = 0
+
+    # while missing...
+    while llst_missing:
+        # delay of the round
+        lf_delay = redemet_poll_delay(li_round)
+
+        # past the cutoff ?
+        if time.monotonic() + lf_delay > ff_cutoff:
+            # quit
+            break
+
+        # wait
+        time.sleep(lf_delay)
+
+        # request the missing ones again
+        llst_found, llst_missing = redemet_poll_round(fs_date, llst_missing)
+
+        # for all METARs found...
+        for ls_loc, lo_metar in llst_found:
+            # publish
+            if f_found is not None:
+                f_found(ls_loc, lo_metar)
+
+        # next round
+        li_round += 1
+
+    # return
+    return llst_missing
+
+# ---------------------------------------------------------------------------------------------
+def redemet_poll_delay(fi_round: int):
+    """
+    delay before a polling round
+
+    :param fi_round (int): round (0 for the first one)
+
+    :returns: delay (s)
+    """
+    # return
+    return min(DF_POLL_MAX, DF_POLL_BASE * 2 ** fi_round)
+
+# ---------------------------------------------------------------------------------------------
+def redemet_poll_round(fs_date: str, flst_missing: list):
+    """
+    polling round: request again the locations stored as not found
+
+    :param fs_date (str): date to search
+    :param flst_missing (list): locations missing
+
+    :returns: list of (location, SMetar) found and list of the locations still missing
+    """
+    # request again
+    ldct_metars = redemet_get_locations(fs_date, flst_missing, fv_refresh=True)
+
+    # METARs found
+    llst_found = [(ls_loc, ldct_metars[ls_loc]) for ls_loc in flst_missing if ldct_metars.get(ls_loc)]
+
+    # logger
+    M_LOG.info("REDEMET polling of %s: %d of %d missing METARs arrived.", fs_date, len(llst_found),
+               len(flst_missing))
+
+    # return
+    return llst_found, [ls_loc for ls_loc in flst_missing if not ldct_metars.get(ls_loc)]
+
+# ---------------------------------------------------------------------------------------------
+def redemet_store(flst_items):
+    """
+    save METAR messages in the store and in the disk cache (TTL by the age of the hour)
+
+    :param flst_items (iterable): (date, location, message or None)
+    """
+    # items
+    llst_items = list(flst_items)
+
+    with M_STORE_LOCK:
+        # for all items...
+        for ls_date, ls_loc, ls_mens in llst_items:
+            # save in the store of the date
+            M_METAR_STORE.setdefault(ls_date, {})[ls_loc] = ls_mens
+
+    # save in disk cache (hour ends one hour after its date)
+    dc.cache_put_many(DS_CACHE_METAR,
+                      [(dc.cache_key(ls_date, ls_loc), ls_mens,
+                        dc.cache_ttl(datetime.datetime.strptime(ls_date, "%Y%m%d%H") + datetime.timedelta(hours=1),
+                                     bool(ls_mens)))
+                       for ls_date, ls_loc, ls_mens in llst_items])
+
 # < the end >----------------------------------------------------------------------------------
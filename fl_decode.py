@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+"""
+fl_decode
+
+typed decoding of the REDEMET and INMET answers straight into slim records that hold only the
+fields frontline uses. With msgspec the bytes are decoded into the records (unused fields are
+skipped, never built); without it, orjson or json decode and the records are slimmed after.
+Records answer get() and [] as the dicts they replace
+
+2026.oct  mlabru  initial version (Linux/Python)
+"""
+# < imports >----------------------------------------------------------------------------------
+
+# python library
+import json
+import logging
+import typing
+
+# msgspec (optional, typed decoding)
+try:
+    import msgspec
+
+except ImportError:
+    msgspec = None
+
+# orjson (optional, fast decoding when msgspec is missing)
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+# local
+import fl_defs as df
+
+# < constants >--------------------------------------------------------------------------------
+
+# decoding errors (msgspec.DecodeError includes the validation errors)
+DT_DECODE_ERRORS = (ValueError, TypeError) + ((msgspec.DecodeError,) if msgspec is not None else ())
+
+# < logging >----------------------------------------------------------------------------------
+
+# logger
+M_LOG = logging.getLogger(__name__)
+M_LOG.setLevel(df.DI_LOG_LEVEL)
+
+# < SRecord >----------------------------------------------------------------------------------
+
+class SRecord(msgspec.Struct if msgspec is not None else object):
+    """
+    slim record (msgspec struct or slotted object), read as the dict it replaces
+    """
+    if msgspec is None:
+        # fields (set by _record, msgspec sets its own)
+        __struct_fields__ = ()
+
+        # no instance dict
+        __slots__ = ()
+
+        # -------------------------------------------------------------------------------------
+        def __init__(self, *flst_values):
+            """
+            constructor
+
+            :param flst_values (list): field values, in __struct_fields__ order
+            """
+            # for all fields...
+            for ls_field, l_value in zip(self.__struct_fields__, flst_values):
+                # save value
+                setattr(self, ls_field, l_value)
+
+        # -------------------------------------------------------------------------------------
+        def __repr__(self):
+            """
+            representation
+            """
+            # return
+            return "{}({})".format(type(self).__name__,
+                                   ", ".join("{}={!r}".format(ls_field, getattr(self, ls_field))
+                                             for ls_field in self.__struct_fields__))
+
+    # -----------------------------------------------------------------------------------------
+    def __getitem__(self, fs_key: str):
+        """
+        field value (KeyError if not a field)
+
+        :param fs_key (str): field name
+        """
+        # field ?
+        if fs_key in self.__struct_fields__:
+            # return
+            return getattr(self, fs_key)
+
+        # return with error
+        raise KeyError(fs_key)
+
+    # -----------------------------------------------------------------------------------------
+    def get(self, fs_key: str, f_default=None):
+        """
+        field value
+
+        :param fs_key (str): field name
+        :param f_default: value if not a field
+
+        :returns: field value or f_default
+        """
+        # return
+        return getattr(self, fs_key) if fs_key in self.__struct_fields__ else f_default
+
+# ---------------------------------------------------------------------------------------------
+def _record(fs_name: str, flst_fields: list):
+    """
+    create a record class
+
+    :param fs_name (str): class name
+    :param flst_fields (list): (field name, type), all fields default to None
+
+    :returns: record class
+    """
+    # msgspec ?
+    if msgspec is not None:
+        # return struct (records never form cycles, so no GC tracking)
+        return msgspec.defstruct(fs_name, [(ls_field, l_type, None) for ls_field, l_type in flst_fields],
+                                 bases=(SRecord,), module=__name__, gc=False)
+
+    # fields
+    lt_fields = tuple(ls_field for ls_field, _ in flst_fields)
+
+    # return slotted class
+    return type(fs_name, (SRecord,), {"__slots__": lt_fields, "__struct_fields__": lt_fields,
+                                      "__module__": __name__})
+
+# < records >----------------------------------------------------------------------------------
+
+# INMET station register of an hour (fl_metsar_gen)
+SInmetReg = _record("SInmetReg", [("DT_MEDICAO", typing.Optional[str]),
+                                  ("HR_MEDICAO", typing.Optional[str]),
+                                  ("PRE_INS", typing.Any),
+                                  ("PTO_INS", typing.Any),
+                                  ("TEM_INS", typing.Any),
+                                  ("VEN_DIR", typing.Any),
+                                  ("VEN_RAJ", typing.Any),
+                                  ("VEN_VEL", typing.Any)])
+
+# INMET automatic station (fl_icao_ll)
+SInmetStation = _record("SInmetStation", [("CD_ESTACAO", typing.Optional[str]),
+                                          ("CD_SITUACAO", typing.Optional[str]),
+                                          ("VL_ALTITUDE", typing.Any),
+                                          ("VL_LATITUDE", typing.Any),
+                                          ("VL_LONGITUDE", typing.Any)])
+
+# REDEMET aerodrome
+SRedemetAerodromo = _record("SRedemetAerodromo", [("cod", typing.Optional[str]),
+                                                  ("lat_dec", typing.Any),
+                                                  ("lon_dec", typing.Any)])
+
+# REDEMET aerodromes answer
+SRedemetAerodromos = _record("SRedemetAerodromos", [("status", typing.Any),
+                                                    ("data", typing.Optional[typing.List[SRedemetAerodromo]])])
+
+# REDEMET METAR
+SRedemetMetar = _record("SRedemetMetar", [("id_localidade", typing.Optional[str]),
+                                          ("mens", typing.Optional[str]),
+                                          ("validade_inicial", typing.Optional[str])])
+
+# REDEMET METARs page
+SRedemetPage = _record("SRedemetPage", [("data", typing.Optional[typing.List[SRedemetMetar]]),
+                                        ("last_page", typing.Any)])
+
+# REDEMET METARs answer
+SRedemetMetars = _record("SRedemetMetars", [("status", typing.Any),
+                                            ("data", typing.Optional[SRedemetPage])])
+
+# < local data >-------------------------------------------------------------------------------
+
+# decoders (msgspec, created once)
+if msgspec is not None:
+    M_DEC_INMET_DAY = msgspec.json.Decoder(typing.Optional[typing.List[SInmetReg]])
+    M_DEC_INMET_STATIONS = msgspec.json.Decoder(typing.Optional[typing.List[SInmetStation]])
+    M_DEC_REDEMET_AERODROMOS = msgspec.json.Decoder(SRedemetAerodromos)
+    M_DEC_REDEMET_METARS = msgspec.json.Decoder(SRedemetMetars)
+
+# ---------------------------------------------------------------------------------------------
+def _loads(fb_data):
+    """
+    decode JSON into dicts (no msgspec)
+
+    :param fb_data (bytes): JSON
+
+    :returns: decoded data
+    """
+    # return
+    return orjson.loads(fb_data) if orjson is not None else json.loads(fb_data)
+
+# ---------------------------------------------------------------------------------------------
+def _slim(f_record, f_obj):
+    """
+    slim record from a decoded dict (no msgspec)
+
+    :param f_record (class): record class
+    :param f_obj (dict): decoded object
+
+    :returns: record or None if not an object
+    """
+    # return
+    return f_record(*map(f_obj.get, f_record.__struct_fields__)) if isinstance(f_obj, dict) else None
+
+# ---------------------------------------------------------------------------------------------
+def _slim_list(f_record, f_obj):
+    """
+    slim records from a decoded list (no msgspec)
+
+    :param f_record (class): record class
+    :param f_obj (list): decoded list
+
+    :returns: list of records or None if not a list
+    """
+    # return
+    return [_slim(f_record, l_item) for l_item in f_obj] if isinstance(f_obj, list) else None
+
+# ---------------------------------------------------------------------------------------------
+def decode_inmet_day(fb_data):
+    """
+    decode the INMET data of a station day
+
+    :param fb_data (bytes): JSON
+
+    :returns: list of SInmetReg (None for a null answer)
+    :raises: DT_DECODE_ERRORS
+    """
+    # msgspec ?
+    if msgspec is not None:
+        # return
+        return M_DEC_INMET_DAY.decode(fb_data)
+
+    # return
+    return _slim_list(SInmetReg, _loads(fb_data))
+
+# ---------------------------------------------------------------------------------------------
+def decode_inmet_stations(fb_data):
+    """
+    decode the INMET stations list
+
+    :param fb_data (bytes): JSON
+
+    :returns: list of SInmetStation (None for a null answer)
+    :raises: DT_DECODE_ERRORS
+    """
+    # msgspec ?
+    if msgspec is not None:
+        # return
+        return M_DEC_INMET_STATIONS.decode(fb_data)
+
+    # return
+    return _slim_list(SInmetStation, _loads(fb_data))
+
+# ---------------------------------------------------------------------------------------------
+def decode_redemet_aerodromos(fb_data):
+    """
+    decode the REDEMET aerodromes answer
+
+    :param fb_data (bytes): JSON
+
+    :returns: SRedemetAerodromos
+    :raises: DT_DECODE_ERRORS
+    """
+    # msgspec ?
+    if msgspec is not None:
+        # return
+        return M_DEC_REDEMET_AERODROMOS.decode(fb_data)
+
+    # decode
+    ldct_data = _loads(fb_data)
+
+    if not isinstance(ldct_data, dict):
+        # return with error
+        raise ValueError("REDEMET aerodromes answer is not an object")
+
+    # return
+    return SRedemetAerodromos(ldct_data.get("status", None),
+                              _slim_list(SRedemetAerodromo, ldct_data.get("data", None)))
+
+# ---------------------------------------------------------------------------------------------
+def decode_redemet_metars(fb_data):
+    """
+    decode a REDEMET METARs answer (one page)
+
+    :param fb_data (bytes): JSON
+
+    :returns: SRedemetMetars
+    :raises: DT_DECODE_ERRORS
+    """
+    # msgspec ?
+    if msgspec is not None:
+        # return
+        return M_DEC_REDEMET_METARS.decode(fb_data)
+
+    # decode
+    ldct_data = _loads(fb_data)
+
+    if not isinstance(ldct_data, dict):
+        # return with error
+        raise ValueError("REDEMET METARs answer is not an object")
+
+    # page
+    ldct_page = ldct_data.get("data", None)
+
+    # return
+    return SRedemetMetars(ldct_data.get("status", None),
+                          SRedemetPage(_slim_list(SRedemetMetar, ldct_page.get("data", None)),
+                                       ldct_page.get("last_page", None))
+                          if isinstance(ldct_page, dict) else None)
+
+# ---------------------------------------------------------------------------------------------
+def encode_records(flst_records):
+    """
+    encode records as JSON (slim disk cache entries)
+
+    :param flst_records (list): records (or None)
+
+    :returns: JSON (str)
+    """
+    # msgspec ?
+    if msgspec is not None:
+        # return
+        return msgspec.json.encode(flst_records).decode("utf-8")
+
+    # return
+    return json.dumps(None if flst_records is None else
+                      [None if lo_rec is None else
+                       {ls_field: getattr(lo_rec, ls_field) for ls_field in lo_rec.__struct_fields__}
+                       for lo_rec in flst_records])
+
+# < the end >----------------------------------------------------------------------------------
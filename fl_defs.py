@@ -2,6 +2,9 @@
 """
 fl_defs
 
+2026.oct  mlabru  DI_HOUR_BUDGET, deadline of the hourly cycle
+2026.oct  mlabru  DDCT_WEATHER entries of the WMO groups it lacked (VCSH, UP, SA, PO, FC, ...)
+2026.oct  mlabru  DDCT_WEATHER keys without stray ':'
 2023.may  mlabru  referências aos diretórios alterados. Compatibilidade com GORmet
 2021.may  mlabru  initial version (Linux/Python)
 """
@@ -22,6 +25,9 @@ DI_DIFF_GMT = 3
 # radius of earth in kilometers. Use 3956 for miles
 DI_RADIUS = 6371
 
+# deadline of the hourly cycle (s). Stations not done by then get the METSAR from METAF
+DI_HOUR_BUDGET = 50 * 60
+
 
 # ft -> m
 DF_FT2M = 0.3048
@@ -73,6 +79,10 @@ DDCT_WEATHER = {"DZ":     "Drizzle.",
                 "SHGR":   "Hail showers.",
                 "-SHGR":  "Light hail showers.",
                 "+SHGR":  "Heavy hail showers.",
+                "SHGS":   "Small hail showers.",
+                "-SHGS":  "Light small hail showers.",
+                "+SHGS":  "Heavy small hail showers.",
+                "VCSH":   "Showers in vicinity.",
                 "FZRA":   "Freezing rain.",
                 "-FZRA":  "Light freezing rain.",
                 "+FZRA":  "Heavy freezing rain.",
@@ -85,37 +95,47 @@ DDCT_WEATHER = {"DZ":     "Drizzle.",
                 "TSGR":   "Thunderstorm with hail.",
                 "-TSGR":  "Light thunderstorm with hail.",
                 "+TSGR":  "Heavy thunderstorm with hail.",
-                "TSGS:":  "Thunderstorm with small hail.",
-                "-TSGS:": "Light thunderstorm with small hail.",
-                "+TSGS:": "Heavy thunderstorm with small hail.",
-                "TSSN:":  "Thunderstorm with snow.",
-                "-TSSN:": "Light thunderstorm with snow.",
-                "+TSSN:": "Heavy thunderstorm with snow.",
-                "DS:":    "Duststorm.",
-                "-DS:":   "Light duststorm.",
-                "+DS:":   "Heavy duststorm.",
-                "SS:":    "Sandstorm.",
-                "-SS:":   "Light sandstorm.",
-                "+SS:":   "Heavy sandstorm.",
-                "FG:":    "Fog.",
-                "FZFG:":  "Freezing fog.",
-                "VCFG:":  "Fog in vicinity.",
-                "MIFG:":  "Shallow fog.",
-                "PRFG:":  "Aerodrome partially covered by fog.",
-                "BCFG:":  "Fog patches.",
-                "BR:":    "Mist.",
-                "HZ:":    "Haze.",
-                "FU:":    "Smoke.",
-                "DRSN:":  "Low drifting snow.",
-                "DRSA:":  "Low drifting sand.",
-                "DRDU:":  "Low drifting dust.",
-                "DU:":    "Dust.",
-                "BLSN:":  "Blowing snow.",
-                "BLDU:":  "Blowing dust.",
-                "SQ:":    "Squall.",
-                "IC:":    "Ice crystals.",
-                "TS:":    "Thunderstorm.",
-                "VCTS:":  "Thunderstorm in vicinity.",
-                "VA:":    "Volcanic ash."}
+                "TSGS":   "Thunderstorm with small hail.",
+                "-TSGS":  "Light thunderstorm with small hail.",
+                "+TSGS":  "Heavy thunderstorm with small hail.",
+                "TSSN":   "Thunderstorm with snow.",
+                "-TSSN":  "Light thunderstorm with snow.",
+                "+TSSN":  "Heavy thunderstorm with snow.",
+                "DS":     "Duststorm.",
+                "-DS":    "Light duststorm.",
+                "+DS":    "Heavy duststorm.",
+                "SS":     "Sandstorm.",
+                "-SS":    "Light sandstorm.",
+                "+SS":    "Heavy sandstorm.",
+                "FG":     "Fog.",
+                "FZFG":   "Freezing fog.",
+                "VCFG":   "Fog in vicinity.",
+                "MIFG":   "Shallow fog.",
+                "PRFG":   "Aerodrome partially covered by fog.",
+                "BCFG":   "Fog patches.",
+                "BR":     "Mist.",
+                "HZ":     "Haze.",
+                "FU":     "Smoke.",
+                "DRSN":   "Low drifting snow.",
+                "DRSA":   "Low drifting sand.",
+                "DRDU":   "Low drifting dust.",
+                "DU":     "Dust.",
+                "BLSN":   "Blowing snow.",
+                "BLDU":   "Blowing dust.",
+                "BLSA":   "Blowing sand.",
+                "SA":     "Sand.",
+                "PO":     "Dust/sand whirls.",
+                "VCPO":   "Dust/sand whirls in vicinity.",
+                "VCSS":   "Sandstorm in vicinity.",
+                "VCDS":   "Duststorm in vicinity.",
+                "FC":     "Funnel cloud.",
+                "+FC":    "Tornado or waterspout.",
+                "VCFC":   "Funnel cloud in vicinity.",
+                "UP":     "Unknown precipitation.",
+                "SQ":     "Squall.",
+                "IC":     "Ice crystals.",
+                "TS":     "Thunderstorm.",
+                "VCTS":   "Thunderstorm in vicinity.",
+                "VA":     "Volcanic ash."}
 
 # < the end >----------------------------------------------------------------------------------
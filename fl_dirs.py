@@ -2,6 +2,7 @@
 """
 fl_dirs
 
+2026.oct  mlabru  disk cache directory
 2023.may  mlabru  initial version (Linux/Python)
 """
 # < defines >----------------------------------------------------------------------------------
@@ -15,4 +16,7 @@ DS_OUT_DIR = "frontlines"
 # carrapatos directory
 DS_TICKS_DIR = "carrapatos"
 
+# disk cache directory
+DS_CACHE_DIR = "cache"
+
 # < the end >----------------------------------------------------------------------------------
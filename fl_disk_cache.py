@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+fl_disk_cache
+
+on-disk response cache shared by processes (frontline, fronttest, reruns). SQLite in WAL
+mode, a small pool of connections shared by the threads, keyed by endpoint + key, with an
+expiration per entry
+
+2026.oct  mlabru  connections pooled, schema and purge once per process (not per thread)
+2026.oct  mlabru  cache_items, all entries of an endpoint
+2026.oct  mlabru  initial version (Linux/Python)
+"""
+# < imports >----------------------------------------------------------------------------------
+
+# python library
+import contextlib
+import datetime
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+
+# local
+import fl_defs as df
+import fl_dirs as dr
+
+# < constants >--------------------------------------------------------------------------------
+
+# cache database
+DS_CACHE_FILE = str(pathlib.PurePath(dr.DS_CACHE_DIR).joinpath("frontline.sqlite3"))
+
+# wait for a lock held by another process (s)
+DF_CACHE_BUSY = 10.
+
+# idle connections kept (the others are closed when given back)
+DI_CACHE_POOL = 4
+
+# a period is closed (its data won't change) this long after its end (s)
+DI_CACHE_SETTLE = 2 * 3600
+
+# TTLs (s): data of an open period, not found in an open period, data of a closed period and
+# not found in a closed period (late reports)
+DI_TTL_FRESH = 10 * 60
+DI_TTL_MISSING = 15 * 60
+DI_TTL_FINAL = 30 * 86400
+DI_TTL_MISSING_FINAL = 6 * 3600
+
+# < logging >----------------------------------------------------------------------------------
+
+# logger
+M_LOG = logging.getLogger(__name__)
+M_LOG.setLevel(df.DI_LOG_LEVEL)
+
+# < local data >-------------------------------------------------------------------------------
+
+# idle connections (shared by the threads, one user at a time)
+M_LST_POOL = []
+
+# schema ready and expired entries purged (once per process), None if the cache failed
+M_V_READY = False
+
+# pool and setup guard
+M_LOCK = threading.Lock()
+
+# ---------------------------------------------------------------------------------------------
+def _connect():
+    """
+    new connection (autocommit, usable by any thread)
+
+    :returns: connection
+    """
+    # connect
+    l_conn = sqlite3.connect(DS_CACHE_FILE, timeout=DF_CACHE_BUSY, isolation_level=None,
+                             check_same_thread=False)
+
+    # fewer fsyncs (WAL)
+    l_conn.execute("pragma synchronous=normal")
+
+    # return
+    return l_conn
+
+# ---------------------------------------------------------------------------------------------
+@contextlib.contextmanager
+def _connection():
+    """
+    connection from the pool for the calling thread, given back at the end of the with block.
+    The first one creates the schema and purges the expired entries (once per process)
+
+    :returns: connection or None on error
+    """
+    # global setup flag
+    global M_V_READY
+
+    # no connection
+    l_conn = None
+
+    with M_LOCK:
+        # cache available ?
+        if M_V_READY is not None:
+            # idle connection
+            l_conn = M_LST_POOL.pop() if M_LST_POOL else None
+
+            try:
+                # cache directory (first use)
+                if not M_V_READY:
+                    os.makedirs(dr.DS_CACHE_DIR, exist_ok=True)
+
+                # new connection
+                if l_conn is None:
+                    l_conn = _connect()
+
+                # not set up yet ?
+                if not M_V_READY:
+                    # readers don't block the writer (other processes included, kept in the file)
+                    l_conn.execute("pragma journal_mode=wal")
+
+                    # cache table
+                    l_conn.execute("create table if not exists cache(endpoint text not null, key text not null, "
+                                   "value text, expires real not null, primary key(endpoint, key))")
+
+                    # purge expired entries
+                    l_conn.execute("delete from cache where expires < ?", (time.time(),))
+
+                    # set up
+                    M_V_READY = True
+
+            # em caso de erro,...
+            except (OSError, sqlite3.Error) as l_err:
+                # logger
+                M_LOG.error("Disk cache %s not available: %s.", DS_CACHE_FILE, str(l_err))
+
+                # cache not available (not retried by every thread)
+                M_V_READY = None
+
+                # close connection
+                if l_conn is not None:
+                    l_conn.close()
+                    l_conn = None
+
+    try:
+        # use connection
+        yield l_conn
+
+    finally:
+        if l_conn is not None:
+            with M_LOCK:
+                # room in the pool ?
+                if len(M_LST_POOL) < DI_CACHE_POOL:
+                    # give back
+                    M_LST_POOL.append(l_conn)
+                    l_conn = None
+
+            # pool full: close connection
+            if l_conn is not None:
+                l_conn.close()
+
+# ---------------------------------------------------------------------------------------------
+def cache_get(fs_endpoint: str, fs_key: str):
+    """
+    cached value (not expired)
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+    :param fs_key (str): key (see cache_key)
+
+    :returns: (hit, value or None)
+    """
+    # connection (from the pool)
+    with _connection() as l_conn:
+        if l_conn is None:
+            # miss
+            return False, None
+
+        try:
+            # search
+            lt_row = l_conn.execute("select value from cache where endpoint = ? and key = ? and expires >= ?",
+                                    (fs_endpoint, fs_key, time.time())).fetchone()
+
+        # em caso de erro,...
+        except sqlite3.Error as l_err:
+            # logger
+            M_LOG.error("Disk cache read error: %s.", str(l_err))
+
+            # miss
+            return False, None
+
+        # return
+        return (False, None) if lt_row is None else (True, lt_row[0])
+
+# ---------------------------------------------------------------------------------------------
+def cache_items(fs_endpoint: str):
+    """
+    all cached entries of an endpoint (not expired)
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+
+    :returns: list of (key, value)
+    """
+    # connection (from the pool)
+    with _connection() as l_conn:
+        if l_conn is None:
+            # none
+            return []
+
+        try:
+            # search
+            return l_conn.execute("select key, value from cache where endpoint = ? and expires >= ?",
+                                  (fs_endpoint, time.time())).fetchall()
+
+        # em caso de erro,...
+        except sqlite3.Error as l_err:
+            # logger
+            M_LOG.error("Disk cache read error: %s.", str(l_err))
+
+        # none
+        return []
+
+# ---------------------------------------------------------------------------------------------
+def cache_key(*flst_parts):
+    """
+    key from its parts (date, station, ...)
+
+    :param flst_parts (list): key parts
+
+    :returns: key
+    """
+    # return
+    return "/".join(str(l_part) for l_part in flst_parts)
+
+# ---------------------------------------------------------------------------------------------
+def cache_put(fs_endpoint: str, fs_key: str, fs_value, ff_ttl: float):
+    """
+    save value
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+    :param fs_key (str): key (see cache_key)
+    :param fs_value (str): value (None for not found)
+    :param ff_ttl (float): time to live (s), see cache_ttl
+    """
+    # connection (from the pool)
+    with _connection() as l_conn:
+        if l_conn is None:
+            # quit
+            return
+
+        try:
+            # save
+            l_conn.execute("insert or replace into cache(endpoint, key, value, expires) values (?, ?, ?, ?)",
+                           (fs_endpoint, fs_key, fs_value, time.time() + ff_ttl))
+
+        # em caso de erro,...
+        except sqlite3.Error as l_err:
+            # logger
+            M_LOG.error("Disk cache write error: %s.", str(l_err))
+
+# ---------------------------------------------------------------------------------------------
+def cache_put_many(fs_endpoint: str, flst_items):
+    """
+    save values in one transaction
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+    :param flst_items (iterable): (key, value or None, TTL)
+    """
+    # connection (from the pool)
+    with _connection() as l_conn:
+        if l_conn is None:
+            # quit
+            return
+
+        # now
+        lf_now = time.time()
+
+        try:
+            # one transaction
+            with l_conn:
+                l_conn.execute("begin")
+
+                # save all
+                l_conn.executemany("insert or replace into cache(endpoint, key, value, expires) values (?, ?, ?, ?)",
+                                   [(fs_endpoint, ls_key, ls_value, lf_now + lf_ttl)
+                                    for ls_key, ls_value, lf_ttl in flst_items])
+
+        # em caso de erro,...
+        except sqlite3.Error as l_err:
+            # logger
+            M_LOG.error("Disk cache write error: %s.", str(l_err))
+
+# ---------------------------------------------------------------------------------------------
+def cache_ttl(fdt_end, fv_found: bool):
+    """
+    time to live of the data of a period (hour, day): short while the period is open or just
+    closed, long once closed
+
+    :param fdt_end (datetime): end of the period (GMT)
+    :param fv_found (bool): data found
+
+    :returns: TTL (s)
+    """
+    # closed period ?
+    if (datetime.datetime.utcnow() - fdt_end).total_seconds() >= DI_CACHE_SETTLE:
+        # return
+        return DI_TTL_FINAL if fv_found else DI_TTL_MISSING_FINAL
+
+    # return
+    return DI_TTL_FRESH if fv_found else DI_TTL_MISSING
+
+# < the end >----------------------------------------------------------------------------------
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+fl_health
+
+health of the upstream stations (REDEMET aeródromos, INMET stations): consecutive misses,
+last success and average latency. Chronically empty stations are skipped and re-probed on a
+backoff schedule. Records are kept in the disk cache, so hourly runs share them
+
+2026.oct  mlabru  initial version (Linux/Python)
+"""
+# < imports >----------------------------------------------------------------------------------
+
+# python library
+import json
+import logging
+import threading
+import time
+
+# local
+import fl_defs as df
+import fl_disk_cache as dc
+
+# < constants >--------------------------------------------------------------------------------
+
+# sources
+DS_HEALTH_REDEMET = "redemet"
+DS_HEALTH_INMET = "inmet"
+
+# disk cache endpoint of the health records (key source/station)
+DS_CACHE_HEALTH = "health"
+
+# consecutive misses before a station is skipped
+DI_HEALTH_MISSES = 6
+
+# re-probe delay of a skipped station: base, doubled on each further miss, and cap (s)
+DI_PROBE_BASE = 2 * 3600
+DI_PROBE_MAX = 24 * 3600
+
+# latency moving average weight
+DF_HEALTH_ALPHA = 0.2
+
+# records not updated for this long are forgotten (s)
+DI_HEALTH_TTL = 30 * 86400
+
+# < logging >----------------------------------------------------------------------------------
+
+# logger
+M_LOG = logging.getLogger(__name__)
+M_LOG.setLevel(df.DI_LOG_LEVEL)
+
+# < local data >-------------------------------------------------------------------------------
+
+# health records ({(source, station): {"misses", "last_ok", "latency", "next_probe"}}), loaded on first use
+M_DCT_HEALTH = None
+
+# records changed since the last save
+M_SET_DIRTY = set()
+
+# records guard
+M_LOCK = threading.Lock()
+
+# ---------------------------------------------------------------------------------------------
+def _records():
+    """
+    health records (loaded from the disk cache on first use, call with M_LOCK held)
+
+    :returns: dict of health records
+    """
+    # global records
+    global M_DCT_HEALTH
+
+    # not loaded yet ?
+    if M_DCT_HEALTH is None:
+        # records
+        M_DCT_HEALTH = {}
+
+        # for all saved records...
+        for ls_key, ls_value in dc.cache_items(DS_CACHE_HEALTH):
+            # source and station
+            ls_source, _, ls_station = ls_key.partition("/")
+
+            try:
+                # load record
+                M_DCT_HEALTH[(ls_source, ls_station)] = json.loads(ls_value)
+
+            # em caso de erro...
+            except (TypeError, ValueError) as l_err:
+                # logger
+                M_LOG.warning("Health record %s discarded: %s.", ls_key, str(l_err))
+
+    # return
+    return M_DCT_HEALTH
+
+# ---------------------------------------------------------------------------------------------
+def health_get(fs_source: str, fs_station: str):
+    """
+    health record of a station
+
+    :param fs_source (str): DS_HEALTH_REDEMET or DS_HEALTH_INMET
+    :param fs_station (str): station
+
+    :returns: copy of the record or None if never requested
+    """
+    with M_LOCK:
+        # record
+        ldct_rec = _records().get((fs_source, fs_station), None)
+
+        # return
+        return dict(ldct_rec) if ldct_rec is not None else None
+
+# ---------------------------------------------------------------------------------------------
+def health_order(fs_source: str, flst_stations):
+    """
+    stations in request order: healthy first, then by misses and by average latency
+
+    :param fs_source (str): DS_HEALTH_REDEMET or DS_HEALTH_INMET
+    :param flst_stations (iterable): stations
+
+    :returns: list of stations
+    """
+    with M_LOCK:
+        # records
+        ldct_health = _records()
+
+        # -------------------------------------------------------------------------------------
+        def _rank(fs_station):
+            # record
+            ldct_rec = ldct_health.get((fs_source, fs_station), None)
+
+            # return (never requested as healthy)
+            return (0, 0.) if ldct_rec is None else (ldct_rec["misses"], ldct_rec["latency"])
+
+        # return
+        return sorted(flst_stations, key=_rank)
+
+# ---------------------------------------------------------------------------------------------
+def health_record(fs_source: str, fs_station: str, fv_found: bool, ff_latency: float = None):
+    """
+    record the answer of a station request (transport errors are not station misses)
+
+    :param fs_source (str): DS_HEALTH_REDEMET or DS_HEALTH_INMET
+    :param fs_station (str): station
+    :param fv_found (bool): data found
+    :param ff_latency (float): request latency (s)
+    """
+    # now
+    lf_now = time.time()
+
+    with M_LOCK:
+        # record
+        ldct_rec = _records().setdefault((fs_source, fs_station),
+                                         {"misses": 0, "last_ok": None, "latency": 0., "next_probe": 0.})
+
+        # latency average
+        if ff_latency is not None:
+            ldct_rec["latency"] = ff_latency if not ldct_rec["latency"] else \
+                                  ldct_rec["latency"] + DF_HEALTH_ALPHA * (ff_latency - ldct_rec["latency"])
+
+        # found ?
+        if fv_found:
+            # healthy
+            ldct_rec["misses"] = 0
+            ldct_rec["last_ok"] = lf_now
+            ldct_rec["next_probe"] = 0.
+
+        # senão, miss
+        else:
+            # consecutive misses
+            ldct_rec["misses"] += 1
+
+            # chronically empty ?
+            if ldct_rec["misses"] >= DI_HEALTH_MISSES:
+                # next probe (backoff)
+                ldct_rec["next_probe"] = lf_now + min(DI_PROBE_MAX,
+                                                      DI_PROBE_BASE * 2 ** (ldct_rec["misses"] - DI_HEALTH_MISSES))
+
+        # changed
+        M_SET_DIRTY.add((fs_source, fs_station))
+
+# ---------------------------------------------------------------------------------------------
+def health_save():
+    """
+    save the changed records in the disk cache
+    """
+    with M_LOCK:
+        # records
+        ldct_health = _records()
+
+        # changed records
+        llst_items = [(dc.cache_key(ls_source, ls_station), json.dumps(ldct_health[(ls_source, ls_station)]),
+                       DI_HEALTH_TTL) for ls_source, ls_station in M_SET_DIRTY]
+
+        # all saved
+        M_SET_DIRTY.clear()
+
+    if llst_items:
+        # save in disk cache
+        dc.cache_put_many(DS_CACHE_HEALTH, llst_items)
+
+# ---------------------------------------------------------------------------------------------
+def health_skip(fs_source: str, fs_station: str):
+    """
+    skip the station ? (chronically empty and not due for a re-probe)
+
+    :param fs_source (str): DS_HEALTH_REDEMET or DS_HEALTH_INMET
+    :param fs_station (str): station
+
+    :returns: True to skip
+    """
+    with M_LOCK:
+        # record
+        ldct_rec = _records().get((fs_source, fs_station), None)
+
+        # return
+        return ldct_rec is not None and ldct_rec["misses"] >= DI_HEALTH_MISSES and \
+               time.time() < ldct_rec["next_probe"]
+
+# < the end >----------------------------------------------------------------------------------
@@ -0,0 +1,1410 @@
+# -*- coding: utf-8 -*-
+"""
+fl_http
+
+shared HTTP session of the REDEMET and INMET clients (keep-alive connection pools per host,
+token-bucket rate limit per host, adaptive (AIMD) limit of requests in flight per host,
+retries with jittered exponential backoff, a circuit breaker per host and hedged requests
+driven by the latency percentiles of each endpoint). Requests, retries and connection reuse
+are counted in fl_metrics
+
+2026.oct  mlabru  breaker probe flag cleared only by the outcome of the probe (allow tells the caller)
+2026.oct  mlabru  bytes of the metrics on the wire (Content-Length or raw bytes read), not decoded
+2026.oct  mlabru  hedge delay counted from the start of the first request, not from its queueing
+2026.oct  mlabru  connection reuse counted by a response hook (not read from the pools at close)
+2026.oct  mlabru  breaker probe given up by any attempt ended without an answer (not only the deadline)
+2026.oct  mlabru  SAimdLimit latency baseline per endpoint (bulk requests are not congestion)
+2026.oct  mlabru  hedges of one attempt, latency percentiles of the ok answers only
+2026.oct  mlabru  deadline per thread (http_with_deadline), hedges keep the deadline of the caller
+2026.oct  mlabru  SAimdLimit wakers, event loops woken when a thread frees a slot
+2026.oct  mlabru  pools not below DI_HTTP_POOL_MIN, replaced sessions drained (closed by http_close)
+2026.oct  mlabru  metrics of the requests (fl_metrics), http_close
+2026.oct  mlabru  SAimdLimit, requests in flight per host adapted to latency and errors (AIMD)
+2026.oct  mlabru  latency percentiles per endpoint, hedged requests (http_get_hedged)
+2026.oct  mlabru  circuit breaker per host (fail fast while an upstream is down)
+2026.oct  mlabru  connect/read timeouts, deadline of the hourly cycle
+2026.oct  mlabru  SSingleFlight, concurrent callers of a key share one fetch
+2026.oct  mlabru  record/replay (fl_replay)
+2026.oct  mlabru  token bucket per host, retries with backoff and Retry-After
+2026.oct  mlabru  initial version (Linux/Python)
+"""
+# < imports >----------------------------------------------------------------------------------
+
+# python library
+import collections
+import concurrent.futures
+import email.utils
+import logging
+import random
+import threading
+import time
+import urllib.parse
+
+# requests
+import requests
+import requests.adapters
+
+# local
+import fl_defs as df
+import fl_metrics as fm
+import fl_replay as rp
+
+# < constants >--------------------------------------------------------------------------------
+
+# hosts with a connection pool (REDEMET, INMET and spare)
+DI_HTTP_POOL_HOSTS = 4
+
+# connections per host (default, and lower and upper limits when sized to the worker count)
+DI_HTTP_POOL_SIZE = 16
+DI_HTTP_POOL_MIN = 8
+DI_HTTP_POOL_MAX = 64
+
+# wait for a free pooled connection instead of opening (and discarding) extra ones
+DV_HTTP_POOL_BLOCK = True
+
+# rate limit per host (requests per second, burst)
+DDCT_HTTP_RATE = {"api-redemet.decea.mil.br": (10., 20),
+                  "apitempo.inmet.gov.br":    (5., 10)}
+
+# rate limit of other hosts (requests per second, burst)
+DT_HTTP_RATE = (10., 20)
+
+# retries (after the first attempt)
+DI_HTTP_RETRIES = 4
+
+# backoff base and cap (s)
+DF_HTTP_BACKOFF = 0.5
+DF_HTTP_BACKOFF_MAX = 30.
+
+# consecutive failures (transport errors, 5xx) that open the circuit of a host
+DI_BREAKER_FAILURES = 5
+
+# open circuit: time before a probe, doubled on each failed probe, and cap (s)
+DF_BREAKER_OPEN = 30.
+DF_BREAKER_OPEN_MAX = 600.
+
+# requests in flight per host: initial, floor and ceiling (the connection pool size)
+DI_AIMD_INITIAL = 8
+DI_AIMD_MIN = 1
+DI_AIMD_MAX = DI_HTTP_POOL_MAX
+
+# limit cut on congestion (factor)
+DF_AIMD_DECREASE = 0.5
+
+# congestion: latency average above this many times the lowest latency seen
+DF_AIMD_TOLERANCE = 3.
+
+# latency average weight
+DF_AIMD_ALPHA = 0.2
+
+# latencies kept per endpoint (last requests)
+DI_LATENCY_WINDOW = 500
+
+# hedge: a duplicate request goes when the first one has not answered by this latency
+# percentile of the endpoint, once it has enough samples
+DF_HEDGE_PERCENTILE = 95.
+DI_HEDGE_SAMPLES = 20
+
+# hedges per hourly cycle (0 for no hedging)
+DI_HEDGE_MAX = 50
+
+# connect and read timeouts (s)
+DT_HTTP_TIMEOUT = (5., 30.)
+
+# status codes retried (throttled or upstream failure)
+DSET_HTTP_RETRY = frozenset((429, 500, 502, 503, 504))
+
+# request headers (keep-alive and gzip)
+DDCT_HTTP_HEADERS = {"Accept-Encoding": "gzip, deflate",
+                     "Connection": "keep-alive",
+                     "User-Agent": "frontline"}
+
+# < logging >----------------------------------------------------------------------------------
+
+# logger
+M_LOG = logging.getLogger(__name__)
+M_LOG.setLevel(df.DI_LOG_LEVEL)
+
+# < SAimdLimit >-------------------------------------------------------------------------------
+
+class SAimdLimit:
+    """
+    adaptive limit of the requests in flight to one host, shared by all threads (and
+    coroutines). Additive increase (one slot per limit of healthy answers while the limit is
+    reached), multiplicative decrease on congestion (error, 429, 5xx or latency average of an
+    endpoint above DF_AIMD_TOLERANCE times its lowest latency), once per round trip
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self, fs_host: str):
+        """
+        constructor
+
+        :param fs_host (str): host
+        """
+        # host
+        self._s_host = fs_host
+
+        # limit and requests in flight
+        self._f_limit = float(DI_AIMD_INITIAL)
+        self._i_inflight = 0
+
+        # latencies of the healthy answers (s) and their average, per endpoint (a bulk request
+        # is slower than a single one, not a congestion)
+        self._dct_latency = {}
+        self._dct_average = {}
+
+        # last cut (time.monotonic)
+        self._f_cut = 0.
+
+        # limit guard (threads wait here for a slot)
+        self._o_cond = threading.Condition()
+
+        # called when a slot is freed, from any thread (event loops waiting for a slot)
+        self._lst_wakers = []
+
+    # -----------------------------------------------------------------------------------------
+    def _take(self):
+        """
+        take a slot if free (call with _o_cond held)
+
+        :returns: True if taken
+        """
+        # full ?
+        if self._i_inflight >= int(self._f_limit):
+            # return
+            return False
+
+        # take slot
+        self._i_inflight += 1
+
+        # return
+        return True
+
+    # -----------------------------------------------------------------------------------------
+    def _wake(self):
+        """
+        call the wakers (a slot was freed, call without _o_cond held)
+        """
+        # for all wakers...
+        for lf_waker in list(self._lst_wakers):
+            # wake
+            lf_waker()
+
+    # -----------------------------------------------------------------------------------------
+    def acquire(self, ff_timeout: float = None):
+        """
+        wait for a slot
+
+        :param ff_timeout (float): wait (s), None for no limit
+
+        :returns: True if taken, False on timeout
+        """
+        with self._o_cond:
+            # return
+            return self._o_cond.wait_for(self._take, ff_timeout)
+
+    # -----------------------------------------------------------------------------------------
+    def cancel(self):
+        """
+        free a slot not used (no request)
+        """
+        with self._o_cond:
+            # free slot
+            self._i_inflight -= 1
+
+            # wake a waiter
+            self._o_cond.notify()
+
+        # wake the event loops
+        self._wake()
+
+    # -----------------------------------------------------------------------------------------
+    def add_waker(self, f_waker):
+        """
+        call f_waker (from the releasing thread) whenever a slot is freed
+
+        :param f_waker (callable): waker, no arguments (loop.call_soon_threadsafe of a coroutine waker)
+        """
+        with self._o_cond:
+            # save waker
+            self._lst_wakers.append(f_waker)
+
+    # -----------------------------------------------------------------------------------------
+    def limit(self):
+        """
+        current limit
+
+        :returns: requests in flight allowed
+        """
+        # return
+        return int(self._f_limit)
+
+    # -----------------------------------------------------------------------------------------
+    def release(self, ff_start: float, fv_ok: bool, fs_endpoint: str = None):
+        """
+        free the slot of a request and adapt the limit to its answer
+
+        :param ff_start (float): request start (time.monotonic)
+        :param fv_ok (bool): answered (not 429 or 5xx)
+        :param fs_endpoint (str): endpoint name (latency baseline)
+        """
+        # now and latency
+        lf_now = time.monotonic()
+        lf_latency = lf_now - ff_start
+
+        with self._o_cond:
+            # limit before
+            li_before = int(self._f_limit)
+
+            # saturated (all slots in use) ?
+            lv_full = self._i_inflight >= int(self._f_limit)
+
+            # free slot
+            self._i_inflight -= 1
+
+            if fv_ok:
+                # latencies of the endpoint
+                ldq_latency = self._dct_latency.setdefault(fs_endpoint,
+                                                           collections.deque(maxlen=DI_LATENCY_WINDOW))
+                ldq_latency.append(lf_latency)
+
+                # latency average of the endpoint
+                lf_average = self._dct_average.get(fs_endpoint, None)
+                lf_average = lf_latency if lf_average is None else \
+                             lf_average + DF_AIMD_ALPHA * (lf_latency - lf_average)
+                self._dct_average[fs_endpoint] = lf_average
+
+            # congestion ?
+            lv_congested = not fv_ok or lf_average > DF_AIMD_TOLERANCE * min(ldq_latency)
+
+            # congestion (request sent after the last cut) ?
+            if lv_congested and ff_start >= self._f_cut:
+                # multiplicative decrease
+                self._f_limit = max(float(DI_AIMD_MIN), self._f_limit * DF_AIMD_DECREASE)
+                self._f_cut = lf_now
+
+                # latency averages start again
+                self._dct_average.clear()
+
+            # senão, healthy and saturated ?
+            elif not lv_congested and lv_full:
+                # additive increase
+                self._f_limit = min(float(DI_AIMD_MAX), self._f_limit + 1. / self._f_limit)
+
+            # wake waiters (freed slot and maybe a new one)
+            self._o_cond.notify(2)
+
+            # limit after
+            li_after = int(self._f_limit)
+
+        # wake the event loops
+        self._wake()
+
+        # cut ?
+        if li_after < li_before:
+            # logger
+            M_LOG.debug("HTTP limit of %s cut to %d requests in flight.", self._s_host, li_after)
+
+    # -----------------------------------------------------------------------------------------
+    def remove_waker(self, f_waker):
+        """
+        stop calling f_waker (see add_waker)
+
+        :param f_waker (callable): waker
+        """
+        with self._o_cond:
+            # remove waker
+            if f_waker in self._lst_wakers:
+                self._lst_wakers.remove(f_waker)
+
+    # -----------------------------------------------------------------------------------------
+    def try_acquire(self):
+        """
+        take a slot if free, no wait (coroutines)
+
+        :returns: True if taken
+        """
+        with self._o_cond:
+            # return
+            return self._take()
+
+# < SCircuitBreaker >--------------------------------------------------------------------------
+
+class SCircuitBreaker:
+    """
+    circuit breaker of one host, shared by all threads (and coroutines). Closed: requests go.
+    Open (after DI_BREAKER_FAILURES consecutive failures): requests fail fast. Half-open (open
+    time elapsed): one probe goes, its answer closes or reopens the circuit
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self, fs_host: str):
+        """
+        constructor
+
+        :param fs_host (str): host
+        """
+        # host
+        self._s_host = fs_host
+
+        # consecutive failures
+        self._i_failures = 0
+
+        # open until (time.monotonic, None if closed) and open time
+        self._f_open_until = None
+        self._f_open = DF_BREAKER_OPEN
+
+        # probe in flight (half-open)
+        self._v_probe = False
+
+        # breaker guard
+        self._o_lock = threading.Lock()
+
+    # -----------------------------------------------------------------------------------------
+    def abandon(self, fv_probe: bool):
+        """
+        an allowed request ended without an answer (deadline, cancel, unexpected error)
+
+        :param fv_probe (bool): the request is the probe (from allow), which is given up
+        """
+        # not the probe ? (the probe of another caller stays in flight)
+        if not fv_probe:
+            # quit
+            return
+
+        with self._o_lock:
+            # no probe in flight
+            self._v_probe = False
+
+    # -----------------------------------------------------------------------------------------
+    def allow(self):
+        """
+        may a request go ?
+
+        :returns: (go, probe): go True if closed, or as the probe of a half-open circuit; probe
+                  True if the caller is that probe (to give to abandon/failure/success)
+        """
+        with self._o_lock:
+            # closed ?
+            if self._f_open_until is None:
+                # return
+                return True, False
+
+            # open (or probe in flight) ?
+            if self._v_probe or time.monotonic() < self._f_open_until:
+                # return (fail fast)
+                return False, False
+
+            # half-open, this request is the probe
+            self._v_probe = True
+
+            # return
+            return True, True
+
+    # -----------------------------------------------------------------------------------------
+    def failure(self, fv_count: bool = True, fv_probe: bool = False):
+        """
+        a request failed (transport error, 5xx)
+
+        :param fv_count (bool): count it, False for the retries of a call already counted (the
+                                retries of one call don't open the circuit alone)
+        :param fv_probe (bool): the request is the probe (from allow)
+        """
+        with self._o_lock:
+            # consecutive failures
+            if fv_count:
+                self._i_failures += 1
+
+            # failed probe ?
+            if fv_probe and self._v_probe:
+                # reopen for longer
+                self._v_probe = False
+                self._f_open = min(self._f_open * 2., DF_BREAKER_OPEN_MAX)
+
+            # closed and not enough failures ?
+            elif self._f_open_until is None and self._i_failures < DI_BREAKER_FAILURES:
+                # quit
+                return
+
+            # senão, already open (answer of a request sent before opening)
+            elif self._f_open_until is not None:
+                # quit
+                return
+
+            # open
+            self._f_open_until = time.monotonic() + self._f_open
+
+        # logger
+        M_LOG.error("HTTP circuit of %s open for %.0f s after %d failures.", self._s_host, self._f_open,
+                    self._i_failures)
+
+    # -----------------------------------------------------------------------------------------
+    def success(self, fv_probe: bool = False):
+        """
+        a request got an answer (upstream alive)
+
+        :param fv_probe (bool): the request is the probe (from allow)
+        """
+        with self._o_lock:
+            # was open ?
+            lv_open = self._f_open_until is not None
+
+            # close
+            self._i_failures = 0
+            self._f_open_until = None
+            self._f_open = DF_BREAKER_OPEN
+
+            # the probe answered ? (the probe of another caller stays in flight)
+            if fv_probe:
+                self._v_probe = False
+
+        if lv_open:
+            # logger
+            M_LOG.info("HTTP circuit of %s closed.", self._s_host)
+
+# < SLatency >---------------------------------------------------------------------------------
+
+class SLatency:
+    """
+    latencies of the last DI_LATENCY_WINDOW requests of one endpoint, shared by all threads
+    (and coroutines)
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self):
+        """
+        constructor
+        """
+        # latencies (s)
+        self._dq_window = collections.deque(maxlen=DI_LATENCY_WINDOW)
+
+        # latencies guard
+        self._o_lock = threading.Lock()
+
+    # -----------------------------------------------------------------------------------------
+    def __len__(self):
+        """
+        samples in the window
+        """
+        # return
+        return len(self._dq_window)
+
+    # -----------------------------------------------------------------------------------------
+    def add(self, ff_latency: float):
+        """
+        save the latency of a request
+
+        :param ff_latency (float): request latency (s)
+        """
+        with self._o_lock:
+            # save latency
+            self._dq_window.append(ff_latency)
+
+    # -----------------------------------------------------------------------------------------
+    def percentile(self, ff_percentile: float):
+        """
+        latency percentile (nearest rank)
+
+        :param ff_percentile (float): percentile (0 to 100)
+
+        :returns: latency (s) or None if no samples
+        """
+        with self._o_lock:
+            # sorted latencies
+            llst_sorted = sorted(self._dq_window)
+
+        if not llst_sorted:
+            # return with error
+            return None
+
+        # rank
+        li_rank = int(round(ff_percentile / 100. * len(llst_sorted))) - 1
+
+        # return
+        return llst_sorted[min(len(llst_sorted) - 1, max(0, li_rank))]
+
+# < SSingleFlight >----------------------------------------------------------------------------
+
+class SSingleFlight:
+    """
+    request coalescing: concurrent callers of the same key wait for the one call in flight
+    and share its result (or its exception)
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self):
+        """
+        constructor
+        """
+        # calls in flight ({key: [done event, result, exception]})
+        self._dct_calls = {}
+
+        # calls guard
+        self._o_lock = threading.Lock()
+
+    # -----------------------------------------------------------------------------------------
+    def do(self, ft_key, f_call, *flst_args):
+        """
+        call f_call(*flst_args), or wait for the call of ft_key already in flight
+
+        :param ft_key (hashable): call key
+        :param f_call (callable): call
+        :param flst_args (list): call arguments
+
+        :returns: call result
+        """
+        with self._o_lock:
+            # call in flight ?
+            llst_call = self._dct_calls.get(ft_key, None)
+
+            # leader ?
+            lv_leader = llst_call is None
+
+            if lv_leader:
+                # new call
+                llst_call = self._dct_calls[ft_key] = [threading.Event(), None, None]
+
+        # follower ?
+        if not lv_leader:
+            # wait for the leader
+            llst_call[0].wait()
+
+            # leader failed ?
+            if llst_call[2] is not None:
+                raise llst_call[2]
+
+            # return shared result
+            return llst_call[1]
+
+        try:
+            # call
+            llst_call[1] = f_call(*flst_args)
+
+        # em caso de erro,...
+        except Exception as l_err:
+            # share exception
+            llst_call[2] = l_err
+
+            # re-raise
+            raise
+
+        finally:
+            with self._o_lock:
+                # call done (new callers start a new call)
+                del self._dct_calls[ft_key]
+
+            # wake followers
+            llst_call[0].set()
+
+        # return
+        return llst_call[1]
+
+# < STokenBucket >-----------------------------------------------------------------------------
+
+class STokenBucket:
+    """
+    token bucket of one host, shared by all threads (and coroutines). A request reserves a
+    token and waits the time returned (the bucket may go into debt, so waiters are paced in
+    arrival order)
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self, ff_rate: float, fi_burst: int):
+        """
+        constructor
+
+        :param ff_rate (float): tokens per second
+        :param fi_burst (int): bucket size
+        """
+        # rate and size
+        self._f_rate = float(ff_rate)
+        self._f_burst = float(fi_burst)
+
+        # tokens (full) and last refill
+        self._f_tokens = self._f_burst
+        self._f_last = time.monotonic()
+
+        # no request before (Retry-After)
+        self._f_hold = 0.
+
+        # bucket guard
+        self._o_lock = threading.Lock()
+
+    # -----------------------------------------------------------------------------------------
+    def hold(self, ff_delay: float):
+        """
+        no request of this host before ff_delay seconds (Retry-After)
+
+        :param ff_delay (float): delay (s)
+        """
+        with self._o_lock:
+            # hold host
+            self._f_hold = max(self._f_hold, time.monotonic() + ff_delay)
+
+    # -----------------------------------------------------------------------------------------
+    def reserve(self):
+        """
+        reserve a token
+
+        :returns: time to wait before the request (s)
+        """
+        with self._o_lock:
+            # now
+            lf_now = time.monotonic()
+
+            # refill
+            self._f_tokens = min(self._f_burst, self._f_tokens + (lf_now - self._f_last) * self._f_rate)
+            self._f_last = lf_now
+
+            # take token (maybe into debt)
+            self._f_tokens -= 1.
+
+            # wait for the debt and for the host hold
+            return max(0., -self._f_tokens / self._f_rate, self._f_hold - lf_now)
+
+# < local data >-------------------------------------------------------------------------------
+
+# shared session (created on first use)
+M_SESSION = None
+
+# sessions replaced by http_configure (drained by the requests started on them, closed by http_close)
+M_LST_RETIRED = []
+
+# token buckets by host
+M_DCT_BUCKETS = {}
+
+# circuit breakers by host
+M_DCT_BREAKERS = {}
+
+# requests in flight limits by host
+M_DCT_LIMITS = {}
+
+# latencies by endpoint
+M_DCT_LATENCY = {}
+
+# hedges of the hourly cycle and hedges left
+M_HEDGES_SET = DI_HEDGE_MAX
+M_HEDGES = DI_HEDGE_MAX
+
+# threads of the hedged requests (created on first use)
+M_HEDGE_POOL = None
+
+# session and buckets guard
+M_LOCK = threading.Lock()
+
+# deadline of the requests (time.monotonic, None for no deadline)
+M_DEADLINE = None
+
+# deadline of the calling thread (http_with_deadline), over M_DEADLINE
+M_LOCAL = threading.local()
+
+# ---------------------------------------------------------------------------------------------
+def _count_connection(f_response, *flst_args, **fdct_args):
+    """
+    response hook of the sessions: each request counted in fl_metrics with its host and
+    whether it opened a new connection or reused a pooled one (urllib3 connections are marked
+    on their first request)
+
+    :param f_response (Response): response (body not read yet, connection still attached)
+    """
+    # connection of the response (urllib3)
+    lo_conn = getattr(f_response.raw, "connection", None)
+
+    # new connection (not marked yet) ?
+    lv_new = lo_conn is not None and not getattr(lo_conn, "fl_used", False)
+
+    # mark connection
+    if lv_new:
+        lo_conn.fl_used = True
+
+    # save request
+    fm.metrics_connections(urllib.parse.urlsplit(f_response.url).hostname, 1, int(lv_new))
+
+# ---------------------------------------------------------------------------------------------
+def _new_session(fi_pool_size: int):
+    """
+    create a session with keep-alive connection pools
+
+    :param fi_pool_size (int): connections per host
+
+    :returns: session
+    """
+    # create session
+    lo_session = requests.Session()
+    lo_session.headers.update(DDCT_HTTP_HEADERS)
+
+    # connection reuse of each request (fl_metrics)
+    lo_session.hooks["response"].append(_count_connection)
+
+    # connection pools (one per host, fi_pool_size connections each)
+    lo_adapter = requests.adapters.HTTPAdapter(pool_connections=DI_HTTP_POOL_HOSTS,
+                                               pool_maxsize=fi_pool_size,
+                                               pool_block=DV_HTTP_POOL_BLOCK)
+
+    # mount adapter
+    lo_session.mount("https://", lo_adapter)
+    lo_session.mount("http://", lo_adapter)
+
+    # return
+    return lo_session
+
+# ---------------------------------------------------------------------------------------------
+def _run_started(fo_started, f_call, *flst_args, **fdct_args):
+    """
+    set fo_started and call f_call (a pool thread took the job)
+
+    :param fo_started (Event): set when the call starts
+    :param f_call (callable): function
+    :param flst_args (list): positional arguments of f_call
+    :param fdct_args (dict): keyword arguments of f_call
+
+    :returns: f_call result
+    """
+    # started
+    fo_started.set()
+
+    # return
+    return f_call(*flst_args, **fdct_args)
+
+# ---------------------------------------------------------------------------------------------
+def _wire_bytes(f_response):
+    """
+    body bytes on the wire (compressed): Content-Length, else the bytes read by urllib3, else
+    the decoded length
+
+    :param f_response (Response): response (body read)
+
+    :returns: bytes
+    """
+    # body length
+    ls_length = f_response.headers.get("Content-Length", None)
+
+    if ls_length is not None and ls_length.isdigit():
+        # return
+        return int(ls_length)
+
+    try:
+        # return (bytes pulled from the connection)
+        return int(f_response.raw.tell())
+
+    # em caso de erro (no urllib3 response),...
+    except (AttributeError, OSError, TypeError, ValueError):
+        # return (decoded length)
+        return len(f_response.content)
+
+# ---------------------------------------------------------------------------------------------
+def http_close():
+    """
+    close the shared session and the replaced ones (end of the run)
+    """
+    # global session
+    global M_SESSION
+
+    with M_LOCK:
+        # sessions
+        llst_sessions = M_LST_RETIRED + ([M_SESSION] if M_SESSION is not None else [])
+
+        # no session
+        M_SESSION = None
+        M_LST_RETIRED.clear()
+
+    # for all sessions...
+    for lo_session in llst_sessions:
+        # close pools
+        lo_session.close()
+
+# ---------------------------------------------------------------------------------------------
+def http_configure(fi_workers: int):
+    """
+    size the connection pools to the worker count (threads requesting at the same time). The
+    previous session is not closed, requests already started on it finish there (see http_close)
+
+    :param fi_workers (int): worker count
+    """
+    # global session
+    global M_SESSION
+
+    # connections per host
+    li_pool_size = max(DI_HTTP_POOL_MIN, min(int(fi_workers), DI_HTTP_POOL_MAX))
+
+    with M_LOCK:
+        # previous session (drained, closed by http_close)
+        if M_SESSION is not None:
+            M_LST_RETIRED.append(M_SESSION)
+
+        # new session
+        M_SESSION = _new_session(li_pool_size)
+
+    # logger
+    M_LOG.debug("HTTP pools sized to %d connections per host.", li_pool_size)
+
+# ---------------------------------------------------------------------------------------------
+def http_breaker(fs_url: str):
+    """
+    circuit breaker of the URL host (created on first use)
+
+    :param fs_url (str): URL
+
+    :returns: SCircuitBreaker
+    """
+    # host
+    ls_host = urllib.parse.urlsplit(fs_url).hostname or ""
+
+    with M_LOCK:
+        # host breaker
+        lo_breaker = M_DCT_BREAKERS.get(ls_host, None)
+
+        if lo_breaker is None:
+            # create breaker
+            lo_breaker = M_DCT_BREAKERS[ls_host] = SCircuitBreaker(ls_host)
+
+    # return
+    return lo_breaker
+
+# ---------------------------------------------------------------------------------------------
+def http_bucket(fs_url: str):
+    """
+    token bucket of the URL host (created on first use)
+
+    :param fs_url (str): URL
+
+    :returns: STokenBucket
+    """
+    # host
+    ls_host = urllib.parse.urlsplit(fs_url).hostname or ""
+
+    with M_LOCK:
+        # host bucket
+        lo_bucket = M_DCT_BUCKETS.get(ls_host, None)
+
+        if lo_bucket is None:
+            # create bucket
+            lo_bucket = M_DCT_BUCKETS[ls_host] = STokenBucket(*DDCT_HTTP_RATE.get(ls_host, DT_HTTP_RATE))
+
+    # return
+    return lo_bucket
+
+# ---------------------------------------------------------------------------------------------
+def http_get(fs_endpoint: str, fs_url: str, fi_retries: int = DI_HTTP_RETRIES, **fdct_args):
+    """
+    GET through the shared session, paced by the host token bucket and retried with backoff
+    on transport errors, 429 and 5xx. Requests in flight to the host are bounded by its AIMD
+    limit. Requests time out (DT_HTTP_TIMEOUT, read cut to the deadline), none starts after
+    the deadline and they fail fast while the circuit of the host is open
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+    :param fs_url (str): URL
+    :param fi_retries (int): retries after the first attempt
+    :param fdct_args (dict): requests arguments
+
+    :returns: response (last one if retries exhausted) or None on transport error, deadline
+              or open circuit
+    """
+    # host bucket, breaker and limit (upstream host, also on replay)
+    lo_bucket = http_bucket(fs_url)
+    lo_breaker = http_breaker(fs_url)
+    lo_limit = http_limit(fs_url)
+
+    # record/replay mode
+    ls_mode = rp.replay_mode()
+
+    # URL requested (stand-in on replay)
+    ls_url = rp.replay_url(fs_url) if rp.DS_MODE_REPLAY == ls_mode else fs_url
+
+    # timeouts
+    lt_timeout_cfg = fdct_args.pop("timeout", DT_HTTP_TIMEOUT)
+
+    # no response, no failure counted by the breaker, no breaker outcome due, not the probe
+    l_response = None
+    lv_failed = False
+    lv_pending = False
+    lv_probe = False
+
+    try:
+        # for all attempts...
+        for li_attempt in range(fi_retries + 1):
+            # may go ? (as the probe of a half-open circuit ?)
+            lv_go, lv_probe = lo_breaker.allow()
+
+            # circuit open ?
+            if not lv_go:
+                # logger
+                M_LOG.debug("HTTP %s not requested: circuit open.", fs_endpoint)
+
+                # metrics
+                fm.metrics_count(fs_endpoint, fm.DS_EVENT_CIRCUIT)
+
+                # return last response (or None)
+                return l_response
+
+            # allowed (maybe the probe): success or failure due
+            lv_pending = True
+
+            # time left
+            lf_remaining = http_remaining()
+
+            # wait for a token (not past the deadline)
+            if lf_remaining is None or lf_remaining > 0.:
+                lf_wait = lo_bucket.reserve()
+                time.sleep(lf_wait if lf_remaining is None else min(lf_wait, lf_remaining))
+
+                # time left
+                lf_remaining = http_remaining()
+
+            # wait for a slot (until the deadline)
+            lv_slot = (lf_remaining is None or lf_remaining > 0.) and lo_limit.acquire(lf_remaining)
+
+            # time left
+            lf_remaining = http_remaining()
+
+            # deadline passed ?
+            if not lv_slot or (lf_remaining is not None and lf_remaining <= 0.):
+                # slot not used
+                if lv_slot:
+                    lo_limit.cancel()
+
+                # logger
+                M_LOG.warning("HTTP %s not requested: deadline passed.", fs_endpoint)
+
+                # metrics
+                fm.metrics_count(fs_endpoint, fm.DS_EVENT_DEADLINE)
+
+                # return last response (or None)
+                return l_response
+
+            # no response, no Retry-After
+            l_response = None
+            ls_retry_after = None
+
+            # timeouts (cut to the deadline)
+            lt_timeout = lt_timeout_cfg if lf_remaining is None else \
+                         (min(lt_timeout_cfg[0], lf_remaining), min(lt_timeout_cfg[1], lf_remaining))
+
+            # request start
+            lf_ini = time.monotonic()
+
+            try:
+                # request
+                l_response = http_session().get(ls_url, timeout=lt_timeout, **fdct_args)
+
+                # latency (body included)
+                lf_latency = time.monotonic() - lf_ini
+
+                # endpoint latency (ok answers only: 429 and 5xx answer fast)
+                if l_response.status_code < 400:
+                    http_latency(fs_endpoint).add(lf_latency)
+
+                # metrics
+                fm.metrics_request(fs_endpoint, lf_latency, l_response.status_code, _wire_bytes(l_response))
+
+            # em caso de erro,...
+            except requests.RequestException as l_err:
+                # logger
+                M_LOG.warning("HTTP %s request error (attempt %d): %s.",
+                              fs_endpoint, li_attempt + 1, str(l_err))
+
+                # metrics
+                fm.metrics_count(fs_endpoint, fm.DS_EVENT_ERROR)
+
+            finally:
+                # free slot (answered and not throttled or failed: upstream healthy)
+                lo_limit.release(lf_ini, l_response is not None and l_response.status_code not in DSET_HTTP_RETRY,
+                                 fs_endpoint)
+
+            # upstream down (no answer or 5xx) ? (one failure per call)
+            if l_response is None or l_response.status_code >= 500:
+                lo_breaker.failure(not lv_failed, lv_probe)
+                lv_failed = True
+
+            # senão, upstream alive (even if throttled)
+            else:
+                lo_breaker.success(lv_probe)
+
+            # breaker outcome given
+            lv_pending = False
+
+            # answer (not retried) ?
+            if l_response is not None:
+                if l_response.status_code not in DSET_HTTP_RETRY:
+                    # recording ?
+                    if rp.DS_MODE_RECORD == ls_mode:
+                        # save fixture
+                        rp.record(fs_url, l_response.status_code, l_response.headers, l_response.text)
+
+                    # return
+                    return l_response
+
+                # Retry-After
+                ls_retry_after = l_response.headers.get("Retry-After", None)
+
+                # logger
+                M_LOG.warning("HTTP %s code %d (attempt %d).",
+                              fs_endpoint, l_response.status_code, li_attempt + 1)
+
+            # last attempt ?
+            if li_attempt >= fi_retries:
+                # quit
+                break
+
+            # metrics
+            fm.metrics_count(fs_endpoint, fm.DS_EVENT_RETRY)
+
+            # delay
+            lf_delay = http_retry_delay(li_attempt, ls_retry_after)
+
+            # throttled ? hold every request to the host
+            if ls_retry_after is not None:
+                lo_bucket.hold(lf_delay)
+
+            # wait (not past the deadline)
+            lf_remaining = http_remaining()
+            time.sleep(lf_delay if lf_remaining is None else min(lf_delay, max(0., lf_remaining)))
+
+    finally:
+        # allowed attempt ended without an answer (error out of the loop) ? give up its probe
+        if lv_pending:
+            lo_breaker.abandon(lv_probe)
+
+    # logger
+    M_LOG.error("HTTP %s failed after %d attempts.", fs_endpoint, fi_retries + 1)
+
+    # return last response (or None)
+    return l_response
+
+# ---------------------------------------------------------------------------------------------
+def http_deadline(ff_deadline: float = None):
+    """
+    set the deadline of the requests (hourly cycle budget)
+
+    :param ff_deadline (float): deadline (time.monotonic) or None for no deadline
+    """
+    # global deadline
+    global M_DEADLINE
+
+    # set deadline
+    M_DEADLINE = ff_deadline
+
+# ---------------------------------------------------------------------------------------------
+def http_get_deadline():
+    """
+    deadline of the calling thread (see http_with_deadline), else the one of http_deadline
+
+    :returns: deadline (time.monotonic) or None for no deadline
+    """
+    # deadline of the thread (a tuple) or the global one
+    lt_deadline = getattr(M_LOCAL, "t_deadline", None)
+
+    # return
+    return M_DEADLINE if lt_deadline is None else lt_deadline[0]
+
+# ---------------------------------------------------------------------------------------------
+def http_get_hedged(fs_endpoint: str, fs_url: str, **fdct_args):
+    """
+    http_get, and a duplicate request (one attempt) if the first one has not answered by the
+    hedge delay of the endpoint (see http_hedge_delay). The first ok answer is used, the other
+    one is discarded
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+    :param fs_url (str): URL
+    :param fdct_args (dict): requests arguments
+
+    :returns: response or None (see http_get)
+    """
+    # global pool
+    global M_HEDGE_POOL
+
+    # hedge delay
+    lf_delay = http_hedge_delay(fs_endpoint)
+
+    # no hedging ?
+    if lf_delay is None:
+        # return
+        return http_get(fs_endpoint, fs_url, **fdct_args)
+
+    # not created yet ?
+    if M_HEDGE_POOL is None:
+        with M_LOCK:
+            # still not created ?
+            if M_HEDGE_POOL is None:
+                # create pool (a first request and its hedge per worker)
+                M_HEDGE_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2 * DI_HTTP_POOL_MAX,
+                                                                     thread_name_prefix="hedge")
+
+    # deadline of the caller (the pool threads do not have it)
+    lf_deadline = http_get_deadline()
+
+    # first request (started by a pool thread)
+    lo_started = threading.Event()
+    l_first = M_HEDGE_POOL.submit(_run_started, lo_started, http_with_deadline, lf_deadline, http_get,
+                                  fs_endpoint, fs_url, **fdct_args)
+
+    # wait for a pool thread (a request still queued in a busy pool is not slow)
+    lo_started.wait()
+
+    try:
+        # return (answered by the hedge delay, counted from the start of the request)
+        return l_first.result(timeout=lf_delay)
+
+    # em caso de erro,...
+    except concurrent.futures.TimeoutError:
+        # slow request
+        pass
+
+    # no hedge left ?
+    if not http_hedge_take():
+        # return
+        return l_first.result()
+
+    # logger
+    M_LOG.debug("HTTP %s hedged after %.2f s.", fs_endpoint, lf_delay)
+
+    # metrics
+    fm.metrics_count(fs_endpoint, fm.DS_EVENT_HEDGE)
+
+    # hedge request (one attempt, the first request does the retries)
+    l_hedge = M_HEDGE_POOL.submit(http_with_deadline, lf_deadline, http_get, fs_endpoint, fs_url, 0,
+                                  **fdct_args)
+
+    # no response
+    l_response = None
+
+    # for all requests (in answer order)...
+    for l_future in concurrent.futures.as_completed((l_first, l_hedge)):
+        # response
+        l_response = l_future.result()
+
+        # ok ?
+        if l_response is not None and 200 == l_response.status_code:
+            # return (the other one is discarded)
+            return l_response
+
+    # return last response (or None)
+    return l_response
+
+# ---------------------------------------------------------------------------------------------
+def http_hedge_delay(fs_endpoint: str):
+    """
+    hedge delay of the endpoint (DF_HEDGE_PERCENTILE of its latencies)
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+
+    :returns: delay (s) or None for no hedging (too few samples or no hedge left)
+    """
+    # endpoint latencies
+    lo_latency = http_latency(fs_endpoint)
+
+    # no hedge left or too few samples ?
+    if M_HEDGES <= 0 or len(lo_latency) < DI_HEDGE_SAMPLES:
+        # return
+        return None
+
+    # return
+    return lo_latency.percentile(DF_HEDGE_PERCENTILE)
+
+# ---------------------------------------------------------------------------------------------
+def http_hedge_take():
+    """
+    take a hedge of the hourly cycle
+
+    :returns: True if taken, False if none left
+    """
+    # global hedges
+    global M_HEDGES
+
+    with M_LOCK:
+        # none left ?
+        if M_HEDGES <= 0:
+            # return
+            return False
+
+        # take hedge
+        M_HEDGES -= 1
+
+    # return
+    return True
+
+# ---------------------------------------------------------------------------------------------
+def http_hedges(fi_hedges: int = DI_HEDGE_MAX):
+    """
+    set the hedges of the hourly cycle
+
+    :param fi_hedges (int): hedges (0 for no hedging)
+    """
+    # global hedges
+    global M_HEDGES, M_HEDGES_SET
+
+    with M_LOCK:
+        # new cycle
+        M_HEDGES_SET = M_HEDGES = max(0, int(fi_hedges))
+
+# ---------------------------------------------------------------------------------------------
+def http_hedges_used():
+    """
+    hedges used in the hourly cycle
+
+    :returns: hedges used
+    """
+    with M_LOCK:
+        # return
+        return M_HEDGES_SET - M_HEDGES
+
+# ---------------------------------------------------------------------------------------------
+def http_latency(fs_endpoint: str):
+    """
+    latencies of the endpoint (created on first use)
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+
+    :returns: SLatency
+    """
+    with M_LOCK:
+        # endpoint latencies
+        lo_latency = M_DCT_LATENCY.get(fs_endpoint, None)
+
+        if lo_latency is None:
+            # create latencies
+            lo_latency = M_DCT_LATENCY[fs_endpoint] = SLatency()
+
+    # return
+    return lo_latency
+
+# ---------------------------------------------------------------------------------------------
+def http_latency_report():
+    """
+    latency percentiles of all endpoints (p50, p95, p99), for the logs
+
+    :returns: {endpoint: (samples, p50, p95, p99)}
+    """
+    with M_LOCK:
+        # endpoints
+        llst_items = list(M_DCT_LATENCY.items())
+
+    # return
+    return {ls_endpoint: (len(lo_latency), lo_latency.percentile(50.), lo_latency.percentile(95.),
+                          lo_latency.percentile(99.))
+            for ls_endpoint, lo_latency in llst_items if len(lo_latency)}
+
+# ---------------------------------------------------------------------------------------------
+def http_limit(fs_url: str):
+    """
+    requests in flight limit of the URL host (created on first use)
+
+    :param fs_url (str): URL
+
+    :returns: SAimdLimit
+    """
+    # host
+    ls_host = urllib.parse.urlsplit(fs_url).hostname or ""
+
+    with M_LOCK:
+        # host limit
+        lo_limit = M_DCT_LIMITS.get(ls_host, None)
+
+        if lo_limit is None:
+            # create limit
+            lo_limit = M_DCT_LIMITS[ls_host] = SAimdLimit(ls_host)
+
+    # return
+    return lo_limit
+
+# ---------------------------------------------------------------------------------------------
+def http_limits():
+    """
+    requests in flight limits of all hosts, for the logs
+
+    :returns: {host: limit}
+    """
+    with M_LOCK:
+        # return
+        return {ls_host: lo_limit.limit() for ls_host, lo_limit in M_DCT_LIMITS.items()}
+
+# ---------------------------------------------------------------------------------------------
+def http_remaining():
+    """
+    time left until the deadline
+
+    :returns: seconds (may be negative) or None for no deadline
+    """
+    # deadline
+    lf_deadline = http_get_deadline()
+
+    # return
+    return None if lf_deadline is None else lf_deadline - time.monotonic()
+
+# ---------------------------------------------------------------------------------------------
+def http_retry_delay(fi_attempt: int, fs_retry_after: str = None):
+    """
+    delay before a retry: Retry-After if given, else exponential backoff with full jitter
+
+    :param fi_attempt (int): failed attempt (0 for the first one)
+    :param fs_retry_after (str): Retry-After header (seconds or HTTP date)
+
+    :returns: delay (s)
+    """
+    # Retry-After ?
+    if fs_retry_after:
+        # seconds ?
+        if fs_retry_after.strip().isdigit():
+            # return
+            return min(float(fs_retry_after), DF_HTTP_BACKOFF_MAX)
+
+        try:
+            # HTTP date
+            lf_when = email.utils.parsedate_to_datetime(fs_retry_after).timestamp()
+
+            # return
+            return min(max(0., lf_when - time.time()), DF_HTTP_BACKOFF_MAX)
+
+        # em caso de erro,...
+        except (TypeError, ValueError):
+            # backoff
+            pass
+
+    # return backoff with full jitter
+    return random.uniform(0., min(DF_HTTP_BACKOFF_MAX, DF_HTTP_BACKOFF * (2 ** fi_attempt)))
+
+# ---------------------------------------------------------------------------------------------
+def http_session():
+    """
+    shared session (thread-safe, created on first use)
+
+    :returns: session
+    """
+    # global session
+    global M_SESSION
+
+    # not created yet ?
+    if M_SESSION is None:
+        with M_LOCK:
+            # still not created ?
+            if M_SESSION is None:
+                # create session
+                M_SESSION = _new_session(DI_HTTP_POOL_SIZE)
+
+    # return
+    return M_SESSION
+
+# ---------------------------------------------------------------------------------------------
+def http_with_deadline(ff_deadline: float, f_call, *flst_args, **fdct_args):
+    """
+    call f_call with the deadline set for the calling thread only (workers and pool threads:
+    a late thread keeps its own deadline when the next cycle sets another one)
+
+    :param ff_deadline (float): deadline (time.monotonic) or None for no deadline
+    :param f_call (callable): function
+    :param flst_args (list): positional arguments of f_call
+    :param fdct_args (dict): keyword arguments of f_call
+
+    :returns: f_call result
+    """
+    # deadline of the thread (pool threads are reused: keep the previous one)
+    lt_previous = getattr(M_LOCAL, "t_deadline", None)
+
+    # set deadline
+    M_LOCAL.t_deadline = (ff_deadline,)
+
+    try:
+        # return
+        return f_call(*flst_args, **fdct_args)
+
+    finally:
+        # restore deadline
+        M_LOCAL.t_deadline = lt_previous
+
+# < the end >----------------------------------------------------------------------------------
@@ -2,19 +2,21 @@
 """
 fl_icao_ll
 
+2026.oct  mlabru  typed decoding into slim records (fl_decode)
+2026.oct  mlabru  requests through the shared pooled session (fl_http)
 2021.may  mlabru  initial version (Linux/Python)
 """
 # < imports >----------------------------------------------------------------------------------
 
 # python library
 import functools
-import json
 import logging
 import math
-import requests
 
 # local
+import fl_decode as de
 import fl_defs as df
+import fl_http as hp
 
 # < constants >--------------------------------------------------------------------------------
 
@@ -187,16 +189,16 @@ M_LOG.setLevel(df.DI_LOG_LEVEL)
 
 # ---------------------------------------------------------------------------------------------
 # request de dados de estações "tomáticas"
-M_RESPONSE = requests.get("https://apitempo.inmet.gov.br/estacoes/T")
+M_RESPONSE = hp.http_get("inmet_stations", "https://apitempo.inmet.gov.br/estacoes/T")
 
 # ok ?
-if 200 == M_RESPONSE.status_code:
+if M_RESPONSE is not None and 200 == M_RESPONSE.status_code:
     try:
-        # lista de estações tomáticas
-        MLST_STATIONS = json.loads(M_RESPONSE.text)
+        # lista de estações tomáticas (slim records)
+        MLST_STATIONS = de.decode_inmet_stations(M_RESPONSE.content) or []
 
     # em caso de erro...
-    except json.decoder.JSONDecodeError as M_ERR:
+    except de.DT_DECODE_ERRORS as M_ERR:
         # logger
         M_LOG.error("INMET station data decoding error: %s", str(M_ERR))
 
@@ -229,7 +231,8 @@ if 200 == M_RESPONSE.status_code:
 # senão,...
 else:
     # logger
-    M_LOG.error("INMET automatic stations data not found. Code: %s", str(M_RESPONSE.status_code))
+    M_LOG.error("INMET automatic stations data not found. Code: %s",
+                str(M_RESPONSE.status_code if M_RESPONSE is not None else None))
 
 # ---------------------------------------------------------------------------------------------
 @functools.lru_cache(maxsize=128)
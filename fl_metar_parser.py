@@ -2,13 +2,28 @@
 """
 fl_metar_parser
 
+2026.oct  mlabru  weather groups recognized by the DDCT_WEATHER trie alone (no code sets of their own)
+2026.oct  mlabru  SMetar binary records (to_bytes/from_bytes, pickle, record files)
+2026.oct  mlabru  streaming reader for multi-report bulletins and archives (mmap)
+2026.oct  mlabru  weather groups classified by a trie built from DDCT_WEATHER
+2026.oct  mlabru  LRU parse cache in front of metar_parse/metar_parse_file
+2026.oct  mlabru  metar_parse_many, columnar batch of reports
+2026.oct  mlabru  lazy __slots__ SMetar, groups decoded on first read
+2026.oct  mlabru  single-pass group tokenizer
 2021.may  mlabru  initial version (Linux/Python)
 """
 # < imports >----------------------------------------------------------------------------------
 
 # python library
+import array
+import collections
 import logging
+import mmap
+import os
 import re
+import struct
+import sys
+import threading
 
 # local
 import fl_defs as df
@@ -19,669 +34,716 @@ import fl_defs as df
 M_LOG = logging.getLogger(__name__)
 M_LOG.setLevel(logging.WARNING)
 
-# < SMetar >-----------------------------------------------------------------------------------
+# < constants >--------------------------------------------------------------------------------
+
+# parse cache bounds (entries and estimated bytes)
+DI_PARSE_CACHE_ENTRIES = 16384
+DI_PARSE_CACHE_BYTES = 32 * 1024 * 1024
+
+# parse cache estimated size of a parsed report, besides its message (bytes)
+DI_PARSE_CACHE_OVERHEAD = 768
+
+# not a number (missing value in batch columns)
+DF_NAN = float("nan")
+
+# report types
+DT_REPORT_TYPES = ("METAF", "METAR", "SPECI")
+
+# binary record version
+DI_RECORD_VERSION = 1
+
+# binary record absent group (token index)
+DI_RECORD_NONE = 0xFF
+
+# binary record header (little-endian): version, keyword flags, numeric fields present,
+# token index of icao, time, wind, wind var, visibility, temperature, QNH hPa and QNH inHg,
+# count of clouds and weather groups, wind (dir, kt, m/s, gust kt, gust m/s, dir min, dir max),
+# visibility, temperature, dewpoint, QNH (hPa, inHg x 100) and message length. The header is
+# followed by the clouds and weather token indexes and the message (latin-1)
+M_ST_RECORD = struct.Struct("<BHH8B2B7hhbbHHH")
+
+# bulletin report terminator
+DS_BULLETIN_END = b'='
+
+# bulletin control characters (SOH, STX, ETX, EOT) stripped from lines
+DS_BULLETIN_CTRL = " \t\x01\x02\x03\x04"
+
+# bulletin lines that are not report text (ZCZC/NNNN envelope, channel sequence number,
+# WMO abbreviated heading TTAAii CCCC YYGGgg [BBB])
+M_RE_BULLETIN_SKIP = re.compile(r"ZCZC.*|NNNN|[0-9]{1,5}|[A-Z]{4}[0-9]{2} [A-Z]{4} [0-9]{6}(?: [A-Z]{3})?")
+
+# ICAO code group
+M_RE_ICAO = re.compile(r"[A-Z]{4}")
+
+# METAR groups (one named alternative per group, matched against a whole token)
+M_RE_GROUP = re.compile(r"""
+     (?P<wind>(?P<wdir>[0-9]{3}|VRB)(?P<wvel>[0-9]{2,3})(?:G(?P<gust>[0-9]{2,3}))?(?P<unit>KT|MPS))
+    |(?P<wind_var>(?P<wmin>[0-9]{3})V(?P<wmax>[0-9]{3}))
+    |(?P<time>[0-9]{6}Z)
+    |(?P<visibility>[0-9]{4})
+    |(?P<temperature>(?P<temp>M?[0-9]{2})/(?P<dewp>M?[0-9]{2}))
+    |(?P<pressure>(?P<qnh>[QA])(?P<pval>[0-9]{4}))
+    |(?P<clouds>(?P<ctype>FEW|SCT|BKN|OVC|VV)(?P<cheight>[0-9]{3})(?:CB|TCU|///)?)
+    """, re.VERBOSE)
+
+# raw groups (index in SMetar._t_groups)
+DI_GRP_WIND = 0
+DI_GRP_WIND_VAR = 1
+DI_GRP_VISIBILITY = 2
+DI_GRP_TEMPERATURE = 3
+DI_GRP_QNH_HPA = 4
+DI_GRP_QNH_INHG = 5
+DI_GRP_CLOUDS = 6
+DI_GRP_WEATHER = 7
+
+# decoded groups (bits of SMetar._i_decoded). A bit is set after the slots of its group, so a
+# thread that sees it reads set slots; a bit lost to a concurrent update only decodes again
+DI_DEC_CLOUDS = 0x01
+DI_DEC_PRESSURE = 0x02
+DI_DEC_TEMPERATURE = 0x04
+DI_DEC_VISIBILITY = 0x08
+DI_DEC_WEATHER = 0x10
+DI_DEC_WIND = 0x20
+DI_DEC_WIND_VAR = 0x40
+
+# keyword flags (bits of SMetar._i_flags)
+DI_FLG_CAVOK = 0x001
+DI_FLG_SKC = 0x002
+DI_FLG_NSC = 0x004
+DI_FLG_CLR = 0x008
+DI_FLG_COR = 0x010
+DI_FLG_AUTO = 0x020
+DI_FLG_NOSIG = 0x040
+DI_FLG_BECMG = 0x080
+DI_FLG_TEMPO = 0x100
+DI_FLG_A02 = 0x200
+DI_FLG_PWINO = 0x400
+DI_FLG_MAINT = 0x800
+
+# keyword groups
+DDCT_KEYWORDS = {"CAVOK": DI_FLG_CAVOK,
+                 "SKC":   DI_FLG_SKC,
+                 "NSC":   DI_FLG_NSC,
+                 "CLR":   DI_FLG_CLR,
+                 "COR":   DI_FLG_COR,
+                 "AUTO":  DI_FLG_AUTO,
+                 "NOSIG": DI_FLG_NOSIG,
+                 "BECMG": DI_FLG_BECMG,
+                 "TEMPO": DI_FLG_TEMPO,
+                 "AO2":   DI_FLG_A02,
+                 "PWINO": DI_FLG_PWINO,
+                 "$":     DI_FLG_MAINT}
+
+# single raw groups (by M_RE_GROUP group name, first group wins)
+DDCT_GROUPS = {"wind":        DI_GRP_WIND,
+               "wind_var":    DI_GRP_WIND_VAR,
+               "visibility":  DI_GRP_VISIBILITY,
+               "temperature": DI_GRP_TEMPERATURE}
+
+# < weather >----------------------------------------------------------------------------------
+
+# weather group: intensity or proximity (-, +, VC or None), descriptor (or None),
+# phenomena (tuple) and description (the DDCT_WEATHER entries covering the group)
+SWeather = collections.namedtuple("SWeather", ["s_group", "s_intensity", "s_descriptor",
+                                               "t_phenomena", "s_text"])
 
-class SMetar:
-    """
-    string parsing of weather station
+# ---------------------------------------------------------------------------------------------
+def _weather_codes(fs_group: str):
     """
-    # -----------------------------------------------------------------------------------------
-    def __init__(self, fs_metar_mesg: str):
-        """
-        constructor
+    split a DDCT_WEATHER key in intensity or proximity (-, +, VC) and its two-letter codes
 
-        :param fs_metar_mesg (str): METAR message
-        """
-        # metar data
-        self._s_metar_mesg = fs_metar_mesg
+    :param fs_group (str): weather group (DDCT_WEATHER key)
 
-        # METAF, METAR or SPECI data ?
-        if fs_metar_mesg.startswith("METAF") or \
-           fs_metar_mesg.startswith("METAR") or \
-           fs_metar_mesg.startswith("SPECI"):
-            # get metar data
-            fs_metar_mesg = fs_metar_mesg[5:].strip()
+    :returns: (intensity or None, codes tuple)
+    """
+    # intensity or proximity
+    ls_intensity = fs_group[0] if fs_group[:1] in ("-", "+") else "VC" if "VC" == fs_group[:2] else None
 
-        # cloudiness
-        self._v_cavok = None
-        self._v_clr = None
-        self._v_nsc = None
-        self._v_skc = None
-        self._v_vv = None
+    # codes (pairs of chars)
+    li_pos = len(ls_intensity or "")
 
-        self._v_bkn = None
-        self._f_bkn_m = None
-        self._i_bkn_feet = None
+    # return
+    return ls_intensity, tuple(fs_group[li_ndx:li_ndx + 2] for li_ndx in range(li_pos, len(fs_group), 2))
 
-        self._v_few = None
-        self._f_few_m = None
-        self._i_few_feet = None
+# ---------------------------------------------------------------------------------------------
+def _weather_trie(fdct_weather: dict):
+    """
+    build a prefix trie (one dict per char) from the weather messages. The descriptors are the
+    codes that only lead a key of many codes (SH, TS, FZ, ...), the other codes are phenomena
+    (RA of SHRA, FG of FZFG, ...)
 
-        self._v_ovc = None
-        self._f_ovc_m = None
-        self._i_ovc_feet = None
+    :param fdct_weather (dict): weather group -> description
 
-        self._v_sct = None
-        self._f_sct_m = None
-        self._i_sct_feet = None
+    :returns: trie, a node key "" holds (description, intensity, descriptor, phenomena) of the
+              group ending there
+    """
+    # codes of the keys
+    ldct_codes = {ls_group: _weather_codes(ls_group) for ls_group in fdct_weather}
 
-        self._s_clouds = None
+    # codes leading a key of many codes, and codes after the first one
+    lset_leading = {lt_codes[0] for _, lt_codes in ldct_codes.values() if len(lt_codes) > 1}
+    lset_following = {ls_code for _, lt_codes in ldct_codes.values() for ls_code in lt_codes[1:]}
 
-        # forecast time
-        self._s_forecast_time = None
+    # descriptors
+    lset_descriptors = lset_leading - lset_following
 
-        # icao code
-        self._s_icao_code = None
+    # root
+    ldct_trie = {}
 
-        # pressure
-        self._s_pressure = None
-        self._i_pressure_hpa = None
-        self._i_pressure_inhg = None
+    # for all weather groups...
+    for ls_group, ls_text in fdct_weather.items():
+        # from root
+        ldct_node = ldct_trie
 
-        # remarks
-        self._v_a02 = None
-        self._v_maint = None
-        self._v_pwino = None
+        # for all chars...
+        for lc_char in ls_group:
+            # next node
+            ldct_node = ldct_node.setdefault(lc_char, {})
 
-        # report type
-        self._v_auto = None
-        self._v_corr = None
+        # intensity and codes
+        ls_intensity, lt_codes = ldct_codes[ls_group]
 
-        # temperature
-        self._i_dewpoint_c = None
-        self._i_dewpoint_f = None
-        self._s_temperature = None
-        self._i_temperature_c = None
-        self._i_temperature_f = None
+        # descriptor (leading code) and phenomena
+        ls_descriptor = lt_codes[0] if lt_codes and lt_codes[0] in lset_descriptors else None
 
-        # trends
-        self._v_becmg = None
-        self._v_nosig = None
-        self._v_tempo = None
+        # group
+        ldct_node[""] = (ls_text, ls_intensity, ls_descriptor, lt_codes[1:] if ls_descriptor else lt_codes)
 
-        # visibility
-        self._s_visibility = None
-        self._i_visibility = None
+    # return
+    return ldct_trie
 
-        # weather
-        self._s_weather = None
-        self._s_weather_text = None
+# weather trie (built once)
+M_WEATHER_TRIE = _weather_trie(df.DDCT_WEATHER)
 
-        # wind type
-        self._i_gust_kt = None
-        self._i_gust_mps = None
-        self._s_wind = None
-        self._i_wind_dir = None
-        self._i_wind_dir_max = None
-        self._i_wind_dir_min = None
-        self._s_wind_var = None
-        self._i_wind_vel_kt = None
-        self._i_wind_vel_mps = None
+# ---------------------------------------------------------------------------------------------
+def weather_lookup(fs_group: str):
+    """
+    classify a weather group by longest DDCT_WEATHER prefixes (e.g. -SHRASN = -SHRA + SN).
+    Intensity and descriptor only in the first part
 
-        # airport index
-        self._icao_code(fs_metar_mesg)
+    :param fs_group (str): group
 
-        # type of formation
-        self._report_type(fs_metar_mesg)
+    :returns: SWeather if fs_group is a weather group else None
+    """
+    # parts (trie values)
+    llst_parts = []
 
-        # report formation
-        self._forecast_time(fs_metar_mesg)
+    # group length
+    li_len = len(fs_group)
 
-        # speed and wind direction
-        self._wind_type(fs_metar_mesg)
+    # start of part
+    li_ndx = 0
 
-        # visibility conditions
-        self._visibility(fs_metar_mesg)
+    while li_ndx < li_len:
+        # longest match from here
+        ldct_node = M_WEATHER_TRIE
+        lt_part = None
+        li_end = li_cur = li_ndx
 
-        # cloudy
-        self._clouds_type(fs_metar_mesg)
+        while li_cur < li_len:
+            # walk
+            ldct_node = ldct_node.get(fs_group[li_cur], None)
 
-        # temperature
-        self._temperature(fs_metar_mesg)
+            if ldct_node is None:
+                # quit
+                break
 
-        # pressure
-        self._pressure(fs_metar_mesg)
+            li_cur += 1
 
-        # weather
-        self._weather_type(fs_metar_mesg)
+            # group ends here ?
+            if "" in ldct_node:
+                # longest so far
+                lt_part = ldct_node[""]
+                li_end = li_cur
 
-        # forecasts
-        self._trends(fs_metar_mesg)
+        # part not in DDCT_WEATHER, or intensity/descriptor after the first part ?
+        if lt_part is None or (llst_parts and (lt_part[1] or lt_part[2])):
+            # not a weather group
+            return None
 
-        # notes
-        self._remarks(fs_metar_mesg)
+        # save part
+        llst_parts.append(lt_part)
 
-    # -----------------------------------------------------------------------------------------
-    def _clouds_type(self, fs_metar_mesg: str):
-        """
-        determining the type of cloudiness
-        """
-        # clear clouds
-        self._s_clouds = ""
-
-        # search for type of cloudiness
-        l_result = re.findall(r"SKC|NSC|CLR|FEW[0-9]{3}|SCT[0-9]{3}"
-                              "|BKN[0-9]{3}|OVC[0-9]{3}|VV[0-9]{3}", fs_metar_mesg)
-
-        for ls_type_cloud in l_result:
-            # skc ?
-            if "SKC" == ls_type_cloud:
-                # skc
-                self._v_skc = True
-
-                # save string
-                self._s_clouds += ls_type_cloud + " "
-
-                # logger
-                M_LOG.info("Clouds: Sky is clear.")
-
-            # nsc ?
-            if "NSC" == ls_type_cloud:
-                # nsc
-                self._v_nsc = True
-
-                # save string
-                self._s_clouds += ls_type_cloud + " "
-
-                # logger
-                M_LOG.info("Clouds: No significant cloud clouds.")
-
-            # clr ?
-            if "CLR" == ls_type_cloud:
-                # nsc
-                self._v_clr = True
-
-                # save string
-                self._s_clouds += ls_type_cloud + " "
-
-                # logger
-                M_LOG.info("Clouds: No clouds below 3600 m.")
-
-            # few ?
-            if "FEW" == ls_type_cloud[:-3]:
-                # few
-                self._i_few_feet = (int(ls_type_cloud[-3:]) * 100)
-                self._f_few_m = round(self._i_few_feet * df.DF_FT2M, 2)
-                # few
-                self._v_few = True
-
-                # save string
-                self._s_clouds += ls_type_cloud + " "
-
-                # logger
-                M_LOG.info("Clouds: Few clouds at %d feet (%6.2f meter).",
-                           self._i_few_feet, self._f_few_m)
-
-            # sct ?
-            if "SCT" == ls_type_cloud[:-3]:
-                # sct
-                self._i_sct_feet = (int(ls_type_cloud[-3:]) * 100)
-                self._f_sct_m = round(self._i_sct_feet * df.DF_FT2M, 2)
-                # sct
-                self._v_sct = True
-
-                # save string
-                self._s_clouds += ls_type_cloud + " "
-
-                # logger
-                M_LOG.info("Clouds: Scattered clouds at %d feet (%6.2f meter).",
-                           self._i_sct_feet, self._f_sct_m)
-
-            # bkn ?
-            if "BKN" == ls_type_cloud[:-3]:
-                # bkn
-                self._i_bkn_feet = (int(ls_type_cloud[-3:]) * 100)
-                self._f_bkn_m = round(self._i_bkn_feet * df.DF_FT2M, 2)
-                # pwino
-                self._v_bkn = True
-
-                # save string
-                self._s_clouds += ls_type_cloud + " "
-
-                # logger
-                M_LOG.info("Clouds: Broken clouds at %d feet (%6.2f meter).",
-                           self._i_bkn_feet, self._f_bkn_m)
-
-            # ovc ?
-            if "OVC" == ls_type_cloud[:-3]:
-                # ovc
-                self._i_ovc_feet = (int(ls_type_cloud[-3:]) * 100)
-                self._f_ovc_m = round(self._i_ovc_feet * df.DF_FT2M, 2)
-                # ovc
-                self._v_ovc = True
-
-                # save string
-                self._s_clouds += ls_type_cloud + " "
-
-                # logger
-                M_LOG.info("Clouds: Overcast clouds at %d feet (%6.2f meter).",
-                           self._i_ovc_feet, self._f_ovc_m)
+        # next part
+        li_ndx = li_end
 
-            # vv ?
-            if "VV" == ls_type_cloud[:-3]:
-                # vv
-                self._v_vv = True
+    # empty group ?
+    if not llst_parts:
+        # not a weather group
+        return None
 
-                # save string
-                self._s_clouds += ls_type_cloud + " "
+    # return
+    return SWeather(fs_group, llst_parts[0][1], llst_parts[0][2],
+                    tuple(ls_code for lt_part in llst_parts for ls_code in lt_part[3]),
+                    " ".join(lt_part[0] for lt_part in llst_parts))
 
-                # logger
-                M_LOG.info("Clouds: Clouds cannot be seen because of fog or heavy precipitation.")
+# < SMetar >-----------------------------------------------------------------------------------
 
-        # exist clouds ?
-        if "" != self._s_clouds:
-            # strip string
-            self._s_clouds = self._s_clouds.strip()
+class SMetar:
+    """
+    string parsing of weather station
 
-        # senão,...
-        else:
-            # no clouds at all
-            self._s_clouds = None
+    only the raw message is kept on construction. The message is split in groups on the
+    first property read and each group is decoded when one of its properties is first read
+    """
+    # slots (decoded slots stay unset until the group is decoded)
+    __slots__ = ("_s_metar_mesg", "_i_decoded",
+                 # split
+                 "_t_groups", "_i_flags", "_s_icao_code", "_s_forecast_time",
+                 # cloudiness
+                 "_s_clouds", "_v_vv",
+                 "_i_few_feet", "_i_sct_feet", "_i_bkn_feet", "_i_ovc_feet",
+                 # pressure
+                 "_s_pressure", "_i_pressure_hpa", "_i_pressure_inhg",
+                 # temperature
+                 "_s_temperature", "_i_temperature_c", "_i_dewpoint_c",
+                 # visibility
+                 "_v_cavok", "_s_visibility", "_i_visibility",
+                 # weather
+                 "_s_weather", "_s_weather_text",
+                 # wind type
+                 "_s_wind", "_i_wind_dir", "_i_wind_vel_kt", "_i_wind_vel_mps",
+                 "_i_gust_kt", "_i_gust_mps",
+                 "_s_wind_var", "_i_wind_dir_min", "_i_wind_dir_max")
 
     # -----------------------------------------------------------------------------------------
-    def _forecast_time(self, fs_metar_mesg: str):
-        """
-        search for the reporting time
+    def __init__(self, fs_metar_mesg: str):
         """
+        constructor
 
-        # search for forecast time
-        l_result = re.search(r"[0-9]{6}[Z]", fs_metar_mesg)
+        :param fs_metar_mesg (str): METAR message
+        """
+        # metar data
+        self._s_metar_mesg = fs_metar_mesg
 
-        if l_result:
-            # forecast time
-            self._s_forecast_time = str(l_result[0])
+        # not split, nothing decoded
+        self._t_groups = None
+        self._i_decoded = 0
 
+        # decoded groups wanted ?
+        if M_LOG.isEnabledFor(logging.INFO):
             # logger
-            M_LOG.info("Time issued: %s %s:%s.", l_result[0][:2],
-                       l_result[0][2:4], l_result[0][4:6])
-        else:
-            # logger
-            M_LOG.error("forecast time is mandatory.")
+            self._log_groups()
 
     # -----------------------------------------------------------------------------------------
-    def _icao_code(self, fs_metar_mesg: str):
+    def _groups(self):
         """
-        ICAO Airport Index Search Method
+        raw groups of the message (split on first use)
         """
-        # search for icao code
-        l_result = re.search(r"[A-Z]{4}", fs_metar_mesg)
-
-        if l_result:
-            # icao code
-            self._s_icao_code = str(l_result[0])
-
-            # logger
-            M_LOG.info("Identifier: %s.", self._s_icao_code)
+        # not split yet ?
+        if self._t_groups is None:
+            # split message
+            self._split()
 
-        else:
-            # logger
-            M_LOG.error("ICAO code is mandatory.")
+        # return
+        return self._t_groups
 
     # -----------------------------------------------------------------------------------------
-    def _pressure(self, fs_metar_mesg: str):
+    def _split(self):
         """
-        pressure search method
+        split the message in groups and classify each group in one pass
         """
-        # search for QNH (hPa)
-        l_result = re.search(r"[Q][0-9]{4}", fs_metar_mesg)
+        # raw groups
+        llst_raw = [None, None, None, None, None, None, (), ()]
 
-        if l_result:
-            # pressure
-            self._s_pressure = l_result[0].strip()
+        # keyword flags
+        li_flags = 0
 
-            # pressure (hpa)
-            self._i_pressure_hpa = int(l_result[0][1:])
+        # icao code and forecast time
+        ls_icao_code = None
+        ls_forecast_time = None
 
-            # logger
-            M_LOG.info("Pressure: QNH %d hPa.", self._i_pressure_hpa)
+        # clouds and weather groups
+        llst_clouds = []
+        llst_weather = []
 
-        # search for QNH (inHg)
-        l_result = re.search(r"[A][0-9]{4}", fs_metar_mesg)
+        # split message in groups (the '=' terminator is not a group)
+        llst_groups = self._s_metar_mesg.replace('=', ' ').split()
 
-        if l_result:
-            # pressure
-            self._s_pressure = l_result[0].strip()
+        # METAF, METAR or SPECI data ?
+        if llst_groups and llst_groups[0] in DT_REPORT_TYPES:
+            # skip report type
+            del llst_groups[0]
 
-            # pressure_(inHg)
-            self._i_pressure_inhg = float(l_result[0][1:-2] + "." + l_result[0][3:])
+        # for all groups...
+        for ls_group in llst_groups:
+            # keyword group (CAVOK, NOSIG, AUTO, ...) ?
+            li_flag = DDCT_KEYWORDS.get(ls_group, None)
 
-            # logger
-            M_LOG.info("Pressure: Sea level pressure is %d inHg.", self._i_pressure_inhg)
+            if li_flag is not None:
+                # save flag
+                li_flags |= li_flag
 
-    # -----------------------------------------------------------------------------------------
-    def _remarks(self, fs_metar_mesg: str):
-        """
-        notes
-        """
-        # search for notes
-        l_result = re.search(r"AO2", fs_metar_mesg)
+                # ceiling and visibility ok ?
+                if DI_FLG_CAVOK == li_flag:
+                    # visibility group
+                    if llst_raw[DI_GRP_VISIBILITY] is None:
+                        llst_raw[DI_GRP_VISIBILITY] = ls_group
 
-        if l_result:
-            # a02
-            self._v_a02 = True
+                # clouds keyword ?
+                elif li_flag & (DI_FLG_SKC | DI_FLG_NSC | DI_FLG_CLR):
+                    # clouds group
+                    llst_clouds.append(ls_group)
 
-            # logger
-            M_LOG.info("This station is automated with a precipitation discriminator (rain/snow) sensor.")
+                # next group
+                continue
 
-        # search for notes
-        l_result = re.search(r"PWINO", fs_metar_mesg)
+            # airport index still missing ?
+            if ls_icao_code is None and M_RE_ICAO.fullmatch(ls_group):
+                # airport index
+                ls_icao_code = ls_group
 
-        if l_result:
-            # pwino
-            self._v_pwino = True
+                # next group
+                continue
 
-            # logger
-            M_LOG.info("Precipitation identifier sensor not available.")
+            # classify group
+            l_match = M_RE_GROUP.fullmatch(ls_group)
 
-        # search for notes
-        l_result = re.search(r"\$", fs_metar_mesg)
+            if l_match is None:
+                # weather group ?
+                lo_weather = weather_lookup(ls_group)
 
-        if l_result:
-            # maint
-            self._v_maint = True
+                if lo_weather is not None:
+                    # weather group
+                    llst_weather.append(lo_weather)
 
-            # logger
-            M_LOG.info("System needs maintance.")
+                # next group
+                continue
 
-    # -----------------------------------------------------------------------------------------
-    def _report_type(self, fs_metar_mesg: str):
-        """
-        determining the type of report
+            # group type
+            ls_type = l_match.lastgroup
 
-        - AUTO - if it is formed by the machine
-        - COR  - if it is a correction
-        """
-        # search for report type
-        l_result = re.search(r"COR", fs_metar_mesg)
+            # forecast time ?
+            if "time" == ls_type:
+                if ls_forecast_time is None:
+                    ls_forecast_time = ls_group
+
+            # clouds ?
+            elif "clouds" == ls_type:
+                llst_clouds.append(ls_group)
+
+            # pressure ?
+            elif "pressure" == ls_type:
+                # QNH (hPa) or QNH (inHg)
+                li_ndx = DI_GRP_QNH_HPA if "Q" == ls_group[0] else DI_GRP_QNH_INHG
+
+                if llst_raw[li_ndx] is None:
+                    llst_raw[li_ndx] = ls_group
 
-        if l_result:
-            # correction ?
-            if "COR" == l_result[0]:
-                # maint
-                self._v_corr = True
+            # senão, single group
+            else:
+                # group index
+                li_ndx = DDCT_GROUPS[ls_type]
+
+                if llst_raw[li_ndx] is None:
+                    llst_raw[li_ndx] = ls_group
 
-                # logger
-                M_LOG.info("Report type: This is a correction report")
+        # no airport index ?
+        if ls_icao_code is None:
+            # logger
+            M_LOG.error("ICAO code is mandatory.")
 
-        # search for report type
-        l_result = re.search(r"AUTO", fs_metar_mesg)
+        # no forecast time ?
+        if ls_forecast_time is None:
+            # logger
+            M_LOG.error("forecast time is mandatory.")
 
-        if l_result:
-            # auto ?
-            if "AUTO" == l_result[0]:
-                # maint
-                self._v_auto = True
+        # multiple groups
+        llst_raw[DI_GRP_CLOUDS] = tuple(llst_clouds)
+        llst_raw[DI_GRP_WEATHER] = tuple(llst_weather)
 
-                # logger
-                M_LOG.info("Report type: This is a fully automated report")
+        # save split
+        self._i_flags = li_flags
+        self._s_icao_code = ls_icao_code
+        self._s_forecast_time = ls_forecast_time
+        self._t_groups = tuple(llst_raw)
 
     # -----------------------------------------------------------------------------------------
-    def _temperature(self, fs_metar_mesg: str):
+    def _decode_clouds(self):
         """
-        find the temperature and dewpoints
+        determining the type of cloudiness
         """
-        # search for temperature
-        l_result = re.search(r"[0-9]{2}[/][0-9]{2}|M[0-9]{2}[/]M[0-9]{2}|[0-9]{2}[/]M[0-9]{2}", fs_metar_mesg)
+        # clouds groups
+        lt_clouds = self._groups()[DI_GRP_CLOUDS]
 
-        if l_result:
-            # temperature
-            self._s_temperature = l_result[0].strip()
+        # layers (first layer of each type only)
+        lv_vv = None
+        ldct_feet = {}
 
-            # for a negative temperature in Celsius, replace M to -
-            l_result = re.split(r"\/", l_result[0].replace('M', '-'))
+        # for all clouds groups...
+        for ls_group in lt_clouds:
+            # type of cloud
+            ls_type_cloud = ls_group[:3]
 
-            # temperature
-            self._i_temperature_c = int(l_result[0])
+            # vv ?
+            if "VV" == ls_group[:2]:
+                # vv
+                lv_vv = True
 
-            # convert °C to °F (temperature)
-            self._i_temperature_f = int((self._i_temperature_c * 9 / 5) + 32)
+            # few, sct, bkn or ovc (first layer of the type) ?
+            elif ls_type_cloud in ("FEW", "SCT", "BKN", "OVC") and ls_type_cloud not in ldct_feet:
+                ldct_feet[ls_type_cloud] = int(ls_group[3:6]) * 100
 
-            # dewpoint
-            self._i_dewpoint_c = int(l_result[1])
+        # layers
+        self._v_vv = lv_vv
+        self._i_few_feet = ldct_feet.get("FEW", None)
+        self._i_sct_feet = ldct_feet.get("SCT", None)
+        self._i_bkn_feet = ldct_feet.get("BKN", None)
+        self._i_ovc_feet = ldct_feet.get("OVC", None)
 
-            # convert °C to °F (dewpoint)
-            self._i_dewpoint_f = int((self._i_dewpoint_c * 9 / 5) + 32)
+        # clouds string (without CB/TCU) if exist clouds
+        self._s_clouds = " ".join(ls_group[:5] if "VV" == ls_group[:2] else ls_group[:6]
+                                  for ls_group in lt_clouds) or None
 
-            # logger
-            M_LOG.info("Temperature %d°C (%d°F) Dewpoint %d°C (%d°F).",
-                       self._i_temperature_c, self._i_temperature_f,
-                       self._i_dewpoint_c, self._i_dewpoint_f)
+        # decoded (last: the slots are set before other threads skip the decoding)
+        self._i_decoded |= DI_DEC_CLOUDS
 
     # -----------------------------------------------------------------------------------------
-    def _trends(self, fs_metar_mesg: str):
+    def _decode_pressure(self):
         """
-        forecasting changes
+        pressure search method
         """
-        # search for forecasting changes
-        l_result = re.search(r"NOSIG|BECMG|TEMPO", fs_metar_mesg)
+        # raw groups
+        lt_groups = self._groups()
 
-        if l_result:
-            # nosig ?
-            if "NOSIG" == l_result[0]:
-                # nosig
-                self._v_nosig = True
+        # QNH (hPa)
+        ls_hpa = lt_groups[DI_GRP_QNH_HPA]
+        self._i_pressure_hpa = int(ls_hpa[1:]) if ls_hpa is not None else None
 
-                # logger
-                M_LOG.info("Trends: No significant change is expected to the reported conditions within the next 2 hours.")
+        # QNH (inHg)
+        ls_inhg = lt_groups[DI_GRP_QNH_INHG]
+        self._i_pressure_inhg = int(ls_inhg[1:]) / 100. if ls_inhg is not None else None
 
-            # becmg ?
-            if "BECMG" == l_result[0]:
-                # becmg
-                self._v_becmg = True
+        # pressure (hPa first)
+        self._s_pressure = ls_hpa if ls_hpa is not None else ls_inhg
 
-                # logger
-                M_LOG.info("Trends: Sustained significant changes in weather conditions are expected.")
-
-            # tempo ?
-            if "TEMPO" == l_result[0]:
-                # tempo
-                self._v_tempo = True
-
-                # logger
-                M_LOG.info("Trends: Temporary significant changes in weather conditions are expected.")
+        # decoded (last: the slots are set before other threads skip the decoding)
+        self._i_decoded |= DI_DEC_PRESSURE
 
     # -----------------------------------------------------------------------------------------
-    def _visibility(self, fs_metar_mesg: str):
+    def _decode_temperature(self):
         """
-        determining visibility conditions
+        find the temperature and dewpoints
         """
-        # search for visibility
-        l_result = re.search(r"\s[0-9]{4}\s|CAVOK", fs_metar_mesg)
+        # temperature
+        self._s_temperature = ls_group = self._groups()[DI_GRP_TEMPERATURE]
 
-        if l_result:
-            # visibility
-            self._s_visibility = l_result[0].strip()
+        if ls_group is None:
+            # no temperature
+            self._i_temperature_c = None
+            self._i_dewpoint_c = None
 
-            # cavok ?
-            if "CAVOK" == l_result[0]:
-                # cavok
-                self._v_cavok = True
+        # senão,...
+        else:
+            # for a negative temperature in Celsius, replace M to -
+            ls_temp, ls_dewp = ls_group.replace('M', '-').split('/')
 
-                # logger
-                M_LOG.info("Visibility: Ceiling And Visibility OK.")
+            # temperature
+            self._i_temperature_c = int(ls_temp)
+            # dewpoint
+            self._i_dewpoint_c = int(ls_dewp)
 
-            # senão,...
-            else:
-                # 9999 ?
-                if "9999" == l_result[0].replace(' ', ''):
-                    # visibility
-                    self._i_visibility = 9999
+        # decoded (last: the slots are set before other threads skip the decoding)
+        self._i_decoded |= DI_DEC_TEMPERATURE
 
-                    # logger
-                    M_LOG.info("Visibility: 10km or more.")
+    # -----------------------------------------------------------------------------------------
+    def _decode_visibility(self):
+        """
+        determining visibility conditions
+        """
+        # visibility
+        self._s_visibility = ls_group = self._groups()[DI_GRP_VISIBILITY]
+
+        # cavok ?
+        if "CAVOK" == ls_group:
+            # cavok
+            self._v_cavok = True
+            self._i_visibility = None
 
-                # senão,...
-                else:
-                    # visibility
-                    self._i_visibility = int(l_result[0].replace(' ', ''))
+        # senão,...
+        else:
+            # visibility
+            self._v_cavok = None
+            self._i_visibility = int(ls_group) if ls_group is not None else None
 
-                    # logger
-                    M_LOG.info("Visibility: %d meter.", self._i_visibility)
+        # decoded (last: the slots are set before other threads skip the decoding)
+        self._i_decoded |= DI_DEC_VISIBILITY
 
     # -----------------------------------------------------------------------------------------
-    def _weather_type(self, fs_metar_mesg):
+    def _decode_weather(self):
         """
         weather type determination
         """
-        # search for weather
-        l_result = re.search(r"""[\-\+]DZ|DZ|[\-\+]RA|RA|[\-\+]SN|SN|[\-\+]SG|SG|[\-\+]PL|PL
-                                |[\-\+]GS|GS|[\-\+]DS|DS|[\-\+]SS|SS|DU|SQ|BR|HZ|FU|IC|TS|FG
-                                |VA|BLSN|FZFG|VCFG|MIFG|PRFG|BCFG|DRSN|DRSA|DRDU|BLDU|VCTS
-                                |[\-\+]RASN|RASN|[\-\+]SNRA|SNRA|[\-\+]SHSN|SHSN|[\-\+]SHRA|SHRA
-                                |[\-\+]SHGR|SHGR|[\-\+]TSGR|TSGR|[\-\+]FZRA|FZRA|[\-\+]FZDZ|FZDZ
-                                |[\-\+]TSRA|TSRA|[\-\+]SHGR|SHGR|[\-\+]TSGS|TSGS|[\-\+]TSSN|TSSN
-                                """, fs_metar_mesg)
+        # weather groups
+        lt_weather = self._groups()[DI_GRP_WEATHER]
 
-        if l_result:
-            # weather
-            self._s_weather = str(l_result[0]).strip()
+        # weather (first group) and its description
+        self._s_weather = lt_weather[0].s_group if lt_weather else None
+        self._s_weather_text = lt_weather[0].s_text if lt_weather else None
 
-            # for all messages...
-            self._s_weather_text = df.DDCT_WEATHER.get(self._s_weather, None)
-
-            if self._s_weather_text:
-                # logger
-                M_LOG.info("Weather: %s.", str(self._s_weather_text))
+        # decoded (last: the slots are set before other threads skip the decoding)
+        self._i_decoded |= DI_DEC_WEATHER
 
     # -----------------------------------------------------------------------------------------
-    def _wind_type(self, fs_metar_mesg: str):
+    def _decode_wind(self):
         """
         determination of speed and wind guide
         """
-        # search for velocity (mps)
-        l_results = re.search(r"[0-9]{5}MPS", fs_metar_mesg)
-
-        if l_results:
-            # wind
-            self._s_wind = l_results[0].strip()
+        # wind
+        self._s_wind = ls_group = self._groups()[DI_GRP_WIND]
 
-            # wind direction
-            self._i_wind_dir = int(l_results[0][:3])
-            # wind velocity (m/s)
-            self._i_wind_vel_mps = int(l_results[0][3:2])
-            # wind velocity (kt)
-            self._i_wind_vel_kt = int(round(self._i_wind_vel_mps * df.DF_MPS2KT, 0))
-
-            # logger
-            M_LOG.info("Wind: Winds from %d° at %d mps (%d knots).",
-                       self._i_wind_dir, self._i_wind_vel_mps, self._i_wind_vel_kt)
+        # no wind ?
+        if ls_group is None:
+            # no wind
+            self._i_wind_dir = None
+            self._i_wind_vel_kt = None
+            self._i_wind_vel_mps = None
+            self._i_gust_kt = None
+            self._i_gust_mps = None
 
-        # search for velocity (kt)
-        l_results = re.search(r"[0-9]{5}KT", fs_metar_mesg)
+        # senão,...
+        else:
+            # wind group
+            self._decode_wind_group(ls_group)
 
-        if l_results:
-            # wind
-            self._s_wind = l_results[0].strip()
+        # decoded (last: the slots are set before other threads skip the decoding)
+        self._i_decoded |= DI_DEC_WIND
 
-            # wind direction
-            self._i_wind_dir = int(l_results[0][:3])
-            # wind velocity (kt)
-            self._i_wind_vel_kt = int(l_results[0][3:5])
-            # wind velocity (m/s)
-            self._i_wind_vel_mps = int(round(self._i_wind_vel_kt * df.DF_KT2MPS, 0))
+    # -----------------------------------------------------------------------------------------
+    def _decode_wind_group(self, fs_group: str):
+        """
+        speed, gust and direction of the wind group
 
-            # logger
-            M_LOG.info("Wind: Winds from %d° at %d knots (%d mps).",
-                       self._i_wind_dir, self._i_wind_vel_kt, self._i_wind_vel_mps)
+        :param fs_group (str): wind group
+        """
+        # wind group
+        l_match = M_RE_GROUP.fullmatch(fs_group)
 
-        # search for gust (mps)
-        l_results = re.search(r"[0-9]{5}G[0-9]{2}MPS", fs_metar_mesg)
+        # wind direction (None if variable)
+        ls_dir = l_match["wdir"]
+        self._i_wind_dir = None if "VRB" == ls_dir else int(ls_dir)
 
-        if l_results:
-            # wind
-            self._s_wind = l_results[0].strip()
+        # gust
+        ls_gust = l_match["gust"]
 
-            # wind direction
-            self._i_wind_dir = int(l_results[0][:3])
+        # velocity in m/s ?
+        if "MPS" == l_match["unit"]:
             # wind velocity (m/s)
-            self._i_wind_vel_mps = int(l_results[0][3:5])
+            self._i_wind_vel_mps = int(l_match["wvel"])
             # wind velocity (kt)
             self._i_wind_vel_kt = int(round(self._i_wind_vel_mps * df.DF_MPS2KT, 0))
 
             # gust (m/s)
-            self._i_gust_mps = int(l_results[0][-5:-3])
+            self._i_gust_mps = int(ls_gust) if ls_gust is not None else None
             # gust (kt)
-            self._i_gust_kt = int(round(self._i_gust_mps * df.DF_MPS2KT, 0))
-
-            # logger
-            M_LOG.info("Wind: Winds from %d° at %d mps with gusts up to %d mps (%d knots).",
-                       self._i_wind_dir, self._i_wind_vel_mps, self._i_gust_mps, self._i_gust_kt)
-
-        # search for gust (kt)
-        l_results = re.search(r"[0-9]{5}G[0-9]{2}KT", fs_metar_mesg)
-
-        if l_results:
-            # wind
-            self._s_wind = l_results[0].strip()
+            self._i_gust_kt = None if ls_gust is None else \
+                              int(round(self._i_gust_mps * df.DF_MPS2KT, 0))
 
-            # wind direction
-            self._i_wind_dir = int(l_results[0][:3])
+        # senão, velocity in kt
+        else:
             # wind velocity (kt)
-            self._i_wind_vel_kt = int(l_results[0][3:5])
+            self._i_wind_vel_kt = int(l_match["wvel"])
             # wind velocity (m/s)
             self._i_wind_vel_mps = int(round(self._i_wind_vel_kt * df.DF_KT2MPS, 0))
 
             # gust (kt)
-            self._i_gust_kt = int(l_results[0][-4:-2])
+            self._i_gust_kt = int(ls_gust) if ls_gust is not None else None
             # gust (m/s)
-            self._i_gust_mps = int(round(self._i_gust_kt * df.DF_KT2MPS, 0))
-
-            # logger
-            M_LOG.info("Wind: Winds from %d° at %d knots with gusts up to %d knots (%d mps).",
-                       self._i_wind_dir, self._i_wind_vel_kt, self._i_gust_kt, self._i_gust_mps)
+            self._i_gust_mps = None if ls_gust is None else \
+                               int(round(self._i_gust_kt * df.DF_KT2MPS, 0))
 
-        # search for variable (mps)
-        l_results = re.search(r"VRB[0-9]{2}MPS", fs_metar_mesg)
-
-        if l_results:
-            # wind variable
-            self._s_wind = l_results[0].strip()
+    # -----------------------------------------------------------------------------------------
+    def _decode_wind_var(self):
+        """
+        determination of wind direction variation
+        """
+        # wind variable
+        self._s_wind_var = ls_group = self._groups()[DI_GRP_WIND_VAR]
 
-            # wind direction
-            self._i_wind_dir = None
-            # wind velocity (m/s)
-            self._i_wind_vel_mps = int(l_results[0][3:5])
-            # wind velocity (kt)
-            self._i_wind_vel_kt = int(round(self._i_wind_vel_mps * df.DF_MPS2KT, 0))
+        # wind direction min/max
+        self._i_wind_dir_min = int(ls_group[:3]) if ls_group is not None else None
+        self._i_wind_dir_max = int(ls_group[4:]) if ls_group is not None else None
 
-            # logger
-            M_LOG.info("Variable winds directions at %d mps (%d knots).",
-                       self._i_wind_vel_mps, self._i_wind_vel_kt)
+        # decoded (last: the slots are set before other threads skip the decoding)
+        self._i_decoded |= DI_DEC_WIND_VAR
 
-        # search for variable (kt)
-        l_results = re.search(r"VRB[0-9]{2}KT", fs_metar_mesg)
+    # -----------------------------------------------------------------------------------------
+    def _log_groups(self):
+        """
+        log the decoded groups (only called when INFO is enabled, decodes every group)
+        """
+        # split message
+        self._groups()
 
-        if l_results:
-            # wind variable
-            self._s_wind = l_results[0].strip()
+        # keyword flags
+        li_flags = self._i_flags
 
-            # wind direction
-            self._i_wind_dir = None
-            # wind velocity (kt)
-            self._i_wind_vel_kt = int(l_results[0][3:5])
-            # wind velocity (m/s)
-            self._i_wind_vel_mps = int(round(self._i_wind_vel_kt * df.DF_KT2MPS, 0))
+        # logger
+        M_LOG.info("Identifier: %s.", self.s_icao_code)
 
-            # logger
-            M_LOG.info("Variable winds directions at %d knots (%d mps).",
-                       self._i_wind_vel_kt, self._i_wind_vel_mps)
+        if li_flags & DI_FLG_COR:
+            M_LOG.info("Report type: This is a correction report")
 
-        # search for min/max (°)
-        l_results = re.search(r"[0-9]{3}V[0-9]{3}", fs_metar_mesg)
+        if li_flags & DI_FLG_AUTO:
+            M_LOG.info("Report type: This is a fully automated report")
 
-        if l_results:
-            # wind variable
-            self._s_wind_var = l_results[0].strip()
+        if self.s_forecast_time:
+            M_LOG.info("Time issued: %s %s:%s.", self.s_forecast_time[:2],
+                       self.s_forecast_time[2:4], self.s_forecast_time[4:6])
 
-            # wind direction min
-            self._i_wind_dir_min = int(l_results[0][:3])
-            # wind direction max
-            self._i_wind_dir_max = int(l_results[0][4:])
+        if self.s_wind:
+            M_LOG.info("Wind: %s from %s° at %d knots (%d mps), gusts up to %s knots.",
+                       self._s_wind, self._i_wind_dir, self._i_wind_vel_kt,
+                       self._i_wind_vel_mps, self._i_gust_kt)
 
-            # logger
+        if self.s_wind_var:
             M_LOG.info("Variable winds direction between %d° and %d°.",
                        self._i_wind_dir_min, self._i_wind_dir_max)
 
+        if self.v_cavok:
+            M_LOG.info("Visibility: Ceiling And Visibility OK.")
+
+        elif 9999 == self.i_visibility:
+            M_LOG.info("Visibility: 10km or more.")
+
+        elif self.i_visibility is not None:
+            M_LOG.info("Visibility: %d meter.", self._i_visibility)
+
+        if self.s_clouds:
+            M_LOG.info("Clouds: %s.", self._s_clouds)
+
+        if self.s_temperature:
+            M_LOG.info("Temperature %d°C (%d°F) Dewpoint %d°C (%d°F).",
+                       self._i_temperature_c, int((self._i_temperature_c * 9 / 5) + 32),
+                       self._i_dewpoint_c, int((self._i_dewpoint_c * 9 / 5) + 32))
+
+        if self.i_pressure_hpa is not None:
+            M_LOG.info("Pressure: QNH %d hPa.", self._i_pressure_hpa)
+
+        if self._i_pressure_inhg is not None:
+            M_LOG.info("Pressure: Sea level pressure is %.2f inHg.", self._i_pressure_inhg)
+
+        for lo_weather in self.t_weather:
+            M_LOG.info("Weather: %s %s.", lo_weather.s_group, str(lo_weather.s_text))
+
+        if li_flags & DI_FLG_NOSIG:
+            M_LOG.info("Trends: No significant change is expected to the reported conditions within the next 2 hours.")
+
+        if li_flags & DI_FLG_BECMG:
+            M_LOG.info("Trends: Sustained significant changes in weather conditions are expected.")
+
+        if li_flags & DI_FLG_TEMPO:
+            M_LOG.info("Trends: Temporary significant changes in weather conditions are expected.")
+
+        if li_flags & DI_FLG_A02:
+            M_LOG.info("This station is automated with a precipitation discriminator (rain/snow) sensor.")
+
+        if li_flags & DI_FLG_PWINO:
+            M_LOG.info("Precipitation identifier sensor not available.")
+
+        if li_flags & DI_FLG_MAINT:
+            M_LOG.info("System needs maintance.")
+
     # -----------------------------------------------------------------------------------------
     def _cut_id(self):
         """
@@ -691,44 +753,288 @@ class SMetar:
         self._s_metar_mesg = str.join(',', self._s_metar_mesg)
         self._s_metar_mesg = self._s_metar_mesg.replace(',', ' ')
 
+    # -----------------------------------------------------------------------------------------
+    def __reduce__(self):
+        """
+        pickle as a binary record (no reparse on unpickle), or as the message if the report
+        doesn't fit in a record
+        """
+        # record
+        lb_record = self.to_bytes()
+
+        # doesn't fit ?
+        if lb_record is None:
+            # return (reparsed on unpickle)
+            return SMetar, (self._s_metar_mesg,)
+
+        # return
+        return SMetar.from_bytes, (lb_record,)
+
+    # -----------------------------------------------------------------------------------------
+    @classmethod
+    def from_record(cls, f_buffer, fi_offset: int = 0):
+        """
+        rebuild a report from a binary record (wind, wind var, visibility, temperature and
+        pressure come decoded from the record, clouds and weather are decoded on first read)
+
+        :param f_buffer (bytes-like): buffer with the record (bytes, memoryview, mmap)
+        :param fi_offset (int): record offset in buffer
+
+        :returns: (SMetar, offset of the next record) or (None, None) on error
+        """
+        # unpack header
+        try:
+            lt_head = M_ST_RECORD.unpack_from(f_buffer, fi_offset)
+
+        # em caso de erro,...
+        except struct.error as l_err:
+            # logger
+            M_LOG.error("Invalid METAR record at %d: %s.", fi_offset, str(l_err))
+            # quit
+            return None, None
+
+        # header fields
+        (li_version, li_flags, li_present,
+         li_icao, li_time, li_wind, li_wind_var, li_vis, li_temp, li_hpa, li_inhg,
+         li_clouds, li_weather,
+         li_wind_dir, li_wind_kt, li_wind_mps, li_gust_kt, li_gust_mps, li_dir_min, li_dir_max,
+         li_visibility, li_temperature, li_dewpoint, li_pressure_hpa, li_pressure_inhg,
+         li_mesg) = lt_head
+
+        # unknown version ?
+        if DI_RECORD_VERSION != li_version:
+            # logger
+            M_LOG.error("Invalid METAR record version %d at %d.", li_version, fi_offset)
+            # quit
+            return None, None
+
+        # clouds and weather token indexes
+        li_ini = fi_offset + M_ST_RECORD.size
+        li_end = li_ini + li_clouds + li_weather
+
+        lb_ndx = bytes(f_buffer[li_ini:li_end])
+
+        # message
+        ls_mesg = bytes(f_buffer[li_end:li_end + li_mesg]).decode("latin-1")
+
+        # truncated record ?
+        if len(lb_ndx) + len(ls_mesg) != li_clouds + li_weather + li_mesg:
+            # logger
+            M_LOG.error("Truncated METAR record at %d.", fi_offset)
+            # quit
+            return None, None
+
+        # message tokens (as split)
+        llst_tokens = ls_mesg.replace('=', ' ').split()
+
+        # create report without logging
+        lo_metar = cls.__new__(cls)
+        lo_metar._s_metar_mesg = ls_mesg
+
+        # token by index (None if absent)
+        def _token(fi_ndx):
+            return None if DI_RECORD_NONE == fi_ndx else llst_tokens[fi_ndx]
+
+        # split
+        lo_metar._i_flags = li_flags
+        lo_metar._s_icao_code = _token(li_icao)
+        lo_metar._s_forecast_time = _token(li_time)
+        lo_metar._t_groups = (_token(li_wind), _token(li_wind_var), _token(li_vis),
+                              _token(li_temp), _token(li_hpa), _token(li_inhg),
+                              tuple(llst_tokens[li_ndx] for li_ndx in lb_ndx[:li_clouds]),
+                              tuple(weather_lookup(llst_tokens[li_ndx]) for li_ndx in lb_ndx[li_clouds:]))
+
+        # numeric field by present bit (None if absent)
+        def _field(fi_bit, fi_value):
+            return fi_value if li_present & (1 << fi_bit) else None
+
+        # wind
+        lo_metar._s_wind = lo_metar._t_groups[DI_GRP_WIND]
+        lo_metar._i_wind_dir = _field(0, li_wind_dir)
+        lo_metar._i_wind_vel_kt = _field(1, li_wind_kt)
+        lo_metar._i_wind_vel_mps = _field(2, li_wind_mps)
+        lo_metar._i_gust_kt = _field(3, li_gust_kt)
+        lo_metar._i_gust_mps = _field(4, li_gust_mps)
+
+        # wind var
+        lo_metar._s_wind_var = lo_metar._t_groups[DI_GRP_WIND_VAR]
+        lo_metar._i_wind_dir_min = _field(5, li_dir_min)
+        lo_metar._i_wind_dir_max = _field(6, li_dir_max)
+
+        # visibility
+        lo_metar._s_visibility = lo_metar._t_groups[DI_GRP_VISIBILITY]
+        lo_metar._v_cavok = True if "CAVOK" == lo_metar._s_visibility else None
+        lo_metar._i_visibility = _field(7, li_visibility)
+
+        # temperature
+        lo_metar._s_temperature = lo_metar._t_groups[DI_GRP_TEMPERATURE]
+        lo_metar._i_temperature_c = _field(8, li_temperature)
+        lo_metar._i_dewpoint_c = _field(9, li_dewpoint)
+
+        # pressure (hPa first)
+        lo_metar._s_pressure = lo_metar._t_groups[DI_GRP_QNH_HPA] or lo_metar._t_groups[DI_GRP_QNH_INHG]
+        lo_metar._i_pressure_hpa = _field(10, li_pressure_hpa)
+        lo_metar._i_pressure_inhg = None if not li_present & (1 << 11) else li_pressure_inhg / 100.
+
+        # decoded (clouds and weather on first read)
+        lo_metar._i_decoded = DI_DEC_WIND | DI_DEC_WIND_VAR | DI_DEC_VISIBILITY | \
+                              DI_DEC_TEMPERATURE | DI_DEC_PRESSURE
+
+        # return
+        return lo_metar, li_end + li_mesg
+
+    # -----------------------------------------------------------------------------------------
+    @classmethod
+    def from_bytes(cls, f_buffer):
+        """
+        rebuild a report from a binary record
+
+        :param f_buffer (bytes-like): binary record (see to_bytes)
+
+        :returns: SMetar or None on error
+        """
+        # return
+        return cls.from_record(f_buffer)[0]
+
+    # -----------------------------------------------------------------------------------------
+    def to_bytes(self):
+        """
+        binary record of the report: struct-packed header (token indexes and numeric fields)
+        followed by the raw message, see M_ST_RECORD
+
+        :returns: bytes or None if the report doesn't fit in a record
+        """
+        # message tokens (as split)
+        llst_tokens = self._s_metar_mesg.replace('=', ' ').split()
+
+        # too many tokens for a record ?
+        if len(llst_tokens) >= DI_RECORD_NONE:
+            # logger
+            M_LOG.debug("METAR too long for a record: %d tokens.", len(llst_tokens))
+            # quit
+            return None
+
+        # token index (first occurrence)
+        ldct_ndx = {}
+
+        for li_ndx, ls_token in enumerate(llst_tokens):
+            ldct_ndx.setdefault(ls_token, li_ndx)
+
+        # decode the groups stored in the record
+        lt_groups = self._groups()
+
+        for li_bit, lf_decode in ((DI_DEC_WIND, self._decode_wind),
+                                  (DI_DEC_WIND_VAR, self._decode_wind_var),
+                                  (DI_DEC_VISIBILITY, self._decode_visibility),
+                                  (DI_DEC_TEMPERATURE, self._decode_temperature),
+                                  (DI_DEC_PRESSURE, self._decode_pressure)):
+            # not decoded yet ?
+            if not self._i_decoded & li_bit:
+                lf_decode()
+
+        # numeric fields (in present bit order)
+        llst_fields = [self._i_wind_dir, self._i_wind_vel_kt, self._i_wind_vel_mps,
+                       self._i_gust_kt, self._i_gust_mps, self._i_wind_dir_min, self._i_wind_dir_max,
+                       self._i_visibility, self._i_temperature_c, self._i_dewpoint_c,
+                       self._i_pressure_hpa,
+                       None if self._i_pressure_inhg is None else int(round(self._i_pressure_inhg * 100.))]
+
+        # numeric fields present
+        li_present = 0
+
+        for li_bit, li_value in enumerate(llst_fields):
+            if li_value is not None:
+                li_present |= 1 << li_bit
+
+        # message
+        lb_mesg = self._s_metar_mesg.encode("latin-1", "replace")
+
+        # clouds and weather token indexes
+        lb_ndx = bytes([ldct_ndx[ls_group] for ls_group in lt_groups[DI_GRP_CLOUDS]] +
+                       [ldct_ndx[lo_weather.s_group] for lo_weather in lt_groups[DI_GRP_WEATHER]])
+
+        # pack header
+        try:
+            lb_head = M_ST_RECORD.pack(DI_RECORD_VERSION, self._i_flags, li_present,
+                                       *[ldct_ndx.get(ls_group, DI_RECORD_NONE)
+                                         for ls_group in (self._s_icao_code, self._s_forecast_time) +
+                                                          lt_groups[DI_GRP_WIND:DI_GRP_CLOUDS]],
+                                       len(lt_groups[DI_GRP_CLOUDS]), len(lt_groups[DI_GRP_WEATHER]),
+                                       *[li_value or 0 for li_value in llst_fields],
+                                       len(lb_mesg))
+
+        # em caso de erro,...
+        except struct.error as l_err:
+            # logger
+            M_LOG.debug("METAR doesn't fit in a record: %s.", str(l_err))
+            # quit
+            return None
+
+        # return
+        return lb_head + lb_ndx + lb_mesg
+
     # =============================================================================================
-    # data
+    # data (decoded on first read)
     # =============================================================================================
 
     # -----------------------------------------------------------------------------------------
     @property
     def v_cavok(self):
         """ceiling and visibility flag"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_VISIBILITY:
+            self._decode_visibility()
+
         return self._v_cavok
 
     # -----------------------------------------------------------------------------------------
     @property
     def s_clouds(self):
         """clouds group string"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_CLOUDS:
+            self._decode_clouds()
+
         return self._s_clouds
 
     # -----------------------------------------------------------------------------------------
     @property
     def i_dewpoint_c(self):
         """dewpoint in °C"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_TEMPERATURE:
+            self._decode_temperature()
+
         return self._i_dewpoint_c
 
     # -----------------------------------------------------------------------------------------
     @property
     def s_forecast_time(self):
         """forecast time"""
+        # not split yet ?
+        if self._t_groups is None:
+            self._split()
+
         return self._s_forecast_time
 
     # -----------------------------------------------------------------------------------------
     @property
     def i_gust_kt(self):
         """gust of wind in kt"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_WIND:
+            self._decode_wind()
+
         return self._i_gust_kt
 
     # -----------------------------------------------------------------------------------------
     @property
     def s_icao_code(self):
         """icao code"""
+        # not split yet ?
+        if self._t_groups is None:
+            self._split()
+
         return self._s_icao_code
 
     # -----------------------------------------------------------------------------------------
@@ -741,62 +1047,357 @@ class SMetar:
     @property
     def s_pressure(self):
         """pressure"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_PRESSURE:
+            self._decode_pressure()
+
         return self._s_pressure
 
     # -----------------------------------------------------------------------------------------
     @property
     def i_pressure_hpa(self):
         """pressure in hPa"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_PRESSURE:
+            self._decode_pressure()
+
         return self._i_pressure_hpa
 
     # -----------------------------------------------------------------------------------------
     @property
     def i_temperature_c(self):
         """temperature in °C"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_TEMPERATURE:
+            self._decode_temperature()
+
         return self._i_temperature_c
 
     # -----------------------------------------------------------------------------------------
     @property
     def s_temperature(self):
         """temperature"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_TEMPERATURE:
+            self._decode_temperature()
+
         return self._s_temperature
 
     # -----------------------------------------------------------------------------------------
     @property
     def i_visibility(self):
         """visibility in m"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_VISIBILITY:
+            self._decode_visibility()
+
         return self._i_visibility
 
     # -----------------------------------------------------------------------------------------
     @property
     def s_visibility(self):
         """visibility"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_VISIBILITY:
+            self._decode_visibility()
+
         return self._s_visibility
 
+    # -----------------------------------------------------------------------------------------
+    @property
+    def s_weather(self):
+        """weather group"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_WEATHER:
+            self._decode_weather()
+
+        return self._s_weather
+
+    # -----------------------------------------------------------------------------------------
+    @property
+    def s_weather_text(self):
+        """weather description"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_WEATHER:
+            self._decode_weather()
+
+        return self._s_weather_text
+
+    # -----------------------------------------------------------------------------------------
+    @property
+    def t_weather(self):
+        """all weather groups (tuple of SWeather)"""
+        return self._groups()[DI_GRP_WEATHER]
+
     # -----------------------------------------------------------------------------------------
     @property
     def s_wind(self):
         """wind"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_WIND:
+            self._decode_wind()
+
         return self._s_wind
 
     # -----------------------------------------------------------------------------------------
     @property
     def s_wind_var(self):
         """wind"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_WIND_VAR:
+            self._decode_wind_var()
+
         return self._s_wind_var
 
     # -----------------------------------------------------------------------------------------
     @property
     def i_wind_dir(self):
         """wind direction in °"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_WIND:
+            self._decode_wind()
+
         return self._i_wind_dir
 
     # -----------------------------------------------------------------------------------------
     @property
     def i_wind_vel_kt(self):
         """wind velocity in kt"""
+        # not decoded yet ?
+        if not self._i_decoded & DI_DEC_WIND:
+            self._decode_wind()
+
         return self._i_wind_vel_kt
 
+# < SMetarBatch >------------------------------------------------------------------------------
+
+class SMetarBatch:
+    """
+    columnar batch of parsed reports
+
+    numeric columns are typed arrays (array.array, buffer protocol) with NaN for a missing
+    group, so they can be wrapped without copy (numpy.frombuffer) or loaded in bulk
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self):
+        """
+        constructor
+        """
+        # icao codes and raw messages
+        self.lst_icao_code = []
+        self.lst_metar_mesg = []
+
+        # temperature and dewpoint (°C)
+        self.af_temperature_c = array.array('d')
+        self.af_dewpoint_c = array.array('d')
+
+        # wind direction (°, NaN if variable), velocity and gust (kt)
+        self.af_wind_dir = array.array('d')
+        self.af_wind_vel_kt = array.array('d')
+        self.af_gust_kt = array.array('d')
+
+        # visibility (m, NaN if CAVOK) and CAVOK flag
+        self.af_visibility = array.array('d')
+        self.av_cavok = array.array('b')
+
+        # QNH (hPa)
+        self.af_pressure_hpa = array.array('d')
+
+    # -----------------------------------------------------------------------------------------
+    def __len__(self):
+        """
+        number of reports
+        """
+        return len(self.lst_metar_mesg)
+
+    # -----------------------------------------------------------------------------------------
+    def append(self, fo_metar: SMetar):
+        """
+        append a parsed report
+
+        :param fo_metar (SMetar): parsed report
+        """
+        # not a number
+        lf_nan = DF_NAN
+
+        # icao code and raw message
+        self.lst_icao_code.append(fo_metar.s_icao_code)
+        self.lst_metar_mesg.append(fo_metar.s_metar_mesg)
+
+        # temperature
+        li_val = fo_metar.i_temperature_c
+        self.af_temperature_c.append(lf_nan if li_val is None else li_val)
+
+        # dewpoint
+        li_val = fo_metar.i_dewpoint_c
+        self.af_dewpoint_c.append(lf_nan if li_val is None else li_val)
+
+        # wind direction
+        li_val = fo_metar.i_wind_dir
+        self.af_wind_dir.append(lf_nan if li_val is None else li_val)
+
+        # wind velocity
+        li_val = fo_metar.i_wind_vel_kt
+        self.af_wind_vel_kt.append(lf_nan if li_val is None else li_val)
+
+        # gust
+        li_val = fo_metar.i_gust_kt
+        self.af_gust_kt.append(lf_nan if li_val is None else li_val)
+
+        # visibility
+        li_val = fo_metar.i_visibility
+        self.af_visibility.append(lf_nan if li_val is None else li_val)
+
+        # cavok
+        self.av_cavok.append(1 if fo_metar.v_cavok else 0)
+
+        # QNH
+        li_val = fo_metar.i_pressure_hpa
+        self.af_pressure_hpa.append(lf_nan if li_val is None else li_val)
+
+    # -----------------------------------------------------------------------------------------
+    def columns(self):
+        """
+        columns by name
+
+        :returns: dict column name -> column
+        """
+        # return
+        return {"icao_code": self.lst_icao_code,
+                "metar_mesg": self.lst_metar_mesg,
+                "temperature_c": self.af_temperature_c,
+                "dewpoint_c": self.af_dewpoint_c,
+                "wind_dir": self.af_wind_dir,
+                "wind_vel_kt": self.af_wind_vel_kt,
+                "gust_kt": self.af_gust_kt,
+                "visibility": self.af_visibility,
+                "cavok": self.av_cavok,
+                "pressure_hpa": self.af_pressure_hpa}
+
+# < SParseCache >------------------------------------------------------------------------------
+
+class SParseCache:
+    """
+    thread-safe LRU of parsed reports, bounded by number of entries and by estimated memory
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self, fi_max_entries: int, fi_max_bytes: int):
+        """
+        constructor
+
+        :param fi_max_entries (int): maximum number of entries
+        :param fi_max_bytes (int): maximum estimated memory (bytes)
+        """
+        # bounds
+        self._i_max_entries = fi_max_entries
+        self._i_max_bytes = fi_max_bytes
+
+        # key -> (SMetar, estimated size), least recently used first
+        self._odct_cache = collections.OrderedDict()
+        self._i_bytes = 0
+
+        # lock
+        self._lock = threading.Lock()
+
+        # counters
+        self.i_hits = 0
+        self.i_misses = 0
+        self.i_evictions = 0
+
+    # -----------------------------------------------------------------------------------------
+    def clear(self):
+        """
+        drop all entries and reset counters
+        """
+        with self._lock:
+            # clear
+            self._odct_cache.clear()
+            self._i_bytes = 0
+
+            # reset counters
+            self.i_hits = 0
+            self.i_misses = 0
+            self.i_evictions = 0
+
+    # -----------------------------------------------------------------------------------------
+    def get(self, f_key):
+        """
+        get a parsed report
+
+        :param f_key: cache key
+
+        :returns: SMetar if cached else None
+        """
+        with self._lock:
+            # search
+            lt_entry = self._odct_cache.get(f_key, None)
+
+            # miss ?
+            if lt_entry is None:
+                # count
+                self.i_misses += 1
+
+                # return
+                return None
+
+            # most recently used
+            self._odct_cache.move_to_end(f_key)
+
+            # count
+            self.i_hits += 1
+
+        # return
+        return lt_entry[0]
+
+    # -----------------------------------------------------------------------------------------
+    def put(self, f_key, fo_metar: SMetar, fi_size: int):
+        """
+        save a parsed report, evicting the least recently used ones beyond the bounds
+
+        :param f_key: cache key
+        :param fo_metar (SMetar): parsed report
+        :param fi_size (int): estimated size (bytes)
+        """
+        with self._lock:
+            # already saved (by another thread) ?
+            if f_key in self._odct_cache:
+                # quit
+                return
+
+            # save
+            self._odct_cache[f_key] = (fo_metar, fi_size)
+            self._i_bytes += fi_size
+
+            # over bounds ?
+            while self._odct_cache and ((len(self._odct_cache) > self._i_max_entries) or
+                                        (self._i_bytes > self._i_max_bytes)):
+                # evict least recently used
+                _, (_, li_size) = self._odct_cache.popitem(last=False)
+                self._i_bytes -= li_size
+
+                # count
+                self.i_evictions += 1
+
+    # -----------------------------------------------------------------------------------------
+    def stats(self):
+        """
+        cache counters
+
+        :returns: dict with hits, misses, evictions, entries and bytes
+        """
+        with self._lock:
+            # return
+            return {"hits": self.i_hits,
+                    "misses": self.i_misses,
+                    "evictions": self.i_evictions,
+                    "entries": len(self._odct_cache),
+                    "bytes": self._i_bytes}
+
+# < local data >-------------------------------------------------------------------------------
+
+# parse cache
+M_PARSE_CACHE = SParseCache(DI_PARSE_CACHE_ENTRIES, DI_PARSE_CACHE_BYTES)
+
 # ---------------------------------------------------------------------------------------------
 def _get_metar_mesg(fs_station_file: str):
     """
@@ -812,24 +1413,253 @@ def _get_metar_mesg(fs_station_file: str):
     # return
     return ls_line
 
+# ---------------------------------------------------------------------------------------------
+def metar_cache_stats():
+    """
+    parse cache counters
+
+    :returns: dict with hits, misses, evictions, entries and bytes
+    """
+    # return
+    return M_PARSE_CACHE.stats()
+
+# ---------------------------------------------------------------------------------------------
+def metar_iter_bulletin(fs_bulletin_file: str):
+    """
+    read the reports of a bulletin or archive file, one at a time (the file is memory-mapped
+    and each report is only decoded when reached)
+
+    :param fs_bulletin_file (str): bulletin/archive filename (reports terminated by '=')
+
+    :returns: generator of METAR messages (whitespace normalized)
+    """
+    # open bulletin
+    try:
+        lfh_in = open(fs_bulletin_file, "rb")
+
+    # em caso de erro,...
+    except OSError as l_err:
+        # logger
+        M_LOG.error("Bulletin %s not available: %s.", fs_bulletin_file, str(l_err))
+        # quit
+        return
+
+    with lfh_in:
+        # empty file can't be mapped
+        if 0 == os.fstat(lfh_in.fileno()).st_size:
+            # quit
+            return
+
+        # map bulletin
+        with mmap.mmap(lfh_in.fileno(), 0, access=mmap.ACCESS_READ) as l_map:
+            # start of the current report
+            li_ini = 0
+            li_len = len(l_map)
+
+            # for all reports...
+            while li_ini < li_len:
+                # report terminator
+                li_end = l_map.find(DS_BULLETIN_END, li_ini)
+
+                # no more terminators (last report) ?
+                if -1 == li_end:
+                    li_end = li_len
+
+                # report words
+                llst_words = []
+
+                # for all report lines...
+                for ls_line in l_map[li_ini:li_end].decode("latin-1").splitlines():
+                    # without control characters
+                    ls_line = ls_line.strip(DS_BULLETIN_CTRL)
+
+                    # envelope or heading ?
+                    if M_RE_BULLETIN_SKIP.fullmatch(ls_line):
+                        # next line
+                        continue
+
+                    # report text
+                    llst_words.extend(ls_line.split())
+
+                # next report
+                li_ini = li_end + 1
+
+                # report (whitespace normalized)
+                ls_mesg = " ".join(llst_words)
+
+                # empty (trailer) ?
+                if not ls_mesg:
+                    # next report
+                    continue
+
+                # report
+                yield ls_mesg
+
+# ---------------------------------------------------------------------------------------------
+def metar_parse_bulletin(fs_bulletin_file: str):
+    """
+    metar parse of a bulletin or archive file, one report at a time with constant memory
+    (reports are not cached, a large archive would only flush the parse cache)
+
+    :param fs_bulletin_file (str): bulletin/archive filename (reports terminated by '=')
+
+    :returns: generator of SMetar
+    """
+    # for all reports...
+    for ls_mesg in metar_iter_bulletin(fs_bulletin_file):
+        # parse
+        yield SMetar(ls_mesg)
+
+# ---------------------------------------------------------------------------------------------
+def metar_read_records(fs_record_file: str):
+    """
+    read the binary records of a file (memory-mapped, no reparse), see metar_write_records
+
+    :param fs_record_file (str): record filename
+
+    :returns: generator of SMetar
+    """
+    # open records
+    try:
+        lfh_in = open(fs_record_file, "rb")
+
+    # em caso de erro,...
+    except OSError as l_err:
+        # logger
+        M_LOG.error("Record file %s not available: %s.", fs_record_file, str(l_err))
+        # quit
+        return
+
+    with lfh_in:
+        # empty file can't be mapped
+        if 0 == os.fstat(lfh_in.fileno()).st_size:
+            # quit
+            return
+
+        # map records
+        with mmap.mmap(lfh_in.fileno(), 0, access=mmap.ACCESS_READ) as l_map:
+            # first record
+            li_ini = 0
+            li_len = len(l_map)
+
+            # for all records...
+            while li_ini < li_len:
+                # rebuild report
+                lo_metar, li_ini = SMetar.from_record(l_map, li_ini)
+
+                # invalid record ?
+                if lo_metar is None:
+                    # quit
+                    return
+
+                # report
+                yield lo_metar
+
+# ---------------------------------------------------------------------------------------------
+def metar_write_records(fs_record_file: str, flst_metar):
+    """
+    write reports as consecutive binary records, see SMetar.to_bytes
+
+    :param fs_record_file (str): record filename
+    :param flst_metar (iterable): reports (SMetar)
+
+    :returns: number of records written
+    """
+    # records written and reports that don't fit in a record
+    li_count = 0
+    li_skipped = 0
+
+    # create records
+    with open(fs_record_file, "wb") as lfh_out:
+        # for all reports...
+        for lo_metar in flst_metar:
+            # record
+            lb_record = lo_metar.to_bytes()
+
+            if lb_record is not None:
+                # save record
+                lfh_out.write(lb_record)
+                li_count += 1
+
+            # senão, doesn't fit
+            else:
+                li_skipped += 1
+
+    if li_skipped:
+        # logger
+        M_LOG.warning("%d reports don't fit in a record, not written to %s.", li_skipped, fs_record_file)
+
+    # return
+    return li_count
+
 # ---------------------------------------------------------------------------------------------
 def metar_parse(fs_metar_mesg: str):
     """
-    metar parse
+    metar parse (cached, keyed on the message with normalized whitespace). The report keeps
+    the normalized message, the same for every caller whatever its spacing
 
     :param fs_metar_mesg (str): METAR message
     """
+    # normalized message
+    ls_key = " ".join(fs_metar_mesg.split())
+
+    # already parsed ?
+    lo_metar = M_PARSE_CACHE.get(ls_key)
+
+    if lo_metar is None:
+        # parse (the key is the message)
+        lo_metar = SMetar(ls_key)
+
+        # save
+        M_PARSE_CACHE.put(ls_key, lo_metar, sys.getsizeof(ls_key) + DI_PARSE_CACHE_OVERHEAD)
+
     # return
-    return SMetar(fs_metar_mesg.strip())
+    return lo_metar
+
+# ---------------------------------------------------------------------------------------------
+def metar_parse_many(flst_metar_mesg):
+    """
+    metar parse of many messages into one columnar batch
+
+    :param flst_metar_mesg (iterable): METAR messages (list, generator, file,...)
+
+    :returns: SMetarBatch
+    """
+    # create batch
+    lo_batch = SMetarBatch()
+
+    # for all messages...
+    for ls_mesg in flst_metar_mesg:
+        # parse and save
+        lo_batch.append(SMetar(ls_mesg.strip()))
+
+    # return
+    return lo_batch
 
 # ---------------------------------------------------------------------------------------------
 def metar_parse_file(fs_station_file: str):
     """
-    metar parse file
+    metar parse file (cached, keyed on path, modification time and size)
 
     :param fs_station_file (str): station filename
     """
+    # file status
+    l_stat = os.stat(fs_station_file)
+
+    # file key (path, modification time and size)
+    lt_key = (os.path.abspath(fs_station_file), l_stat.st_mtime_ns, l_stat.st_size)
+
+    # already parsed ?
+    lo_metar = M_PARSE_CACHE.get(lt_key)
+
+    if lo_metar is None:
+        # parse
+        lo_metar = metar_parse(_get_metar_mesg(fs_station_file))
+
+        # save (the report itself is accounted on the message entry)
+        M_PARSE_CACHE.put(lt_key, lo_metar, sys.getsizeof(lt_key[0]) + sys.getsizeof(lt_key))
+
     # return
-    return metar_parse(_get_metar_mesg(fs_station_file))
+    return lo_metar
 
 # < the end >----------------------------------------------------------------------------------
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+fl_metrics
+
+client-side instrumentation of the REDEMET and INMET requests: latency histogram, status
+codes, bytes on the wire (compressed body) and events (retries, transport errors, open circuit, deadline, hedges) per
+endpoint, and connection reuse per host. At the end of a run a summary is logged and
+appended as one JSON line to the metrics file (FL_METRICS_FILE)
+
+2026.oct  mlabru  bytes on the wire (compressed), not the decoded body
+2026.oct  mlabru  initial version (Linux/Python)
+"""
+# < imports >----------------------------------------------------------------------------------
+
+# python library
+import bisect
+import datetime
+import json
+import logging
+import os
+import pathlib
+import threading
+
+# local
+import fl_defs as df
+import fl_dirs as dr
+
+# < constants >--------------------------------------------------------------------------------
+
+# environment
+DS_ENV_METRICS = "FL_METRICS_FILE"
+
+# metrics file (JSON lines, one per run)
+DS_METRICS_FILE = str(pathlib.PurePath(dr.DS_CACHE_DIR).joinpath("http_metrics.jsonl"))
+
+# latency histogram, upper bounds of the buckets (s), one more bucket above the last one
+DT_METRICS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10., 30.)
+
+# events
+DS_EVENT_RETRY = "retry"
+DS_EVENT_ERROR = "error"
+DS_EVENT_CIRCUIT = "circuit_open"
+DS_EVENT_DEADLINE = "deadline"
+DS_EVENT_HEDGE = "hedge"
+
+# < logging >----------------------------------------------------------------------------------
+
+# logger
+M_LOG = logging.getLogger(__name__)
+M_LOG.setLevel(df.DI_LOG_LEVEL)
+
+# < local data >-------------------------------------------------------------------------------
+
+# metrics by endpoint ({endpoint: {"requests", "buckets", "latency_sum", "latency_max", "status",
+# "bytes", "events"}})
+M_DCT_ENDPOINTS = {}
+
+# connections by host ({host: [requests, new connections]})
+M_DCT_HOSTS = {}
+
+# run start
+M_DT_START = datetime.datetime.utcnow()
+
+# metrics guard
+M_LOCK = threading.Lock()
+
+# ---------------------------------------------------------------------------------------------
+def _endpoint(fs_endpoint: str):
+    """
+    metrics of the endpoint (created on first use, call with M_LOCK held)
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+
+    :returns: dict of metrics
+    """
+    # endpoint metrics
+    ldct_metrics = M_DCT_ENDPOINTS.get(fs_endpoint, None)
+
+    if ldct_metrics is None:
+        # create metrics
+        ldct_metrics = M_DCT_ENDPOINTS[fs_endpoint] = {"requests": 0,
+                                                       "buckets": [0] * (len(DT_METRICS_BUCKETS) + 1),
+                                                       "latency_sum": 0.,
+                                                       "latency_max": 0.,
+                                                       "status": {},
+                                                       "bytes": 0,
+                                                       "events": {}}
+
+    # return
+    return ldct_metrics
+
+# ---------------------------------------------------------------------------------------------
+def _percentile(flst_buckets: list, ff_max: float, ff_percentile: float):
+    """
+    latency percentile from the histogram (upper bound of its bucket)
+
+    :param flst_buckets (list): bucket counts
+    :param ff_max (float): highest latency (bound of the last bucket)
+    :param ff_percentile (float): percentile (0 to 100)
+
+    :returns: latency (s) or None if no requests
+    """
+    # requests
+    li_total = sum(flst_buckets)
+
+    if not li_total:
+        # return with error
+        return None
+
+    # rank
+    lf_rank = ff_percentile / 100. * li_total
+
+    # requests up to the bucket
+    li_count = 0
+
+    # for all buckets...
+    for li_bucket, li_bucket_count in enumerate(flst_buckets):
+        # requests up to the bucket
+        li_count += li_bucket_count
+
+        # rank reached ?
+        if li_count >= lf_rank and li_bucket_count:
+            # return (bound of the bucket, not above the highest latency)
+            return min(ff_max, DT_METRICS_BUCKETS[li_bucket]) if li_bucket < len(DT_METRICS_BUCKETS) else ff_max
+
+    # return
+    return ff_max
+
+# ---------------------------------------------------------------------------------------------
+def metrics_connections(fs_host: str, fi_requests: int, fi_new: int):
+    """
+    save the connections used by the requests of a host
+
+    :param fs_host (str): host
+    :param fi_requests (int): requests
+    :param fi_new (int): new connections opened (the others reused a pooled one)
+    """
+    with M_LOCK:
+        # host connections
+        llst_host = M_DCT_HOSTS.setdefault(fs_host or "", [0, 0])
+
+        # save
+        llst_host[0] += fi_requests
+        llst_host[1] += fi_new
+
+# ---------------------------------------------------------------------------------------------
+def metrics_count(fs_endpoint: str, fs_event: str, fi_count: int = 1):
+    """
+    count an event of the endpoint (DS_EVENT_*)
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+    :param fs_event (str): event
+    :param fi_count (int): count
+    """
+    with M_LOCK:
+        # endpoint events
+        ldct_events = _endpoint(fs_endpoint)["events"]
+
+        # count
+        ldct_events[fs_event] = ldct_events.get(fs_event, 0) + fi_count
+
+# ---------------------------------------------------------------------------------------------
+def metrics_dump(fs_file: str = None):
+    """
+    log the summary of the run and append it to the metrics file (one JSON line)
+
+    :param fs_file (str): metrics file (default FL_METRICS_FILE or DS_METRICS_FILE)
+
+    :returns: summary
+    """
+    # summary
+    ldct_summary = metrics_summary()
+
+    # for all endpoints...
+    for ls_endpoint, ldct_metrics in sorted(ldct_summary["endpoints"].items()):
+        # logger
+        M_LOG.info("HTTP %s: %d requests, p50 %s s, p95 %s s, p99 %s s, max %.3f s, %d bytes, status %s, events %s.",
+                   ls_endpoint, ldct_metrics["requests"], ldct_metrics["latency"]["p50"],
+                   ldct_metrics["latency"]["p95"], ldct_metrics["latency"]["p99"],
+                   ldct_metrics["latency"]["max"], ldct_metrics["bytes"], str(ldct_metrics["status"]),
+                   str(ldct_metrics["events"]))
+
+    # for all hosts...
+    for ls_host, ldct_host in sorted(ldct_summary["hosts"].items()):
+        # logger
+        M_LOG.info("HTTP %s: %d requests, %d new connections, reuse %s.", ls_host, ldct_host["requests"],
+                   ldct_host["new"], ldct_host["reuse"])
+
+    # metrics file
+    ls_file = fs_file or os.getenv(DS_ENV_METRICS, None) or DS_METRICS_FILE
+
+    try:
+        # metrics directory
+        ls_dir = os.path.dirname(ls_file)
+
+        if ls_dir:
+            os.makedirs(ls_dir, exist_ok=True)
+
+        # append summary
+        with open(ls_file, "a") as lfh_out:
+            lfh_out.write(json.dumps(ldct_summary, sort_keys=True) + "\n")
+
+    # em caso de erro,...
+    except OSError as l_err:
+        # logger
+        M_LOG.error("HTTP metrics not saved in %s: %s.", ls_file, str(l_err))
+
+    # return
+    return ldct_summary
+
+# ---------------------------------------------------------------------------------------------
+def metrics_request(fs_endpoint: str, ff_latency: float, fi_status: int, fi_bytes: int):
+    """
+    save an answered request of the endpoint
+
+    :param fs_endpoint (str): endpoint name (redemet_metar, inmet_station, ...)
+    :param ff_latency (float): latency, body included (s)
+    :param fi_status (int): status code
+    :param fi_bytes (int): body bytes on the wire (compressed, the decoded length if unknown)
+    """
+    with M_LOCK:
+        # endpoint metrics
+        ldct_metrics = _endpoint(fs_endpoint)
+
+        # requests and latency histogram
+        ldct_metrics["requests"] += 1
+        ldct_metrics["buckets"][bisect.bisect_left(DT_METRICS_BUCKETS, ff_latency)] += 1
+        ldct_metrics["latency_sum"] += ff_latency
+        ldct_metrics["latency_max"] = max(ldct_metrics["latency_max"], ff_latency)
+
+        # status codes (JSON keys)
+        ls_status = str(fi_status)
+        ldct_metrics["status"][ls_status] = ldct_metrics["status"].get(ls_status, 0) + 1
+
+        # bytes
+        ldct_metrics["bytes"] += fi_bytes
+
+# ---------------------------------------------------------------------------------------------
+def metrics_summary():
+    """
+    summary of the run (machine-readable)
+
+    :returns: dict {"start", "end", "buckets", "endpoints": {endpoint: {...}}, "hosts": {host: {...}}}
+    """
+    with M_LOCK:
+        # endpoints
+        ldct_endpoints = {}
+
+        # for all endpoints...
+        for ls_endpoint, ldct_metrics in M_DCT_ENDPOINTS.items():
+            # histogram
+            llst_buckets = list(ldct_metrics["buckets"])
+            lf_max = ldct_metrics["latency_max"]
+
+            # endpoint summary
+            ldct_endpoints[ls_endpoint] = {"requests": ldct_metrics["requests"],
+                                           "latency": {"counts": llst_buckets,
+                                                       "sum": round(ldct_metrics["latency_sum"], 6),
+                                                       "max": round(lf_max, 6),
+                                                       "p50": _percentile(llst_buckets, lf_max, 50.),
+                                                       "p95": _percentile(llst_buckets, lf_max, 95.),
+                                                       "p99": _percentile(llst_buckets, lf_max, 99.)},
+                                           "status": dict(ldct_metrics["status"]),
+                                           "bytes": ldct_metrics["bytes"],
+                                           "events": dict(ldct_metrics["events"])}
+
+        # hosts
+        ldct_hosts = {ls_host: {"requests": li_requests, "new": li_new,
+                                "reuse": round(1. - li_new / li_requests, 4) if li_requests else None}
+                      for ls_host, (li_requests, li_new) in M_DCT_HOSTS.items()}
+
+    # return
+    return {"start": M_DT_START.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "buckets": list(DT_METRICS_BUCKETS),
+            "endpoints": ldct_endpoints,
+            "hosts": ldct_hosts}
+
+# < the end >----------------------------------------------------------------------------------
@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+"""
+fl_replay
+
+record/replay of the REDEMET and INMET traffic. Mode by environment:
+
+FL_HTTP_MODE=record   answers of the live APIs are saved as fixtures (FL_HTTP_FIXTURES)
+FL_HTTP_MODE=replay   requests go to a local stand-in server that answers from the fixtures,
+                      with latency (FL_REPLAY_LATENCY, s), error rate (FL_REPLAY_ERRORS, 0..1)
+                      and bandwidth (FL_REPLAY_BANDWIDTH, bytes/s). FL_REPLAY_URL points to a
+                      stand-in already running (python fl_replay.py ...), else one is started
+                      in-process on first use
+
+2026.oct  mlabru  initial version (Linux/Python)
+"""
+# < imports >----------------------------------------------------------------------------------
+
+# python library
+import argparse
+import hashlib
+import http.server
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+
+# local
+import fl_defs as df
+
+# < constants >--------------------------------------------------------------------------------
+
+# environment
+DS_ENV_MODE = "FL_HTTP_MODE"
+DS_ENV_FIXTURES = "FL_HTTP_FIXTURES"
+DS_ENV_URL = "FL_REPLAY_URL"
+DS_ENV_LATENCY = "FL_REPLAY_LATENCY"
+DS_ENV_ERRORS = "FL_REPLAY_ERRORS"
+DS_ENV_BANDWIDTH = "FL_REPLAY_BANDWIDTH"
+
+# modes
+DS_MODE_RECORD = "record"
+DS_MODE_REPLAY = "replay"
+
+# fixtures directory
+DS_FIXTURES_DIR = "fixtures"
+
+# query parameters left out of the fixture key (secrets)
+DSET_REDACTED = frozenset(("api_key",))
+
+# bandwidth chunk (bytes)
+DI_CHUNK = 4096
+
+# < logging >----------------------------------------------------------------------------------
+
+# logger
+M_LOG = logging.getLogger(__name__)
+M_LOG.setLevel(df.DI_LOG_LEVEL)
+
+# < local data >-------------------------------------------------------------------------------
+
+# in-process stand-in (started on first use)
+M_STAND_IN = None
+
+# stand-in guard
+M_LOCK = threading.Lock()
+
+# ---------------------------------------------------------------------------------------------
+def _fixture_file(fs_url: str, fs_dir: str = None):
+    """
+    fixture filename of an URL (hash of the URL without secrets)
+
+    :param fs_url (str): URL
+    :param fs_dir (str): fixtures directory
+
+    :returns: (filename, URL without secrets)
+    """
+    # URL parts
+    l_url = urllib.parse.urlsplit(fs_url)
+
+    # query without secrets
+    ls_query = urllib.parse.urlencode([(ls_key, ls_val)
+                                       for ls_key, ls_val in urllib.parse.parse_qsl(l_url.query, keep_blank_values=True)
+                                       if ls_key not in DSET_REDACTED])
+
+    # URL without secrets
+    ls_url = urllib.parse.urlunsplit((l_url.scheme, l_url.netloc, l_url.path, ls_query, ""))
+
+    # fixture filename
+    ls_file = os.path.join(fs_dir or fixtures_dir(), hashlib.sha1(ls_url.encode()).hexdigest() + ".json")
+
+    # return
+    return ls_file, ls_url
+
+# ---------------------------------------------------------------------------------------------
+def fixtures_dir():
+    """
+    fixtures directory
+
+    :returns: directory
+    """
+    # return
+    return os.getenv(DS_ENV_FIXTURES, DS_FIXTURES_DIR)
+
+# ---------------------------------------------------------------------------------------------
+def record(fs_url: str, fi_status: int, fdct_headers, fs_body: str):
+    """
+    save an answer as fixture
+
+    :param fs_url (str): URL
+    :param fi_status (int): status code
+    :param fdct_headers (dict): answer headers
+    :param fs_body (str): answer body
+    """
+    # fixture filename
+    ls_file, ls_url = _fixture_file(fs_url)
+
+    try:
+        # fixtures directory
+        os.makedirs(os.path.dirname(ls_file), exist_ok=True)
+
+        # save fixture (rename, so concurrent writers never leave a partial file)
+        with open(ls_file + ".tmp.{}".format(threading.get_ident()), "w") as lfh_out:
+            json.dump({"url": ls_url,
+                       "status": fi_status,
+                       "headers": {ls_key: fdct_headers[ls_key]
+                                   for ls_key in ("Content-Type", "Retry-After") if ls_key in fdct_headers},
+                       "body": fs_body}, lfh_out)
+
+        os.replace(lfh_out.name, ls_file)
+
+    # em caso de erro,...
+    except OSError as l_err:
+        # logger
+        M_LOG.error("Fixture %s not saved: %s.", ls_file, str(l_err))
+
+# ---------------------------------------------------------------------------------------------
+def replay_mode():
+    """
+    record/replay mode
+
+    :returns: DS_MODE_RECORD, DS_MODE_REPLAY or None (live)
+    """
+    # mode
+    ls_mode = os.getenv(DS_ENV_MODE, "").strip().lower()
+
+    # return
+    return ls_mode if ls_mode in (DS_MODE_RECORD, DS_MODE_REPLAY) else None
+
+# ---------------------------------------------------------------------------------------------
+def replay_url(fs_url: str):
+    """
+    URL of the stand-in for an upstream URL (stand-in started in-process if needed)
+
+    :param fs_url (str): upstream URL
+
+    :returns: stand-in URL
+    """
+    # global stand-in
+    global M_STAND_IN
+
+    # stand-in URL
+    ls_base = os.getenv(DS_ENV_URL, None)
+
+    if not ls_base:
+        with M_LOCK:
+            # not started yet ?
+            if M_STAND_IN is None:
+                # start stand-in (ephemeral port)
+                M_STAND_IN = SStandIn(fixtures_dir(),
+                                      float(os.getenv(DS_ENV_LATENCY, "0")),
+                                      float(os.getenv(DS_ENV_ERRORS, "0")),
+                                      float(os.getenv(DS_ENV_BANDWIDTH, "0")))
+                M_STAND_IN.start()
+
+            # stand-in URL
+            ls_base = M_STAND_IN.s_url
+
+    # URL parts
+    l_url = urllib.parse.urlsplit(fs_url)
+
+    # return (/scheme/host/path?query)
+    return "{}/{}/{}{}{}".format(ls_base.rstrip('/'), l_url.scheme, l_url.netloc, l_url.path,
+                                 "?" + l_url.query if l_url.query else "")
+
+# < SStandIn >---------------------------------------------------------------------------------
+
+class _SStandInHandler(http.server.BaseHTTPRequestHandler):
+    """
+    stand-in request handler (answers from the fixtures of the server)
+    """
+    # keep-alive
+    protocol_version = "HTTP/1.1"
+
+    # -----------------------------------------------------------------------------------------
+    def do_GET(self):
+        """
+        answer GET
+        """
+        # stand-in
+        lo_stand_in = self.server.o_stand_in
+
+        # latency
+        if lo_stand_in.f_latency > 0.:
+            time.sleep(lo_stand_in.f_latency)
+
+        # error injected ?
+        if random.random() < lo_stand_in.f_errors:
+            # answer
+            self._answer(503, {"Content-Type": "text/plain"}, "stand-in injected error")
+
+            # quit
+            return
+
+        # upstream URL (/scheme/host/path?query)
+        llst_parts = self.path.lstrip('/').split('/', 2)
+
+        if len(llst_parts) < 3:
+            # answer
+            self._answer(400, {"Content-Type": "text/plain"}, "bad stand-in path")
+
+            # quit
+            return
+
+        # fixture filename
+        ls_file, _ = _fixture_file("{}://{}/{}".format(*llst_parts), lo_stand_in.s_dir)
+
+        try:
+            # load fixture
+            with open(ls_file, "r") as lfh_in:
+                ldct_fixture = json.load(lfh_in)
+
+        # em caso de erro,...
+        except (OSError, ValueError):
+            # answer
+            self._answer(404, {"Content-Type": "text/plain"}, "no fixture")
+
+            # quit
+            return
+
+        # answer
+        self._answer(ldct_fixture.get("status", 200), ldct_fixture.get("headers", {}), ldct_fixture.get("body", ""))
+
+    # -----------------------------------------------------------------------------------------
+    def _answer(self, fi_status: int, fdct_headers: dict, fs_body: str):
+        """
+        send answer (paced to the bandwidth of the stand-in)
+
+        :param fi_status (int): status code
+        :param fdct_headers (dict): answer headers
+        :param fs_body (str): answer body
+        """
+        # body
+        lb_body = fs_body.encode("utf-8")
+
+        # status and headers
+        self.send_response(fi_status)
+
+        for ls_key, ls_val in fdct_headers.items():
+            self.send_header(ls_key, ls_val)
+
+        self.send_header("Content-Length", str(len(lb_body)))
+        self.end_headers()
+
+        # bandwidth
+        lf_bandwidth = self.server.o_stand_in.f_bandwidth
+
+        # for all chunks...
+        for li_ini in range(0, len(lb_body), DI_CHUNK):
+            # chunk
+            lb_chunk = lb_body[li_ini:li_ini + DI_CHUNK]
+
+            # send chunk
+            self.wfile.write(lb_chunk)
+
+            # limited bandwidth ?
+            if lf_bandwidth > 0.:
+                time.sleep(len(lb_chunk) / lf_bandwidth)
+
+    # -----------------------------------------------------------------------------------------
+    def log_message(self, fs_format, *flst_args):
+        """
+        requests log (debug)
+        """
+        # logger
+        M_LOG.debug("Stand-in: " + fs_format, *flst_args)
+
+class SStandIn:
+    """
+    local stand-in of the REDEMET and INMET APIs (threaded HTTP server answering from fixtures)
+    """
+    # -----------------------------------------------------------------------------------------
+    def __init__(self, fs_dir: str, ff_latency: float = 0., ff_errors: float = 0.,
+                 ff_bandwidth: float = 0., fs_host: str = "127.0.0.1", fi_port: int = 0):
+        """
+        constructor
+
+        :param fs_dir (str): fixtures directory
+        :param ff_latency (float): latency per request (s)
+        :param ff_errors (float): rate of 503 answers (0..1)
+        :param ff_bandwidth (float): bandwidth per answer (bytes/s, 0 for unlimited)
+        :param fs_host (str): host
+        :param fi_port (int): port (0 for ephemeral)
+        """
+        # fixtures and conditions
+        self.s_dir = fs_dir
+        self.f_latency = ff_latency
+        self.f_errors = ff_errors
+        self.f_bandwidth = ff_bandwidth
+
+        # server
+        self._o_server = http.server.ThreadingHTTPServer((fs_host, fi_port), _SStandInHandler)
+        self._o_server.daemon_threads = True
+        self._o_server.o_stand_in = self
+
+        # URL
+        self.s_url = "http://{}:{}".format(*self._o_server.server_address[:2])
+
+    # -----------------------------------------------------------------------------------------
+    def serve_forever(self):
+        """
+        serve (blocking)
+        """
+        # serve
+        self._o_server.serve_forever()
+
+    # -----------------------------------------------------------------------------------------
+    def start(self):
+        """
+        serve in a daemon thread
+        """
+        # serve thread
+        l_thr = threading.Thread(target=self._o_server.serve_forever, daemon=True)
+        l_thr.start()
+
+        # logger
+        M_LOG.info("Stand-in serving %s at %s.", self.s_dir, self.s_url)
+
+    # -----------------------------------------------------------------------------------------
+    def stop(self):
+        """
+        stop serving
+        """
+        # stop
+        self._o_server.shutdown()
+        self._o_server.server_close()
+
+# ---------------------------------------------------------------------------------------------
+def arg_parse():
+    """
+    parse command line arguments
+    arguments parse: <fixtures dir> <host> <port> <latency> <error rate> <bandwidth>
+
+    :returns: arguments
+    """
+    # create parser
+    l_parser = argparse.ArgumentParser(description="Frontline REDEMET/INMET stand-in.")
+    assert l_parser
+
+    # args
+    l_parser.add_argument("-d", "--dir", dest="dir", action="store", default=fixtures_dir(),
+                          help="Fixtures directory.")
+    l_parser.add_argument("-s", "--host", dest="host", action="store", default="127.0.0.1",
+                          help="Host.")
+    l_parser.add_argument("-p", "--port", dest="port", action="store", type=int, default=8080,
+                          help="Port.")
+    l_parser.add_argument("-l", "--latency", dest="latency", action="store", type=float, default=0.,
+                          help="Latency per request (s).")
+    l_parser.add_argument("-e", "--errors", dest="errors", action="store", type=float, default=0.,
+                          help="Rate of 503 answers (0..1).")
+    l_parser.add_argument("-b", "--bandwidth", dest="bandwidth", action="store", type=float, default=0.,
+                          help="Bandwidth per answer (bytes/s, 0 for unlimited).")
+
+    # return arguments
+    return l_parser.parse_args()
+
+# ---------------------------------------------------------------------------------------------
+def main():
+    """
+    main (standalone stand-in, FL_REPLAY_URL=http://host:port for the clients)
+    """
+    # get program arguments
+    l_args = arg_parse()
+
+    # create stand-in
+    lo_stand_in = SStandIn(l_args.dir, l_args.latency, l_args.errors, l_args.bandwidth,
+                           l_args.host, l_args.port)
+
+    # logger
+    M_LOG.info("Stand-in serving %s at %s.", l_args.dir, lo_stand_in.s_url)
+
+    try:
+        # serve
+        lo_stand_in.serve_forever()
+
+    # interrupted ?
+    except KeyboardInterrupt:
+        # stop
+        lo_stand_in.stop()
+
+# ---------------------------------------------------------------------------------------------
+# this is the bootstrap process
+
+if "__main__" == __name__:
+    # logger
+    logging.basicConfig(level=df.DI_LOG_LEVEL)
+
+    # run application
+    sys.exit(main())
+
+# < the end >----------------------------------------------------------------------------------
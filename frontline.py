@@ -2,6 +2,20 @@
 """
 frontline
 
+2026.oct  mlabru  speculative INMET lookup only before REDEMET answers (stored miss: INMET at once)
+2026.oct  mlabru  deadline per worker, late carrapatos do not write over the METAF fallback, joined before BDC close
+2026.oct  mlabru  backfill fetched per chunk of DI_METAR_HOURS hours as the hours are processed
+2026.oct  mlabru  HTTP pools sized to the carrapato and aeródromo threads of an hour
+2026.oct  mlabru  HTTP metrics of the run logged and saved (fl_metrics)
+2026.oct  mlabru  polling mode (-p), missing METARs polled after the hour, stations published on arrival
+2026.oct  mlabru  speculative mode (-s), INMET lookup of a carrapato concurrent with REDEMET
+2026.oct  mlabru  hedged REDEMET requests per hour (-g), latency percentiles logged
+2026.oct  mlabru  hourly deadline (-b), unfinished carrapatos get the METSAR from METAF
+2026.oct  mlabru  chronically empty aeródromos skipped, healthy ones first (fl_health)
+2026.oct  mlabru  asyncio engine (-a) with bounded concurrency (-n)
+2026.oct  mlabru  backfill METARs fetched per station for the whole date window
+2026.oct  mlabru  METARs of the hour fetched in bulk before the threads start
+2026.oct  mlabru  HTTP connection pools sized to the aeródromo threads
 2023.may  mlabru  referências aos diretórios alterados. Compatibilidade com GORmet
 2021.may  mlabru  initial version (Linux/Python)
 """
@@ -9,19 +23,25 @@ frontline
 
 # python library
 import argparse
+import collections
+import concurrent.futures
 import datetime
 import glob
 import logging
 import pathlib
 import sys
 import threading
+import time
 
 # local
 import fl_defs as df
 import fl_dirs as dr
 import fl_data_inmet as im
 import fl_data_redemet as rm
+import fl_health as hl
+import fl_http as hp
 import fl_icao_ll as ll
+import fl_metrics as fm
 import fl_metsar_gen as mg
 import fl_metar_parser as mp
 import fl_send_bdc as sb
@@ -72,10 +92,69 @@ def arg_parse():
                           help="Final date.")
     l_parser.add_argument("-i", "--dini", dest="dini", action="store", default="x",
                           help="Initial date.")
+    l_parser.add_argument("-a", "--asyncio", dest="asyncio", action="store_true", default=False,
+                          help="asyncio engine (aiohttp/asyncpg).")
+    l_parser.add_argument("-n", "--concurrency", dest="concurrency", action="store", type=int, default=256,
+                          help="Carrapatos/aeródromos in progress at the same time (asyncio engine).")
+    l_parser.add_argument("-b", "--budget", dest="budget", action="store", type=int, default=df.DI_HOUR_BUDGET,
+                          help="Deadline of each hourly cycle (s).")
+    l_parser.add_argument("-g", "--hedges", dest="hedges", action="store", type=int, default=hp.DI_HEDGE_MAX,
+                          help="Hedged REDEMET requests of each hourly cycle (0 for none).")
+    l_parser.add_argument("-s", "--speculative", dest="speculative", action="store_true", default=False,
+                          help="INMET lookup of a carrapato concurrent with REDEMET.")
+    l_parser.add_argument("-p", "--poll", dest="poll", action="store", type=int, default=0,
+                          help="Poll REDEMET for missing METARs up to this many seconds into the cycle "
+                               "(0 for no polling).")
 
     # return arguments
     return l_parser.parse_args()
 
+# ---------------------------------------------------------------------------------------------
+def claim_metsar(f_claim, fs_fname: str):
+    """
+    claim the METSAR of a carrapato (the late thread or the METAF fallback of main, one writes)
+
+    :param f_claim (Lock): METSAR claim of the carrapato (None for no claim)
+    :param fs_fname (str): carrapato filename
+
+    :returns: True if this thread writes the METSAR else False
+    """
+    # no claim or claimed now ?
+    if f_claim is None or f_claim.acquire(blocking=False):
+        # return
+        return True
+
+    # logger
+    M_LOG.warning("Carrapato %s done after the deadline, METSAR from METAF kept.", fs_fname)
+
+    # return
+    return False
+
+# ---------------------------------------------------------------------------------------------
+def get_backfill(fdt_ini, fi_hours: int, fs_station: str, flst_locations):
+    """
+    METARs of the next hours of the date window (backfill), one request per station: the
+    carrapatos of these hours and the given locations (aeródromos)
+
+    :param fdt_ini (datetime): first hour GMT
+    :param fi_hours (int): hours
+    :param fs_station (str): station (or ????)
+    :param flst_locations (iterable): other locations
+
+    :returns: number of METARs fetched
+    """
+    # hours
+    ls_ini = fdt_ini.strftime("%Y%m%d%H")
+    ls_fnl = (fdt_ini + datetime.timedelta(hours=fi_hours - 1)).strftime("%Y%m%d%H")
+
+    # carrapatos of the hours
+    llst_codes = [get_station_code(ls_file)
+                  for ls_file in glob.glob("{}/saida_carrapato_{}_*.txt".format(dr.DS_TICKS_DIR, fs_station))
+                  if ls_ini <= pathlib.PurePath(ls_file).stem.split('_')[-1] <= ls_fnl]
+
+    # return (one request per station and chunk)
+    return rm.redemet_get_range(ls_ini, ls_fnl, llst_codes + list(flst_locations))
+
 # ---------------------------------------------------------------------------------------------
 def get_date_range(f_args):
     """
@@ -220,13 +299,17 @@ def trata_aerodromo(fdt_gmt, fs_icao_code, f_bdc):
         M_LOG.error("METAR for %s at %s not found. Skipping.", fs_icao_code, ls_date)
 
 # ---------------------------------------------------------------------------------------------
-def trata_carrapato(fdt_gmt, fs_file, f_bdc):
+def trata_carrapato(fdt_gmt, fs_file, f_bdc, f_pool=None, f_claim=None):
     """
-    trata carrapato
+    trata carrapato. REDEMET first, INMET (closest station) on a miss. In speculative mode
+    (f_pool) the INMET lookup starts with the REDEMET one when the location is not fetched yet
+    (a stored miss goes straight to INMET), and is cancelled or discarded on a REDEMET hit
 
     :param fdt_gmt (datetime): date GMT
     :param fs_file (str): carrapato filename
     :param f_bdc (conn): connection to BDC
+    :param f_pool (Executor): INMET lookups executor (None for sequential lookups)
+    :param f_claim (Lock): METSAR claim, shared with the METAF fallback of a missed deadline
     """
     # get metaf data
     lo_metaf = mp.metar_parse_file(fs_file)
@@ -244,10 +327,36 @@ def trata_carrapato(fdt_gmt, fs_file, f_bdc):
     # build date
     ls_date = fdt_gmt.strftime("%Y%m%d%H")
 
+    # format date
+    ls_dia = fdt_gmt.strftime("%Y-%m-%d")
+
+    # closest station (searched on a REDEMET miss) and INMET lookup (started ahead)
+    lt_near = None
+    l_inmet = None
+
+    # speculative and not fetched yet (a REDEMET request to overlap) ?
+    if f_pool is not None and not rm.redemet_get_stored(ls_date, ls_icao_code)[0]:
+        # get closest station
+        lt_near = ll.find_near_station(ls_icao_code)
+
+        if lt_near[0]:
+            # INMET lookup, concurrent with REDEMET (with the deadline of this thread)
+            l_inmet = f_pool.submit(hp.http_with_deadline, hp.http_get_deadline(), im.inmet_get_location,
+                                    ls_dia, lt_near[0])
+
     # try to get data from REDEMET
     lo_metar = rm.redemet_get_location(ls_date, ls_icao_code)
 
     if lo_metar:
+        # INMET lookup not needed (cancelled if not started, else discarded)
+        if l_inmet is not None:
+            l_inmet.cancel()
+
+        # METSAR made by the fallback (deadline missed) ?
+        if not claim_metsar(f_claim, ls_fname):
+            # return
+            return
+
         # save to BDC
         sb.bdc_save_metar(fdt_gmt, lo_metar, f_bdc)
 
@@ -262,15 +371,18 @@ def trata_carrapato(fdt_gmt, fs_file, f_bdc):
 
     # senão, estação não encontrada na REDEMET. Tenta INMET
     else:
-        # format date
-        ls_dia = fdt_gmt.strftime("%Y-%m-%d")
-
-        # get closest station
-        ls_station, lf_altitude = ll.find_near_station(ls_icao_code)
+        # get closest station (if not searched yet)
+        ls_station, lf_altitude = lt_near or ll.find_near_station(ls_icao_code)
 
         if ls_station:
-            # try to get data from INMET
-            llst_station_data = im.inmet_get_location(ls_dia, ls_station)
+            # try to get data from INMET (started ahead, or here if it still waits for a thread)
+            llst_station_data = l_inmet.result() if l_inmet is not None and not l_inmet.cancel() else \
+                                im.inmet_get_location(ls_dia, ls_station)
+
+            # METSAR made by the fallback (deadline missed) ?
+            if not claim_metsar(f_claim, ls_fname):
+                # return
+                return
 
             if llst_station_data:
                 # make METSAR from station data
@@ -284,6 +396,11 @@ def trata_carrapato(fdt_gmt, fs_file, f_bdc):
                 # gera METSAR from METAF (carrapato)
                 mg.make_metsar_from_file(ls_fname)
 
+        # METSAR made by the fallback (deadline missed) ?
+        elif not claim_metsar(f_claim, ls_fname):
+            # return
+            return
+
         # senão,...
         else:
             # logger
@@ -300,10 +417,6 @@ def main():
     # get program arguments
     l_args = arg_parse()
 
-    # connect BDC
-    l_bdc = sb.bdc_connect()
-    assert l_bdc
-
     # station
     ls_station = "????" if "x" == l_args.code else str(l_args.code)
 
@@ -313,6 +426,54 @@ def main():
     # date range
     ldt_ini, li_delta = get_date_range(l_args)
 
+    # date window
+    ls_ini = ldt_ini.strftime("%Y%m%d%H")
+    ls_fnl = (ldt_ini + (li_delta - 1) * ldt_1hour).strftime("%Y%m%d%H")
+
+    # carrapatos of the window
+    llst_window = [ls_file
+                   for ls_file in glob.glob("{}/saida_carrapato_{}_*.txt".format(dr.DS_TICKS_DIR, ls_station))
+                   if ls_ini <= pathlib.PurePath(ls_file).stem.split('_')[-1] <= ls_fnl]
+
+    # carrapatos of the busiest hour
+    li_carrapatos = max(collections.Counter(pathlib.PurePath(ls_file).stem.split('_')[-1]
+                                            for ls_file in llst_window).values(), default=0)
+
+    # HTTP pools sized to the threads of an hour (carrapatos and aeródromos, one request each)
+    hp.http_configure(li_carrapatos + len(rm.DDCT_AERODROMOS))
+
+    # asyncio engine ?
+    if l_args.asyncio:
+        # asyncio engine (aiohttp/asyncpg only needed here)
+        import fl_async_engine as ae
+
+        # run
+        ae.run(ldt_ini, li_delta, ls_station, l_args.concurrency, l_args.budget, l_args.hedges,
+               l_args.speculative, l_args.poll)
+
+        # close HTTP session
+        hp.http_close()
+
+        # logger
+        M_LOG.info("Parse cache: %s.", str(mp.metar_cache_stats()))
+
+        # HTTP metrics of the run
+        fm.metrics_dump()
+
+        # quit
+        return
+
+    # connect BDC
+    l_bdc = sb.bdc_connect()
+    assert l_bdc
+
+    # INMET lookups executor (speculative mode)
+    lo_pool = concurrent.futures.ThreadPoolExecutor(max_workers=hp.DI_HTTP_POOL_MAX, thread_name_prefix="inmet") \
+              if l_args.speculative else None
+
+    # threads not done by their deadline (joined before the BDC is closed)
+    llst_late_threads = []
+
     # for all dates...
     for li_i in range(li_delta):
         # format full date
@@ -321,83 +482,244 @@ def main():
         # logger
         M_LOG.info("Processando, estação: %s data: %s.", ls_station, ls_date)
 
+        # backfill, first hour of a chunk ?
+        if li_delta > 1 and 0 == li_i % rm.DI_METAR_HOURS:
+            # METARs of the chunk, one request per station (discarded hour by hour)
+            get_backfill(ldt_ini, min(rm.DI_METAR_HOURS, li_delta - li_i), ls_station, rm.DDCT_AERODROMOS)
+
+        # deadline of the hour (requests stop there too)
+        lf_deadline = time.monotonic() + l_args.budget
+        hp.http_deadline(lf_deadline)
+
+        # cutoff of the polling (not past the deadline)
+        lf_cutoff = min(lf_deadline, time.monotonic() + l_args.poll)
+
+        # hedges of the hour
+        hp.http_hedges(l_args.hedges)
+
         # create trata_carrapato threads list
         llst_thr_carrapato = []
 
-        # find all stations in directory...
-        for ls_file in glob.glob("{}/saida_carrapato_{}_{}.txt".format(dr.DS_TICKS_DIR, ls_station, ls_date)):
+        # create threads list
+        llst_thr_aerodromo = []
+
+        # find all stations in directory
+        llst_files = glob.glob("{}/saida_carrapato_{}_{}.txt".format(dr.DS_TICKS_DIR, ls_station, ls_date))
+
+        # METARs of the hour (carrapatos and aeródromos), a few requests for all
+        ldct_metars = rm.redemet_get_locations(ls_date, [get_station_code(ls_file) for ls_file in llst_files] +
+                                                        list(rm.DDCT_AERODROMOS))
+
+        # stations whose METAR is missing, polled until the cutoff (polling mode)
+        lset_poll = {ls_code for ls_code, lo_metar in ldct_metars.items()
+                     if lo_metar is None and not hl.health_skip(hl.DS_HEALTH_REDEMET, ls_code)} \
+                    if l_args.poll > 0 else set()
+
+        # carrapatos waiting for the polling ({code: file})
+        ldct_poll_files = {}
+
+        # -------------------------------------------------------------------------------------
+        def _start_carrapato(fs_file):
             # logger
-            M_LOG.debug("Create and start thread for carrapato %s.", ls_file)
-            
-            # create thread trata_carrapato
-            l_thr = threading.Thread(target=trata_carrapato, args=(ldt_ini, ls_file, l_bdc))
+            M_LOG.debug("Create and start thread for carrapato %s.", fs_file)
+
+            # METSAR claim (the thread or the METAF fallback of a missed deadline)
+            lo_claim = threading.Lock()
+
+            # create thread trata_carrapato (with the deadline of the hour)
+            l_thr = threading.Thread(target=hp.http_with_deadline,
+                                     args=(lf_deadline, trata_carrapato, ldt_ini, fs_file, l_bdc, lo_pool, lo_claim))
             assert l_thr
 
             # save thread trata_carrapato
-            llst_thr_carrapato.append((get_station_code(ls_file), l_thr))
-            
+            llst_thr_carrapato.append((get_station_code(fs_file), fs_file, l_thr, lo_claim))
+
             # exec thread trata_carrapato
             l_thr.start()
 
+        # -------------------------------------------------------------------------------------
+        def _start_aerodromo(fs_code):
+            # logger
+            M_LOG.debug("Create and start thread for aeródromo %s.", fs_code)
+
+            # trata aeródromo (with the deadline of the hour)
+            l_thr = threading.Thread(target=hp.http_with_deadline,
+                                     args=(lf_deadline, trata_aerodromo, ldt_ini, fs_code, l_bdc))
+            assert l_thr
+
+            # save thread trata aeródromo
+            llst_thr_aerodromo.append((fs_code, l_thr))
+
+            # exec thread trata aeródromo
+            l_thr.start()
+
+        # -------------------------------------------------------------------------------------
+        def _found(fs_code, fo_metar):
+            # carrapato waiting ?
+            if fs_code in ldct_poll_files:
+                # trata carrapato
+                _start_carrapato(ldct_poll_files.pop(fs_code))
+
+            # senão, aeródromo
+            else:
+                # trata aeródromo
+                _start_aerodromo(fs_code)
+
+        # for all stations...
+        for ls_file in llst_files:
+            # METAR missing (polling) ?
+            if get_station_code(ls_file) in lset_poll:
+                # wait for the polling
+                ldct_poll_files[get_station_code(ls_file)] = ls_file
+
+            # senão,...
+            else:
+                # trata carrapato
+                _start_carrapato(ls_file)
+
+        # METARs missing (polling) ?
+        if lset_poll:
+            # carrapatos codes
+            lset_carrapato = {get_station_code(ls_file) for ls_file in llst_files}
+
+            # for all aeródromos (healthy ones first)...
+            for ls_code in hl.health_order(hl.DS_HEALTH_REDEMET, rm.DDCT_AERODROMOS):
+                # METAR found, not a carrapato and not chronically empty ?
+                if ls_code not in lset_carrapato and ls_code not in lset_poll and \
+                   not hl.health_skip(hl.DS_HEALTH_REDEMET, ls_code):
+                    # trata aeródromo (not held back by the polling)
+                    _start_aerodromo(ls_code)
+
+            # poll (healthy ones first), each station is started as soon as its METAR arrives
+            llst_missing = rm.redemet_poll(ls_date, hl.health_order(hl.DS_HEALTH_REDEMET, lset_poll), lf_cutoff,
+                                           _found)
+
+            # logger
+            M_LOG.info("Polling of %s: %d of %d missing METARs arrived.", ls_date,
+                       len(lset_poll) - len(llst_missing), len(lset_poll))
+
+            # for all carrapatos still missing...
+            for ls_file in list(ldct_poll_files.values()):
+                # trata carrapato (INMET or METAF)
+                _start_carrapato(ls_file)
+
         # logger
         M_LOG.debug("Encontrados %d carrapatos.\n%s", len(llst_thr_carrapato), str(llst_thr_carrapato))
         
         # create carrapato ok list
         llst_carrapato_ok = []
 
+        # carrapatos and aeródromos not done by the deadline
+        llst_late_carrapato = []
+        llst_late_aerodromo = []
+
         # for all carrapato threads...
-        for (ls_station, l_thr) in llst_thr_carrapato:
+        for (ls_code, ls_file, l_thr, lo_claim) in llst_thr_carrapato:
             # thread ok ?
             if l_thr:
-                # wait for thread
-                l_thr.join()
+                # wait for thread (until the deadline)
+                l_thr.join(max(0., lf_deadline - time.monotonic()))
+
+                # deadline missed ?
+                if l_thr.is_alive():
+                    # METSAR not claimed by the thread yet ?
+                    if lo_claim.acquire(blocking=False):
+                        # gera METSAR from METAF (carrapato), the late thread does not write
+                        mg.make_metsar_from_file(pathlib.PurePath(ls_file).name)
+
+                    # save in late lists
+                    llst_late_carrapato.append(ls_code)
+                    llst_late_threads.append(l_thr)
 
                 # save in carrapato ok list
-                llst_carrapato_ok.append(ls_station) 
+                llst_carrapato_ok.append(ls_code)
 
         # logger
         M_LOG.debug("Encontrados %d aeródromos na REDEMET.\n%s", len(rm.DDCT_AERODROMOS), rm.DDCT_AERODROMOS)
 
-        # create threads list
-        llst_thr_aerodromo = []
+        # aeródromos already started (polling)
+        lset_aerodromo_ok = {ls_code for ls_code, _ in llst_thr_aerodromo}
 
-        # for all remaining aeródromos...
-        for ls_code in rm.DDCT_AERODROMOS:
-            # carrapato ok ?
-            if ls_code in llst_carrapato_ok:
+        # for all remaining aeródromos (healthy ones first)...
+        for ls_code in hl.health_order(hl.DS_HEALTH_REDEMET, rm.DDCT_AERODROMOS):
+            # carrapato ok or aeródromo already started ?
+            if ls_code in llst_carrapato_ok or ls_code in lset_aerodromo_ok:
                 # skip this one
                 continue
 
-            # logger
-            M_LOG.debug("Create and start thread for aeródromo %s.", ls_code)
-            
-            # trata aeródromo
-            l_thr = threading.Thread(target=trata_aerodromo, args=(ldt_ini, ls_code, l_bdc))
-            assert l_thr
+            # chronically empty (not due for a re-probe) ?
+            if hl.health_skip(hl.DS_HEALTH_REDEMET, ls_code):
+                # logger
+                M_LOG.debug("Aeródromo %s skipped (chronically empty).", ls_code)
 
-            # exec thread trata aeródromo
-            llst_thr_aerodromo.append(l_thr)
+                # skip this one
+                continue
 
-            # exec thread trata aeródromo
-            l_thr.start()
+            # trata aeródromo
+            _start_aerodromo(ls_code)
 
         # logger
         M_LOG.debug("Encontrados %d aeródromos.", len(llst_thr_aerodromo))
         M_LOG.debug("llst_thr_aerodromo: %s", str(llst_thr_aerodromo))
         
         # for all aeródromo threads...
-        for l_thr in llst_thr_aerodromo:
+        for (ls_code, l_thr) in llst_thr_aerodromo:
             # thread ok ?
             if l_thr:
-                # wait for thread
-                l_thr.join()
+                # wait for thread (until the deadline)
+                l_thr.join(max(0., lf_deadline - time.monotonic()))
+
+                # deadline missed ?
+                if l_thr.is_alive():
+                    # save in late lists
+                    llst_late_aerodromo.append(ls_code)
+                    llst_late_threads.append(l_thr)
+
+        # deadline missed ?
+        if llst_late_carrapato or llst_late_aerodromo:
+            # logger
+            M_LOG.warning("Deadline of %s missed by %d carrapatos (METSAR from METAF): %s and %d aeródromos: %s.",
+                          ls_date, len(llst_late_carrapato), ", ".join(llst_late_carrapato),
+                          len(llst_late_aerodromo), ", ".join(llst_late_aerodromo))
+
+        # logger
+        M_LOG.info("HTTP latencies (samples, p50, p95, p99): %s, hedges: %d, limits: %s.",
+                   str(hp.http_latency_report()), hp.http_hedges_used(),
+                   str(hp.http_limits()))
+
+        # discard METARs of the hour
+        rm.redemet_forget(ls_date)
+
+        # hour done (late threads keep their own deadline, the backfill has none)
+        hp.http_deadline(None)
+
+        # save stations health
+        hl.health_save()
 
         # save new initial
         ldt_ini += ldt_1hour
 
+    # for all late threads...
+    for l_thr in llst_late_threads:
+        # wait for thread (its requests stop at its deadline, the BDC is still open)
+        l_thr.join()
+
+    # INMET lookups executor (late lookups are discarded)
+    if lo_pool is not None:
+        lo_pool.shutdown(wait=False)
+
     # close BDC
     l_bdc.close()
 
+    # close HTTP session
+    hp.http_close()
+
+    # logger
+    M_LOG.info("Parse cache: %s.", str(mp.metar_cache_stats()))
+
+    # HTTP metrics of the run
+    fm.metrics_dump()
+
 # ---------------------------------------------------------------------------------------------
 # this is the bootstrap process
 
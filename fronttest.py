@@ -2,6 +2,12 @@
 """
 fronttest
 
+2026.oct  mlabru  backfill fetched per chunk of DI_METAR_HOURS hours as the hours are processed
+2026.oct  mlabru  HTTP metrics of the run logged and saved (fl_metrics)
+2026.oct  mlabru  hedged REDEMET requests per hour, latency percentiles logged
+2026.oct  mlabru  stations health saved after each hour (fl_health)
+2026.oct  mlabru  backfill METARs fetched per station for the whole date window
+2026.oct  mlabru  METARs of the hour fetched in bulk before the carrapatos
 2023.may  mlabru  referências aos diretórios alterados. Compatibilidade com GORmet
 2021.oct  mlabru  save to METSAR_B
 2021.may  mlabru  initial version (Linux/Python)
@@ -21,7 +27,10 @@ import fl_defs as df
 import fl_dirs as dr
 import fl_data_inmet as im
 import fl_data_redemet as rm
+import fl_health as hl
+import fl_http as hp
 import fl_icao_ll as ll
+import fl_metrics as fm
 import fl_metsar_gen as mg
 import fl_metar_parser as mp
 import fl_send_bdc as sb
@@ -247,17 +256,59 @@ def main():
         # logger
         M_LOG.warning("Processando, estação: %s data: %s", ls_station, ls_date)
 
-        # find all stations in directory...
-        for ls_file in glob.glob("{}/saida_carrapato_{}_{}.txt".format(dr.DS_TICKS_DIR, ls_station, ls_date)):
+        # backfill, first hour of a chunk ?
+        if li_delta > 1 and 0 == li_i % rm.DI_METAR_HOURS:
+            # chunk hours
+            ls_fnl = (ldt_ini + (min(rm.DI_METAR_HOURS, li_delta - li_i) - 1) * ldt_1hour).strftime("%Y%m%d%H")
+
+            # carrapatos of the chunk
+            llst_codes = [ls_file.split('_')[2]
+                          for ls_file in glob.glob("{}/saida_carrapato_{}_*.txt".format(dr.DS_TICKS_DIR, ls_station))
+                          if ls_date <= pathlib.PurePath(ls_file).stem.split('_')[-1] <= ls_fnl]
+
+            # METARs of the chunk, one request per station (discarded hour by hour)
+            rm.redemet_get_range(ls_date, ls_fnl, llst_codes)
+
+        # find all stations in directory
+        llst_files = glob.glob("{}/saida_carrapato_{}_{}.txt".format(dr.DS_TICKS_DIR, ls_station, ls_date))
+
+        # hedges of the hour
+        hp.http_hedges()
+
+        # METARs of the hour, a few requests for all carrapatos
+        rm.redemet_get_locations(ls_date, [ls_file.split('_')[2] for ls_file in llst_files])
+
+        # for all stations...
+        for ls_file in llst_files:
             # trata carrapato
             trata_carrapato(ldt_ini, ls_file, l_bdc)
 
+        # logger
+        M_LOG.info("HTTP latencies (samples, p50, p95, p99): %s, hedges: %d, limits: %s.",
+                   str(hp.http_latency_report()), hp.http_hedges_used(),
+                   str(hp.http_limits()))
+
+        # discard METARs of the hour
+        rm.redemet_forget(ls_date)
+
+        # save stations health
+        hl.health_save()
+
         # save new initial
         ldt_ini += ldt_1hour
 
     # close BDC
     l_bdc.close()
 
+    # close HTTP session
+    hp.http_close()
+
+    # logger
+    M_LOG.info("Parse cache: %s.", str(mp.metar_cache_stats()))
+
+    # HTTP metrics of the run
+    fm.metrics_dump()
+
 # ---------------------------------------------------------------------------------------------
 # this is the bootstrap process
 